@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+이상 징후 탐지 - 급락/거래량 이상치와 유동성·시가총액 급감(러그풀)을 스냅샷마다 판단
+
+토큰별로 수익률과 거래량(로그)의 EWMA 평균/분산, 직전 유동성/시가총액만 보관하므로
+토큰당 메모리는 고정입니다. 한 주기의 모든 토큰을 한 번의 벡터 연산으로 판단하고,
+판단 직후 통계를 갱신합니다 (z-score는 이번 값을 반영하기 전 통계 기준).
+"""
+import os
+import time
+import numpy as np
+from snapshot_diff import token_key, token_label
+from indicators import TokenArrays
+
+ANOMALIES_PATH = os.environ.get('GMGN_ANOMALIES_PATH', os.path.join('data', 'anomalies.npz'))
+
+STATE_FIELDS = ('last_price', 'ret_mean', 'ret_var', 'vol_mean', 'vol_var',
+                'last_liquidity', 'last_market_cap', 'count', 'last_update')
+
+SPILL_NAMESPACE = 'anomalies'
+
+# z-score 기준과 판단 시작에 필요한 샘플 수
+Z_THRESHOLD = 4.0
+MIN_SAMPLES = 5
+
+# 직전 스냅샷 대비 이 비율 이상 줄면 급감으로 판단
+LIQUIDITY_DROP = 0.5
+MARKET_CAP_DROP = 0.5
+
+# 상세 조회(enrichment)로 얻은 유동성은 조회 후 이 시간(초)이 지나면 판단에 쓰지 않음 (상세 캐시 TTL과 같게)
+LIQUIDITY_MAX_AGE = float(os.environ.get('GMGN_LIQUIDITY_MAX_AGE', '600'))
+
+# 표준편차 하한 - 거의 변하지 않던 토큰의 작은 움직임이 이상치가 되지 않도록
+MIN_RETURN_STD = 0.01
+MIN_VOLUME_STD = 0.05
+
+KINDS = ('liquidity_pull', 'market_cap_collapse', 'dump', 'spike', 'volume')
+
+
+def _numbers(tokens, field):
+    """토큰 목록의 field 값 배열 (숫자가 아니거나 음수이면 NaN, 0은 급감 판단을 위해 유지)"""
+    values = [token.get(field) for token in tokens]
+    return np.array([v if isinstance(v, (int, float)) and v >= 0 else np.nan for v in values], dtype=float)
+
+
+class AnomalyDetector(TokenArrays):
+    """토큰별 온라인 통계를 배열로 보관하고 배치 단위로 이상 징후 판단"""
+    fields = STATE_FIELDS
+    spill_namespace = SPILL_NAMESPACE
+    default_path = ANOMALIES_PATH
+
+    def __init__(self, span=20, z_threshold=Z_THRESHOLD, min_samples=MIN_SAMPLES,
+                 liquidity_drop=LIQUIDITY_DROP, market_cap_drop=MARKET_CAP_DROP, liquidity_max_age=LIQUIDITY_MAX_AGE,
+                 capacity=256, spill=None):
+        super().__init__(capacity, spill)
+        self.liquidity_max_age = liquidity_max_age
+        self.alpha = 2.0 / (span + 1)
+        self.z_threshold = z_threshold
+        self.min_samples = min_samples
+        self.liquidity_drop = liquidity_drop
+        self.market_cap_drop = market_cap_drop
+        self.flagged = dict.fromkeys(KINDS, 0)
+
+    def update(self, tokens, now=None):
+        """한 스냅샷을 판단한 뒤 통계에 반영, [(key, 종류, 알림 메시지)] 반환
+
+        유동성에 조회 시각(enriched_at)이 있으면 liquidity_max_age보다 오래된 값은 없는 값으로 봅니다
+        (캐시된 예전 값으로 급감을 놓치거나 잘못 판단하지 않도록).
+        """
+        now = time.time() if now is None else now
+        batch = {}
+        for token in tokens:
+            key = token_key(token)
+            price = token.get('price')
+            if key is None or key in batch or not isinstance(price, (int, float)) or not price >= 0:
+                continue
+            batch[key] = token
+        if not batch:
+            return []
+
+        keys = list(batch)
+        picked = list(batch.values())
+        rows = np.array([self._row(key) for key in keys])
+        price = _numbers(picked, 'price')
+        log_volume = np.log1p(np.nan_to_num(_numbers(picked, 'volume_24h')))
+        liquidity = _numbers(picked, 'liquidity')
+        liquidity[now - _numbers(picked, 'enriched_at') > self.liquidity_max_age] = np.nan
+        market_cap = _numbers(picked, 'market_cap')
+
+        s = self.state
+        count = s['count'][rows]
+        first = count == 0
+        last_price = s['last_price'][rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ret = np.where(first, 0.0, np.log(price / np.where(first, price, last_price)))
+        # 가격이 0에서/0으로 바뀐 스냅샷은 수익률 통계에 넣지 않음
+        valid = np.isfinite(ret)
+        zeroed = (price == 0) & (last_price > 0)
+
+        # 판단 (이번 값을 반영하기 전 통계 기준)
+        warm = count >= self.min_samples
+        z_ret = (ret - s['ret_mean'][rows]) / np.maximum(np.sqrt(s['ret_var'][rows]), MIN_RETURN_STD)
+        z_vol = (log_volume - s['vol_mean'][rows]) / np.maximum(np.sqrt(s['vol_var'][rows]), MIN_VOLUME_STD)
+        last_liquidity = s['last_liquidity'][rows]
+        last_market_cap = s['last_market_cap'][rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            liquidity_ratio = liquidity / last_liquidity
+            market_cap_ratio = market_cap / last_market_cap
+            flags = {
+                'liquidity_pull': (last_liquidity > 0) & (liquidity_ratio <= 1 - self.liquidity_drop),
+                'market_cap_collapse': (last_market_cap > 0) & (market_cap_ratio <= 1 - self.market_cap_drop),
+                # 가격이 0이 되면 통계와 관계없이 급락
+                'dump': (warm & valid & (z_ret <= -self.z_threshold)) | zeroed,
+                'spike': warm & valid & (z_ret >= self.z_threshold),
+                # 가격은 평소 범위인데 거래량만 튀는 경우
+                'volume': warm & valid & (z_vol >= self.z_threshold) & (np.abs(z_ret) < 1.0),
+            }
+
+        # EWMA 평균/분산 갱신 (첫 샘플은 기준값만 기록)
+        for mean, var, x, start, use in (('ret_mean', 'ret_var', ret, 0.0, valid),
+                                         ('vol_mean', 'vol_var', log_volume, log_volume, True)):
+            diff = np.where(use, x - s[mean][rows], 0.0)
+            step = self.alpha * diff
+            s[var][rows] = np.where(first, 0.0, np.where(use, (1 - self.alpha) * (s[var][rows] + diff * step),
+                                                          s[var][rows]))
+            s[mean][rows] = np.where(first, start, s[mean][rows] + step)
+
+        # 값이 없는 스냅샷은 직전 값 유지
+        s['last_liquidity'][rows] = np.where(np.isnan(liquidity), last_liquidity, liquidity)
+        s['last_market_cap'][rows] = np.where(np.isnan(market_cap), last_market_cap, market_cap)
+        s['last_price'][rows] = price
+        s['count'][rows] = count + 1
+        self.updates += 1
+        s['last_update'][rows] = self.updates
+
+        messages = {
+            'liquidity_pull': lambda i, name: f"🧨 유동성 급감 알림: {name} ({(liquidity_ratio[i] - 1) * 100:.0f}%)",
+            'market_cap_collapse': lambda i, name: f"💥 시가총액 급감 알림: {name} ({(market_cap_ratio[i] - 1) * 100:.0f}%)",
+            'dump': lambda i, name: (f"📉 급락 이상치 알림: {name} (가격 0)" if zeroed[i] else
+                                     f"📉 급락 이상치 알림: {name} ({np.expm1(ret[i]) * 100:.1f}%, z={z_ret[i]:.1f})"),
+            'spike': lambda i, name: f"📈 급등 이상치 알림: {name} (+{np.expm1(ret[i]) * 100:.1f}%, z={z_ret[i]:.1f})",
+            'volume': lambda i, name: f"📊 거래량 이상치 알림: {name} (가격 변동 없이 거래량 z={z_vol[i]:.1f})",
+        }
+        anomalies = []
+        for kind in KINDS:
+            hits = np.flatnonzero(flags[kind]).tolist()
+            self.flagged[kind] += len(hits)
+            anomalies.extend((keys[i], kind, messages[kind](i, token_label(keys[i]))) for i in hits)
+        return anomalies
+
+    def stats(self):
+        """종류별 누적 탐지 건수"""
+        return {'tokens': len(self.keys), **self.flagged}
@@ -1,49 +1,178 @@
 #!/usr/bin/env python3
 """
 자동 모니터링 스크립트 - 주기적으로 실행
+
+수집 파이프라인을 한 프로세스 안에서 계속 실행하고, 모니터 상태(구간 히스토리,
+알림 쿨다운)를 체크포인트 + WAL로 저장하여 재시작 후에도 바로 이어서 동작합니다.
 """
+import functools
+import os
+import signal
+import sys
 import time
 import schedule
-import subprocess
-import sys
 from datetime import datetime
+import gmgn_scraper
+import notifier
+from egress import EgressPool, print_egress_report
+from enrichment import Enricher, fetch_token_detail
+from indicators import IndicatorEngine
+from anomalies import AnomalyDetector
+from leases import LeaseCoordinator, LEASE_DB_PATH, cycle_id, instance_path
+from memory_budget import MemoryBudget, SpillFile, SPILL_DIR
+from monitor_state import StateStore, STATE_DIR
+from validation import Validator, QUARANTINE_PATH
+
+# 수집 주기 (분) 및 체크포인트 주기 (수집 횟수)
+INTERVAL_MINUTES = 10
+CHECKPOINT_EVERY = 6
 
-def run_scraper():
-    """스크래퍼 실행"""
+
+def run_cycle(collector, results, state, store, dispatcher=None, targets=None):
+    """수집 한 주기 실행 후 모니터 상태 갱신, 새 알림 목록 반환"""
     print(f"\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - 자동 수집 시작")
-    
+
+    alerts = []
     try:
-        result = subprocess.run([sys.executable, 'gmgn_scraper.py'], 
-                              capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print("✅ 자동 수집 완료")
-        else:
-            print(f"❌ 수집 실패: {result.stderr}")
-            
+        results.clear()
+        for target in gmgn_scraper.TARGETS if targets is None else targets:
+            collector.submit(target)
+        collector.join()
+
+        now = time.time()
+        for data, _ in results:
+            # WAL에 먼저 기록한 뒤 상태 반영
+            samples = store.log(data, now)
+            for alert in state.apply_samples(samples, now):
+                print(alert)
+                alerts.append(alert)
+                if dispatcher is not None:
+                    dispatcher.submit(alert)
+
+        print("✅ 자동 수집 완료")
+
     except Exception as e:
         print(f"❌ 실행 오류: {e}")
 
+    return alerts
+
+
+def assign_targets(coordinator, targets=None, now=None):
+    """임대로 이번 주기에 이 인스턴스가 수집할 대상 선택"""
+    targets = gmgn_scraper.TARGETS if targets is None else targets
+    keys = {f"{chain}:{tab}": (chain, tab) for chain, tab in targets}
+    assigned = coordinator.assign(keys, cycle_id(INTERVAL_MINUTES * 60, now))
+    stats = coordinator.stats()
+    print(f"🧩 샤드: {len(assigned)}/{len(keys)}개 대상 수집 "
+          f"(인스턴스 {stats['live_instances']}개, 임대 {stats['held']}개)")
+    return [keys[key] for key in assigned]
+
+
+def print_recovery(state):
+    """복구 결과 출력"""
+    metrics = state.metrics()
+    print(f"♻️ 상태 복구: 토큰 {metrics['tokens']}개, WAL {metrics['replayed_entries']}건 재생 "
+          f"({metrics['recovery_seconds'] * 1000:.1f}ms)")
+
+
+def print_memory(budget):
+    """구조별 메모리 사용량 출력"""
+    report = budget.report()
+    usage = ', '.join(f"{name} {info['bytes'] / 1024:.0f}KB/{info['entries']}개"
+                      for name, info in report['structures'].items())
+    print(f"🧠 메모리 {report['total_bytes'] / 1024 / 1024:.1f}MB / "
+          f"{report['limit_bytes'] / 1024 / 1024:.0f}MB ({usage})")
+
+
 def main():
     """메인 실행 함수"""
     print("🤖 GMGN 자동 모니터링 시작")
-    print("📅 스케줄: 10분마다 실행")
+    print(f"📅 스케줄: {INTERVAL_MINUTES}분마다 실행")
     print("⚠️  종료하려면 Ctrl+C를 누르세요")
     print("=" * 50)
-    
-    # 10분마다 실행 스케줄 설정
-    schedule.every(10).minutes.do(run_scraper)
-    
-    # 시작시 한 번 실행
-    run_scraper()
-    
-    # 스케줄 실행
+
+    # docker stop(SIGTERM)에서도 체크포인트를 남기고 종료
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+
+    # 여러 인스턴스가 대상을 나눠 수집 (GMGN_LEASE_DB 설정 시) - 상태 파일은 인스턴스별로 분리
+    # (지표/이상 탐지 상태, 알림 outbox, 격리 파일까지 - 웹 앱은 지표 파일을 합쳐서 읽음)
+    coordinator = LeaseCoordinator() if LEASE_DB_PATH else None
+    instance = coordinator.instance_id if coordinator else None
+
+    # 메모리 예산 초과 시 비활성 토큰을 옮겨 둘 파일
+    spill = SpillFile(instance_path(os.path.join(SPILL_DIR, 'spill_monitor.db'), instance))
+
+    store = StateStore(os.path.join(STATE_DIR, coordinator.instance_id) if coordinator else None)
+    state = store.recover(spill=spill)
+    print_recovery(state)
+
+    dispatcher = notifier.create_dispatcher_from_env(notifier.outbox_path('monitor', instance))
+    if dispatcher is not None:
+        dispatcher.start()
+
+    results = []
+    egress = EgressPool.from_env()
+    enricher = Enricher(fetch=functools.partial(fetch_token_detail, egress=egress), spill=spill)
+    indicators = IndicatorEngine.load(instance_path(IndicatorEngine.default_path, instance), spill=spill)
+    detector = AnomalyDetector.load(instance_path(AnomalyDetector.default_path, instance), spill=spill)
+
+    budget = MemoryBudget()
+    budget.register('monitor_history', state)
+    budget.register('indicators', indicators)
+    budget.register('anomalies', detector)
+    budget.register('enrichment_cache', enricher.cache)
+    budget.register('enrichment_seen', enricher.seen)
+    validator = Validator(instance_path(QUARANTINE_PATH, instance))
+    collector = gmgn_scraper.create_pipeline(dispatcher, results, enricher, indicators, validator,
+                                             detector).start()
+    cycles = [0]
+
+    def job():
+        targets = assign_targets(coordinator) if coordinator else None
+        run_cycle(collector, results, state, store, dispatcher, targets)
+        budget.enforce()
+        print_memory(budget)
+        gmgn_scraper.print_validation_stats(validator.stats())
+        print_egress_report(egress)
+        gmgn_scraper.print_anomaly_stats(detector.stats())
+        indicators.save()
+        detector.save()
+
+        cycles[0] += 1
+        if cycles[0] == 1:
+            ready = state.metrics()['time_to_first_valid_alert']
+            if ready is not None:
+                print(f"⏱️ 재시작 후 첫 유효 알림 판단까지: {ready:.2f}초")
+        if cycles[0] % CHECKPOINT_EVERY == 0:
+            store.checkpoint(state)
+            print("💾 모니터 상태 체크포인트 저장")
+
+    # 주기 실행 스케줄 설정 (생존 신호는 수집 주기와 별개의 스레드에서 갱신)
+    schedule.every(INTERVAL_MINUTES).minutes.do(job)
+    heartbeat = coordinator.start_heartbeat() if coordinator is not None else None
+
+    # 시작시 한 번 실행 후 스케줄 실행 (첫 주기에서 중단돼도 체크포인트/임대 반납)
     try:
+        job()
         while True:
             schedule.run_pending()
             time.sleep(1)
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, SystemExit):
         print("\n👋 모니터링 종료")
+    finally:
+        collector.stop()
+        enricher.close()
+        if egress is not None:
+            egress.close()
+        store.checkpoint(state)
+        store.close()
+        spill.close()
+        if coordinator is not None:
+            heartbeat.set()
+            coordinator.release()
+            coordinator.close()
+        if dispatcher is not None:
+            dispatcher.stop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
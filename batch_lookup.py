@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+여러 토큰 일괄 조회 - 스냅샷 버전별 해시 인덱스와 토큰별 JSON 조각 캐시
+
+스냅샷이 바뀔 때 {토큰 키: 토큰} 인덱스를 한 번 만들고, 요청된 필드 조합별로
+토큰 하나의 JSON 조각(bytes)을 처음 요청될 때 인코딩해 둡니다. 응답은 조각을
+이어 붙여 만들기 때문에 같은 버전 동안의 반복 조회는 다시 직렬화하지 않습니다.
+"""
+import json
+import threading
+from collections import OrderedDict
+from snapshot_diff import token_key
+from token_registry import default_registry
+
+# 요청 하나에 조회할 수 있는 최대 토큰 수
+MAX_BATCH_TOKENS = 500
+
+# 버전마다 보관할 필드 조합 수 (넘으면 오래된 조합부터 제거)
+MAX_FIELD_SETS = 32
+
+
+def encode_json(value):
+    """응답 조각용 압축 JSON 인코딩"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def parse_batch_request(body, windows):
+    """요청 본문 검증 - (토큰 식별자 문자열 목록, 필드 튜플 또는 None, 구간 목록) 반환, 잘못되면 ValueError
+
+    본문 예: {"tokens": ["PEPE", "sol:<주소>", 12], "fields": ["price", "change_24h"], "windows": ["1h"]}
+    식별자는 토큰 id(정수), "체인:주소", 심볼 중 하나입니다.
+    """
+    if not isinstance(body, dict):
+        raise ValueError("요청 본문은 JSON 객체여야 합니다")
+
+    keys = body.get('tokens')
+    if not isinstance(keys, list) or not keys or \
+            not all(isinstance(k, (str, int)) and not isinstance(k, bool) for k in keys):
+        raise ValueError("tokens는 토큰 식별자(id, \"체인:주소\", 심볼) 목록이어야 합니다")
+    if len(keys) > MAX_BATCH_TOKENS:
+        raise ValueError(f"한 번에 최대 {MAX_BATCH_TOKENS}개까지 조회할 수 있습니다")
+
+    fields = body.get('fields')
+    if fields is not None:
+        if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+            raise ValueError("fields는 필드 이름 문자열 목록이어야 합니다")
+        fields = tuple(sorted(set(fields)))
+
+    requested = body.get('windows') or []
+    if not isinstance(requested, list) or any(w not in windows for w in requested):
+        raise ValueError(f"windows는 {', '.join(windows)} 중에서 선택해야 합니다")
+
+    # 12와 "12"는 같은 토큰 (응답 키도 같은 문자열) - 문자열로 맞춘 뒤 중복 제거
+    return list(dict.fromkeys(str(k) for k in keys)), fields, list(dict.fromkeys(requested))
+
+
+class SnapshotIndex:
+    """스냅샷 하나의 토큰 해시 인덱스 + 필드 조합별 토큰 JSON 조각"""
+
+    def __init__(self):
+        self.version = None
+        self.tokens = {}
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+        self.encoded = 0
+
+    def rebuild(self, version, tokens):
+        """새 버전의 인덱스 생성 (같은 키가 여러 번 나오면 첫 토큰 사용) - 이전 조각은 버림"""
+        index = {}
+        for token in tokens:
+            key = token_key(token)
+            if key is not None and key not in index:
+                index[key] = token
+        with self._lock:
+            self.version = version
+            self.tokens = index
+            self._fragments = OrderedDict()
+
+    def fragment(self, key, fields=None):
+        """토큰 하나의 JSON 조각 (없는 키면 None) - 필드 조합별로 한 번만 인코딩"""
+        with self._lock:
+            token = self.tokens.get(key)
+            if token is None:
+                return None
+            cache = self._fragments.get(fields)
+            if cache is None:
+                cache = self._fragments[fields] = {}
+                if len(self._fragments) > MAX_FIELD_SETS:
+                    self._fragments.popitem(last=False)
+            else:
+                self._fragments.move_to_end(fields)
+
+            encoded = cache.get(key)
+            if encoded is None:
+                selected = token if fields is None else {f: token[f] for f in fields if f in token}
+                encoded = cache[key] = encode_json(selected)
+                self.encoded += 1
+            return encoded
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def resolve(self, ref):
+        """요청 식별자 → 토큰 id (같은 심볼이 여럿이면 이 스냅샷에 있는 토큰 우선), 모르면 None"""
+        ids = default_registry().resolve(ref)
+        for key in ids:
+            if key in self.tokens:
+                return key
+        return ids[0] if ids else None
+
+    def lookup(self, refs, fields=None):
+        """(찾은 [(요청 식별자, 토큰 id, 조각)], 없는 식별자 목록)"""
+        found, missing = [], []
+        for ref in refs:
+            key = self.resolve(ref)
+            encoded = None if key is None else self.fragment(key, fields)
+            if encoded is None:
+                missing.append(ref)
+            else:
+                found.append((str(ref), key, encoded))
+        return found, missing
+
+
+def encode_batch(version, found, missing, history=None):
+    """조각을 이어 붙여 응답 본문 생성
+
+    found: lookup의 [(요청 식별자, 토큰 id, 조각)] - 응답은 요청 식별자를 키로 사용
+    history: {요청 식별자: {구간: 히스토리 조각}} (구간 히스토리를 요청한 경우)
+    """
+    def members(pairs):
+        return b','.join(encode_json(name) + b':' + value for name, value in pairs)
+
+    parts = [b'{"success":true,"version":', encode_json(version),
+             b',"count":', str(len(found)).encode(),
+             b',"tokens":{', members((ref, encoded) for ref, _, encoded in found), b'}']
+    if history is not None:
+        parts += [b',"history":{',
+                  members((key, b'{' + members(windows.items()) + b'}') for key, windows in history.items()),
+                  b'}']
+    parts += [b',"missing":', encode_json(missing), b'}']
+    return b''.join(parts)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+차트용 시계열 - LTTB(Largest-Triangle-Three-Buckets) 다운샘플링
+"""
+import numpy as np
+
+# 차트 기간 (초)
+RANGES = {'1h': 3600, '24h': 86400, '7d': 7 * 86400}
+
+MIN_WIDTH = 10
+MAX_WIDTH = 5000
+
+
+def lttb(x, y, n_out):
+    """LTTB로 (x, y) 시계열을 n_out개 점으로 축소 - 첫/마지막 점은 항상 유지"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    # 첫/마지막 점을 제외한 구간을 n_out - 2개 버킷으로 분할
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(int)
+    starts, ends = edges[:-1], edges[1:]
+
+    # 각 버킷의 평균 점 (다음 버킷의 대표점으로 사용) - 한 번에 계산
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[1:n - 1], starts - 1) / counts
+    avg_y = np.add.reduceat(y[1:n - 1], starts - 1) / counts
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        bx = x[start:end]
+        by = y[start:end]
+        # 이전 선택점, 버킷 내 후보, 다음 버킷 평균점이 만드는 삼각형 넓이 (x2 생략)
+        area = np.abs((x[prev] - avg_x[i]) * (by - y[prev]) - (x[prev] - bx) * (avg_y[i] - y[prev]))
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+
+    return x[selected], y[selected]
+
+
+def build_series(history, width, field='price'):
+    """히스토리 행 목록을 [[ts, value], ...] 차트 시리즈로 변환"""
+    rows = [(row['ts'], row[field]) for row in history
+            if isinstance(row.get(field), (int, float))]
+    if not rows:
+        return []
+
+    data = np.array(rows, dtype=float)
+    xs, ys = lttb(data[:, 0], data[:, 1], width)
+    return np.column_stack([xs, ys]).tolist()
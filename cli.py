@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+GMGN 트래커 통합 CLI - 하위 명령을 한 프로세스 안에서 실행
+
+무거운 의존성(Flask, requests, pandas, numpy 등)은 해당 하위 명령을 실행할 때만 import하므로
+'ls'처럼 가벼운 명령은 표준 라이브러리만으로 바로 끝납니다.
+
+사용법:
+    python cli.py scrape [--once | --interval 분]
+    python cli.py serve [--port 5000] [--debug]
+    python cli.py monitor
+    python cli.py ls
+    python cli.py export --format csv -o out.csv
+    python cli.py replay --horizon 60
+    python cli.py bench [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+CLI_PATH = os.path.abspath(__file__)
+ROOT = os.path.dirname(CLI_PATH)
+
+# 새 인터프리터에서 명령이 끝날 때까지의 시간 예산 (초)
+COLD_START_BUDGETS = {
+    'ls': 0.3,
+    'scrape --once': 1.5,
+}
+
+# 가벼운 명령에서 import되면 안 되는 모듈
+HEAVY_MODULES = ('flask', 'requests', 'pandas', 'numpy', 'bs4')
+
+# import 시간을 측정할 모듈
+BENCH_MODULES = ('cli', 'storage', 'gmgn_scraper', 'export', 'replay', 'auto_monitor', 'web_app')
+
+
+# --- scrape ---
+
+def configure_scrape(parser):
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--once', action='store_true', help="한 번만 수집 (기본)")
+    mode.add_argument('--interval', type=float, help="N분마다 반복 수집 (상태 유지가 필요하면 monitor 사용)")
+
+
+def run_scrape(args):
+    import gmgn_scraper
+    if not args.interval:
+        gmgn_scraper.main()
+        return 0
+    try:
+        while True:
+            started = time.monotonic()
+            gmgn_scraper.main()
+            time.sleep(max(0.0, args.interval * 60 - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print("\n👋 수집 종료")
+    return 0
+
+
+# --- serve / monitor ---
+
+def configure_serve(parser):
+    parser.add_argument('--host', default='0.0.0.0', help="바인드 주소")
+    parser.add_argument('--port', type=int, help="포트 (기본: 5000-5100 중 빈 포트)")
+    parser.add_argument('--debug', action='store_true', help="Flask 디버그 모드 (코드 변경 시 재시작)")
+
+
+def run_serve(args):
+    import web_app
+    web_app.run_server(args.host, args.port, args.debug)
+    return 0
+
+
+def run_monitor(args):
+    import auto_monitor
+    auto_monitor.main()
+    return 0
+
+
+# --- ls ---
+
+def configure_ls(parser):
+    parser.add_argument('--dir', default='.', help="데이터 파일 디렉토리")
+
+
+def run_ls(args):
+    """수집된 JSON 파일과 data/ 아래 저장소 파일 목록 (표준 라이브러리만 사용)"""
+    print("\n📄 생성된 파일들:")
+    files = sorted(f for f in os.listdir(args.dir) if f.endswith('.json'))
+    for name in files:
+        print(f"  📄 {name} ({os.path.getsize(os.path.join(args.dir, name))} bytes)")
+
+    data_dir = os.path.join(args.dir, 'data')
+    stores = sorted(f for f in os.listdir(data_dir) if os.path.isfile(os.path.join(data_dir, f))) \
+        if os.path.isdir(data_dir) else []
+    for name in stores:
+        print(f"  🗄️ data/{name} ({os.path.getsize(os.path.join(data_dir, name))} bytes)")
+
+    if not files and not stores:
+        print("  아직 데이터 파일이 없습니다.")
+        print("  먼저 'python cli.py scrape'를 실행해보세요.")
+    print()
+    return 0
+
+
+# --- export / replay (각 모듈의 인자 정의 재사용) ---
+
+def configure_export(parser):
+    import export
+    export.build_parser(parser)
+
+
+def run_export(args):
+    import export
+    return export.main(args)
+
+
+def configure_replay(parser):
+    import replay
+    replay.build_parser(parser)
+
+
+def run_replay(args):
+    import replay
+    replay.main(args)
+    return 0
+
+
+# --- bench ---
+
+def configure_bench(parser):
+    parser.add_argument('--runs', type=int, default=5, help="명령별 실행 횟수 (중앙값 사용)")
+
+
+def import_time(module):
+    """새 인터프리터에서 module import에 걸린 누적 시간 (초, python -X importtime)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, cwd=ROOT, check=True)
+    for line in reversed(result.stderr.splitlines()):
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e6
+    return None
+
+
+def cold_start(argv, runs, cwd):
+    """새 인터프리터에서 'cli.py argv' 실행이 끝날 때까지 걸린 시간의 중앙값 (초)"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, CLI_PATH, *argv], cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - started)
+    return sorted(times)[len(times) // 2]
+
+
+def run_bench(args):
+    """모듈 import 시간과 명령별 시작 시간 측정, 예산 초과 시 종료 코드 1"""
+    print("\n⏱️ import 시간 (새 인터프리터, 누적):")
+    for module in BENCH_MODULES:
+        seconds = import_time(module)
+        print(f"   {module:<14} {seconds * 1000:8.1f}ms")
+
+    print(f"\n⏱️ 명령 시작~종료 시간 (중앙값, {args.runs}회):")
+    over = False
+    # 수집 결과 파일이 작업 디렉토리에 생기지 않도록 임시 디렉토리에서 실행
+    with tempfile.TemporaryDirectory() as workdir:
+        for command, budget in COLD_START_BUDGETS.items():
+            seconds = cold_start(command.split(), args.runs, workdir)
+            ok = seconds <= budget
+            over = over or not ok
+            print(f"   {command:<14} {seconds * 1000:8.1f}ms / 예산 {budget * 1000:.0f}ms {'✅' if ok else '❌'}")
+    return 1 if over else 0
+
+
+# 이름 → (설명, 인자 정의, 실행 함수)
+COMMANDS = {
+    'scrape': ("한 번 수집 (gmgn_scraper)", configure_scrape, run_scrape),
+    'serve': ("웹 대시보드 실행 (web_app)", configure_serve, run_serve),
+    'monitor': ("자동 모니터링 실행 (auto_monitor)", None, run_monitor),
+    'ls': ("수집된 파일 목록", configure_ls, run_ls),
+    'export': ("히스토리 내보내기 (export)", configure_export, run_export),
+    'replay': ("알림 규칙 백테스트 (replay)", configure_replay, run_replay),
+    'bench': ("import/시작 시간 측정", configure_bench, run_bench),
+}
+
+
+def build_parser(argv):
+    """실행할 하위 명령의 인자만 정의 (다른 명령의 모듈은 import하지 않음)"""
+    parser = argparse.ArgumentParser(prog='cli.py', description="GMGN 트래커 통합 CLI")
+    subparsers = parser.add_subparsers(dest='command', metavar='command', required=True)
+    chosen = next((arg for arg in argv if not arg.startswith('-')), None)
+    for name, (help_text, configure, _) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text, description=help_text)
+        if name == chosen and configure is not None:
+            configure(subparser)
+    return parser
+
+
+def main(argv=None):
+    """메인 실행 함수 - 종료 코드 반환"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = build_parser(argv).parse_args(argv)
+    return COMMANDS[args.command][2](args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
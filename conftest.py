@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+공통 테스트 설정 - 테스트마다 임시 디렉터리에서 실행해 저장소 루트에 파일을 남기지 않음
+
+토큰 id 등록부, 지표/이상 징후 상태 파일은 테스트마다 새로 만들어 id와 상태가
+테스트 실행/파일 사이에 이어지지 않도록 합니다.
+"""
+import sys
+import pytest
+import anomalies
+import indicators
+import token_registry
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    registry_path = str(tmp_path / 'tokens.db')
+    indicators_path = str(tmp_path / 'indicators.npz')
+    anomalies_path = str(tmp_path / 'anomalies.npz')
+
+    # 하위 프로세스(CLI 테스트 등)도 같은 경로를 쓰도록 환경 변수까지 설정
+    monkeypatch.setenv('GMGN_REGISTRY_PATH', registry_path)
+    monkeypatch.setenv('GMGN_INDICATORS_PATH', indicators_path)
+    monkeypatch.setenv('GMGN_ANOMALIES_PATH', anomalies_path)
+    monkeypatch.setattr(token_registry, 'REGISTRY_PATH', registry_path)
+    monkeypatch.setattr(indicators, 'INDICATORS_PATH', indicators_path)
+    monkeypatch.setattr(indicators.IndicatorEngine, 'default_path', indicators_path)
+    monkeypatch.setattr(anomalies, 'ANOMALIES_PATH', anomalies_path)
+    monkeypatch.setattr(anomalies.AnomalyDetector, 'default_path', anomalies_path)
+    monkeypatch.setitem(token_registry._default, 'registry', None)
+
+    # 웹 앱의 최신 스냅샷 캐시는 테스트마다 다시 읽음
+    web_app = sys.modules.get('web_app')
+    if web_app is not None:
+        web_app.invalidate_snapshot()
+
+    # latest.json, gmgn_data_*.json, data/ 등 상대 경로 출력은 임시 디렉터리로
+    monkeypatch.chdir(tmp_path)
+    yield
+    registry = token_registry._default['registry']
+    if registry is not None:
+        registry.close()
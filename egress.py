@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+외부 요청 경로(egress) 풀 - 여러 HTTP 프록시로 요청을 나눠 보내서 수집량 확대
+
+경로마다 대상 호스트별 토큰 버킷 예산, 성공률 기반 건강 점수, 서킷 브레이커를 두고,
+요청마다 예산이 남아 있고 건강한 경로를 골라 보냅니다.
+실패(연결 오류, 429, 5xx)한 요청은 다른 경로로 다시 시도합니다.
+
+설정: GMGN_EGRESS_PROXIES="http://proxy1:8080,http://user:pw@proxy2:8080,direct"
+      (비어 있으면 풀을 만들지 않고 수집기가 requests로 직접 요청)
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 경로 × 대상 호스트별 초당 요청 수와 순간 허용량
+EGRESS_RATE = float(os.environ.get('GMGN_EGRESS_RATE', '0.5'))
+EGRESS_BURST = float(os.environ.get('GMGN_EGRESS_BURST', '3'))
+
+# 연속 실패 FAILURE_THRESHOLD번이면 RESET_TIMEOUT초 동안 경로 차단 후 한 번 시험 요청
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 30.0
+
+# 건강 점수 (성공률 지수이동평균) 반영 비율
+HEALTH_ALPHA = 0.2
+
+# 처리량 집계 구간 (초)
+THROUGHPUT_WINDOW = 60.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DIRECT = 'direct'
+
+
+class EgressUnavailable(RuntimeError):
+    """대기 시간 안에 요청을 보낼 수 있는 경로가 없음"""
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 요청 예산"""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self):
+        self._refill()
+        return self._tokens
+
+    def try_acquire(self, count=1):
+        self._refill()
+        if self._tokens < count:
+            return False
+        self._tokens -= count
+        return True
+
+    def wait_time(self, count=1):
+        """count개가 쌓일 때까지 남은 시간 (초)"""
+        self._refill()
+        if self._tokens >= count:
+            return 0.0
+        return (count - self._tokens) / self.rate if self.rate > 0 else float('inf')
+
+    def drain(self):
+        """상대가 속도 제한(429)을 알려 오면 남은 예산을 비움"""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+
+
+class CircuitBreaker:
+    """closed → (연속 실패) → open → (reset_timeout 경과) → half_open → 시험 요청 결과로 전환"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self.trips = 0
+
+    def allows(self):
+        """지금 요청을 보낼 수 있는지 (상태는 바꾸지 않음)"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return self.retry_in() == 0.0
+        return not self._trial
+
+    def retry_in(self):
+        """open 상태가 풀릴 때까지 남은 시간 (초)"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+
+    def on_request(self):
+        if self.state == self.OPEN:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            self._trial = True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+
+def route_name(proxy):
+    """프록시 URL에서 인증 정보를 뺀 표시용 이름"""
+    if not proxy:
+        return DIRECT
+    parsed = urlparse(proxy)
+    return f"{parsed.hostname}:{parsed.port}" if parsed.port else parsed.hostname or proxy
+
+
+class EgressRoute:
+    """경로 하나 - 프록시 세션, 호스트별 예산, 브레이커, 통계"""
+
+    def __init__(self, proxy=None, rate=EGRESS_RATE, burst=EGRESS_BURST, failure_threshold=FAILURE_THRESHOLD,
+                 reset_timeout=RESET_TIMEOUT, pool_size=4, clock=time.monotonic):
+        self.proxy = proxy
+        self.name = route_name(proxy)
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, clock)
+        self.health = 1.0
+        self._buckets = {}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if proxy:
+            # 환경변수(NO_PROXY 등)로 프록시를 우회하지 않도록 고정
+            self.session.trust_env = False
+            self.session.proxies = {'http': proxy, 'https': proxy}
+
+        self.stats = {'requests': 0, 'succeeded': 0, 'failed': 0, 'throttled': 0}
+        self._latency_total = 0.0
+        self._completed = deque()
+
+    def bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst, self.clock)
+        return bucket
+
+    def record(self, ok, latency, throttled=False):
+        self.health += HEALTH_ALPHA * ((1.0 if ok else 0.0) - self.health)
+        self._latency_total += latency
+        self.stats['succeeded' if ok else 'failed'] += 1
+        if throttled:
+            self.stats['throttled'] += 1
+        if ok:
+            self.breaker.record_success()
+            now = self.clock()
+            self._completed.append(now)
+            while self._completed and self._completed[0] < now - THROUGHPUT_WINDOW:
+                self._completed.popleft()
+        else:
+            self.breaker.record_failure()
+
+    def report(self):
+        now = self.clock()
+        recent = sum(1 for ts in self._completed if ts >= now - THROUGHPUT_WINDOW)
+        done = self.stats['succeeded'] + self.stats['failed']
+        return {
+            'name': self.name,
+            'state': self.breaker.state,
+            'health': round(self.health, 3),
+            **self.stats,
+            'error_rate': round(self.stats['failed'] / done, 3) if done else 0.0,
+            'per_minute': round(recent * 60.0 / THROUGHPUT_WINDOW, 1),
+            'latency_avg_ms': round(self._latency_total / done * 1000, 1) if done else 0.0,
+            'trips': self.breaker.trips,
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class EgressPool:
+    """경로 풀 - 예산이 남은 건강한 경로를 골라 요청하고 실패하면 다른 경로로 재시도"""
+
+    def __init__(self, proxies=None, rate=EGRESS_RATE, burst=EGRESS_BURST, failure_threshold=FAILURE_THRESHOLD,
+                 reset_timeout=RESET_TIMEOUT, max_attempts=3, wait_timeout=30.0, clock=time.monotonic,
+                 sleep=time.sleep):
+        proxies = list(proxies or [None])
+        self.routes = [EgressRoute(None if p in (None, '', DIRECT) else p, rate, burst, failure_threshold,
+                                   reset_timeout, clock=clock) for p in proxies]
+        self.max_attempts = max_attempts
+        self.wait_timeout = wait_timeout
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._turn = 0
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """GMGN_EGRESS_PROXIES로 풀 생성, 설정이 없으면 None (기본 수집 경로에는 풀을 두지 않음)"""
+        proxies = [p.strip() for p in os.environ.get('GMGN_EGRESS_PROXIES', '').split(',') if p.strip()]
+        return cls(proxies, **kwargs) if proxies else None
+
+    def _pick(self, host, exclude):
+        """예산과 브레이커가 허락하는 경로 중 (건강 점수 × 남은 예산)이 가장 큰 경로
+
+        고른 경로가 없으면 (None, 다시 확인할 때까지 기다릴 시간)
+        """
+        best, best_score, wait = None, 0.0, float('inf')
+        count = len(self.routes)
+        for offset in range(count):
+            # 점수가 같으면 돌아가며 선택
+            route = self.routes[(self._turn + offset) % count]
+            if route in exclude and len(exclude) < count:
+                continue
+            if not route.breaker.allows():
+                wait = min(wait, route.breaker.retry_in() or 0.05)
+                continue
+            bucket = route.bucket(host)
+            available = bucket.available()
+            if available < 1:
+                wait = min(wait, bucket.wait_time())
+                continue
+            score = max(route.health, 0.01) * available
+            if score > best_score:
+                best, best_score = route, score
+
+        if best is None:
+            return None, wait
+        best.bucket(host).try_acquire()
+        best.breaker.on_request()
+        best.stats['requests'] += 1
+        self._turn = (self.routes.index(best) + 1) % count
+        return best, 0.0
+
+    def acquire(self, host, exclude=()):
+        """요청을 보낼 경로 하나를 예약 (예산이 찰 때까지 최대 wait_timeout초 대기)"""
+        deadline = self.clock() + self.wait_timeout
+        while True:
+            with self._lock:
+                route, wait = self._pick(host, exclude)
+            if route is not None:
+                return route
+            remaining = deadline - self.clock()
+            if remaining <= 0 or wait == float('inf'):
+                raise EgressUnavailable(f"{host}: 사용 가능한 egress 경로가 없습니다")
+            self.sleep(min(wait, remaining))
+
+    def request(self, method, url, **kwargs):
+        """경로를 골라 요청 - 연결 오류/429/5xx는 다른 경로로 최대 max_attempts번 시도"""
+        host = urlparse(url).netloc
+        tried = []
+        response = None
+        for attempt in range(self.max_attempts):
+            try:
+                route = self.acquire(host, exclude=tried)
+            except EgressUnavailable:
+                # 재시도할 경로가 없으면 마지막 실패 응답을 그대로 반환
+                if response is None:
+                    raise
+                return response
+            tried.append(route)
+            started = time.perf_counter()
+            try:
+                response = route.session.request(method, url, **kwargs)
+            except requests.RequestException:
+                with self._lock:
+                    route.record(False, time.perf_counter() - started)
+                if attempt == self.max_attempts - 1:
+                    raise
+                continue
+
+            ok = response.status_code not in RETRY_STATUSES
+            with self._lock:
+                route.record(ok, time.perf_counter() - started, throttled=response.status_code == 429)
+                if response.status_code == 429:
+                    route.bucket(host).drain()
+            if ok:
+                return response
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def report(self):
+        with self._lock:
+            return [route.report() for route in self.routes]
+
+    def close(self):
+        for route in self.routes:
+            route.close()
+
+
+def print_egress_report(pool):
+    """경로별 처리량/오류율 출력 (풀이 없으면 출력하지 않음)"""
+    if pool is None:
+        return
+    print("\n🌐 egress 경로:")
+    for route in pool.report():
+        print(f"   {route['name']:<21} {route['state']:<9} 요청 {route['requests']}건, "
+              f"분당 {route['per_minute']}건, 오류율 {route['error_rate'] * 100:.1f}%, "
+              f"건강 {route['health']:.2f}, 평균 {route['latency_avg_ms']}ms")
+
+
+class FakeProxy:
+    """테스트용 로컬 HTTP 프록시 대역 - 프록시로 들어온 요청에 직접 응답하고 기록"""
+
+    def __init__(self, name='proxy', status=200, fail_first=0):
+        self.name = name
+        self.status = status
+        self.fail_first = fail_first
+        self.requests = []
+        self._lock = threading.Lock()
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with proxy._lock:
+                    proxy.requests.append(self.path)
+                    status = 503 if len(proxy.requests) <= proxy.fail_first else proxy.status
+                body = json.dumps({'via': proxy.name, 'url': self.path}).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+토큰 상세 정보 보강 - 홀더 수, 유동성, 상위 10 홀더 비율, 생성 시각
+
+새로 등장했거나 알림 대상인 토큰은 바로 상세 페이지를 조회하고, 캐시가 만료된 나머지 토큰은
+주기마다 REFRESH_LIMIT개씩 돌아가며 다시 조회합니다 (유동성 급감 판단용). 결과는 TTL 캐시에 보관하고
+조회 시각(enriched_at)을 함께 붙입니다.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from memory_budget import DICT_ENTRY_BYTES, SpillableDict, estimate_size
+from snapshot_diff import token_key, token_label
+
+DETAIL_FIELDS = ('holders', 'liquidity', 'top10_share', 'created_at')
+
+# 한 번의 enrich에서 캐시가 만료된 일반 토큰을 다시 조회하는 최대 개수
+REFRESH_LIMIT = int(os.environ.get('GMGN_ENRICH_REFRESH', '50'))
+
+
+class TTLCache:
+    """만료 시간(TTL)과 최대 크기(LRU 제거)가 있는 캐시"""
+
+    def __init__(self, ttl=600.0, max_size=5000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < self.clock():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self.clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._data)
+
+    def memory_usage(self, sample=16):
+        """최근 항목 일부를 표본으로 추정한 메모리 사용량"""
+        with self._lock:
+            items = list(self._data.items())[-sample:]
+            if not items:
+                return 0
+            per_item = sum(estimate_size(k) + estimate_size(v) for k, v in items) / len(items)
+            return int((per_item + DICT_ENTRY_BYTES) * len(self._data))
+
+    def evict(self, count):
+        """가장 오래 사용되지 않은 항목 count개 제거 (캐시는 다시 조회하면 되므로 디스크에 두지 않음)"""
+        with self._lock:
+            count = min(count, len(self._data))
+            for _ in range(count):
+                self._data.popitem(last=False)
+            self.evictions += count
+            return count
+
+    def stats(self):
+        return {'size': len(self._data), 'max_size': self.max_size,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+def detail_url(token):
+    """토큰 상세 페이지 URL"""
+    chain = token.get('chain', 'sol')
+    return f"https://gmgn.ai/{chain}/token/{token.get('address') or token.get('symbol')}"
+
+
+def fetch_token_detail(token, egress=None):
+    """토큰 상세 페이지에서 추가 정보 수집 (egress 풀이 있으면 프록시 경로로 분산 요청)"""
+    url = detail_url(token)
+
+    # 실제 요청은 일단 주석처리하고 Mock 데이터 사용
+    # response = (egress or requests).get(url, headers=headers, timeout=10)
+    # response.raise_for_status()
+
+    # 심볼 기반으로 항상 같은 Mock 값 생성
+    seed = int(hashlib.md5(url.encode('utf-8')).hexdigest()[:8], 16)
+    return {
+        'holders': 500 + seed % 20000,
+        'liquidity': float(token.get('market_cap') or 0) * (0.05 + (seed % 20) / 100),
+        'top10_share': 10.0 + (seed % 600) / 10,
+        'created_at': (datetime(2024, 1, 1) + timedelta(hours=seed % 8760)).isoformat(),
+    }
+
+
+class Enricher:
+    """워커 풀 + 호스트별 동시성 제한으로 상세 정보 조회"""
+
+    def __init__(self, fetch=fetch_token_detail, max_workers=8, per_host_limit=2, cache=None, spill=None,
+                 refresh_limit=REFRESH_LIMIT):
+        self.fetch = fetch
+        self.per_host_limit = per_host_limit
+        self.refresh_limit = refresh_limit
+        self.cache = cache if cache is not None else TTLCache()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='enrich')
+        self._host_slots = {}
+        # 이미 본 토큰 (메모리 예산 초과 시 디스크로 이동)
+        self.seen = SpillableDict('enrichment:seen', spill)
+        self._lock = threading.Lock()
+        self.fetched = 0
+        self.errors = 0
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    def _fetch_one(self, key, token):
+        with self._host_slot(detail_url(token)):
+            detail = dict(self.fetch(token), enriched_at=time.time())
+        self.cache.set(key, detail)
+        return detail
+
+    def enrich(self, tokens, priority=None, key=None):
+        """상세 정보를 붙인 토큰 목록 반환
+
+        새 토큰과 priority(token)가 참인 토큰은 조회하고, 캐시가 만료된 나머지 토큰은
+        refresh_limit개까지만 다시 조회합니다 (다시 조회한 토큰은 TTL 동안 캐시되므로 다음 주기에는 다른 토큰).
+        """
+        key = key or token_key
+        details = {}
+        futures = {}
+        refresh = self.refresh_limit
+
+        for token in tokens:
+            k = key(token)
+            cached = self.cache.get(k)
+            if cached is not None:
+                details[k] = cached
+                continue
+
+            with self._lock:
+                is_new = self.seen.get(k) is None
+                self.seen[k] = True
+            if k in futures:
+                continue
+            if is_new or (priority and priority(token)):
+                futures[k] = self._executor.submit(self._fetch_one, k, token)
+            elif refresh > 0:
+                refresh -= 1
+                futures[k] = self._executor.submit(self._fetch_one, k, token)
+
+        for k, future in futures.items():
+            try:
+                details[k] = future.result()
+                self.fetched += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"   ⚠️ 상세 정보 조회 실패 ({token_label(k)}): {e}")
+
+        return [dict(token, **details[key(token)]) if key(token) in details else token
+                for token in tokens]
+
+    def stats(self):
+        return dict(self.cache.stats(), fetched=self.fetched, errors=self.errors)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
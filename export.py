@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+히스토리 내보내기 - 기간/체인/심볼/컬럼으로 걸러서 CSV, NDJSON, Parquet으로 스트리밍
+
+스냅샷을 하나씩 읽어 행을 생성하고 chunk_rows개 단위로 인코딩해 내보내므로,
+전체 크기와 관계없이 메모리 사용량이 일정합니다 (웹 응답도 조각 단위로 전송).
+Parquet은 pyarrow가 설치되어 있을 때만 지원합니다.
+"""
+import argparse
+import csv
+import io
+import json
+import re
+import sys
+import time
+import storage
+from replay import parse_time
+from token_registry import DEFAULT_CHAIN
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 의존성
+    pa = None
+    pq = None
+
+FORMATS = ('csv', 'ndjson', 'parquet')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+DEFAULT_COLUMNS = ['ts', 'rank', 'chain', 'symbol', 'name', 'price', 'change_24h',
+                   'market_cap', 'volume_24h', 'timestamp']
+
+# Parquet 컬럼 타입 (목록에 없는 컬럼은 문자열)
+NUMERIC_COLUMNS = {'ts', 'price', 'change_24h', 'market_cap', 'volume_24h', 'liquidity', 'top10_share'}
+INTEGER_COLUMNS = {'rank', 'holders', 'id'}
+
+PARQUET_REQUIRED = "Parquet 내보내기에는 pyarrow가 필요합니다 (pip install pyarrow)"
+
+COLUMN_PATTERN = re.compile(r'^\w+$')
+CHUNK_ROWS = 5000
+
+def parse_columns(text):
+    """쉼표로 구분된 컬럼 목록 (비어 있으면 기본 컬럼)"""
+    columns = [c.strip() for c in (text or '').split(',') if c.strip()]
+    for column in columns:
+        if not COLUMN_PATTERN.match(column):
+            raise ValueError(f"잘못된 컬럼 이름: {column}")
+    return columns or list(DEFAULT_COLUMNS)
+
+
+def parse_list(text):
+    """쉼표로 구분된 값 집합 (비어 있으면 None = 전체)"""
+    values = {v.strip() for v in (text or '').split(',') if v.strip()}
+    return values or None
+
+
+def iter_rows(start=None, end=None, chains=None, symbols=None, columns=None, directory='.'):
+    """조건에 맞는 토큰 행을 스냅샷 순서대로 생성 (컬럼 순서의 튜플)"""
+    columns = columns or DEFAULT_COLUMNS
+    for ts, tokens in storage.iter_snapshots(start, end, directory):
+        for rank, token in enumerate(tokens):
+            if chains is not None and (token.get('chain') or DEFAULT_CHAIN) not in chains:
+                continue
+            if symbols is not None and token.get('symbol') not in symbols:
+                continue
+            row = dict(token, ts=ts, rank=rank)
+            row.setdefault('chain', DEFAULT_CHAIN)
+            yield tuple(row.get(column) for column in columns)
+
+
+def iter_chunks(rows, size=CHUNK_ROWS):
+    """행 생성기를 size개 단위의 목록으로 묶음"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_csv(rows, columns, chunk_rows=CHUNK_ROWS):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in iter_chunks(rows, chunk_rows):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def stream_ndjson(rows, columns, chunk_rows=CHUNK_ROWS):
+    for chunk in iter_chunks(rows, chunk_rows):
+        lines = (json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) for row in chunk)
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class _ChunkSink:
+    """ParquetWriter가 쓰는 바이트를 모아 두었다가 조각 단위로 꺼내는 파일 객체"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_type(column):
+    if column in NUMERIC_COLUMNS:
+        return pa.float64()
+    if column in INTEGER_COLUMNS:
+        return pa.int64()
+    return pa.string()
+
+
+def _arrow_value(column, value):
+    if value is None or column in NUMERIC_COLUMNS or column in INTEGER_COLUMNS:
+        return value
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+
+
+def stream_parquet(rows, columns, chunk_rows=CHUNK_ROWS):
+    """chunk_rows개마다 row group 하나를 기록하고 그때까지의 바이트를 내보냄"""
+    if pa is None:
+        raise RuntimeError(PARQUET_REQUIRED)
+
+    schema = pa.schema([(column, _arrow_type(column)) for column in columns])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in iter_chunks(rows, chunk_rows):
+            arrays = [pa.array([_arrow_value(column, row[i]) for row in chunk], type=schema.field(i).type)
+                      for i, column in enumerate(columns)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+STREAMERS = {'csv': stream_csv, 'ndjson': stream_ndjson, 'parquet': stream_parquet}
+
+
+def export(fmt, start=None, end=None, chains=None, symbols=None, columns=None, directory='.',
+           chunk_rows=CHUNK_ROWS):
+    """내보내기 바이트 조각 생성기"""
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} (가능: {', '.join(FORMATS)})")
+    if fmt == 'parquet' and pa is None:
+        raise RuntimeError(PARQUET_REQUIRED)
+
+    columns = columns or list(DEFAULT_COLUMNS)
+    rows = iter_rows(start, end, chains, symbols, columns, directory)
+    return STREAMERS[fmt](rows, columns, chunk_rows)
+
+
+def build_parser(parser=None):
+    parser = parser or argparse.ArgumentParser(description="히스토리 내보내기")
+    parser.add_argument('--format', choices=FORMATS, default='csv', help="출력 형식")
+    parser.add_argument('--output', '-o', default='-', help="출력 파일 (기본: 표준 출력)")
+    parser.add_argument('--start', help="시작 시각 (ISO 또는 epoch)")
+    parser.add_argument('--end', help="종료 시각 (ISO 또는 epoch)")
+    parser.add_argument('--chain', help="체인 (쉼표 구분, 예: sol,eth)")
+    parser.add_argument('--symbol', help="심볼 (쉼표 구분)")
+    parser.add_argument('--columns', help=f"컬럼 (쉼표 구분, 기본: {','.join(DEFAULT_COLUMNS)})")
+    parser.add_argument('--dir', default='.', help="JSON 아카이브 디렉토리")
+    return parser
+
+
+def main(args=None):
+    """메인 실행 함수"""
+    if args is None:
+        args = build_parser().parse_args()
+
+    try:
+        chunks = export(args.format, parse_time(args.start), parse_time(args.end), parse_list(args.chain),
+                        parse_list(args.symbol), parse_columns(args.columns), args.dir)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    written = 0
+    out = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+    if args.output != '-':
+        print(f"💾 내보내기 완료: {args.output} ({written / 1024:.1f}KB, {time.perf_counter() - started:.2f}초)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,67 +2,107 @@
 """
 GMGN 간단 스크래퍼 - MVP 버전
 """
-import requests
+import os
+import functools
 import json
-import time
+import threading
 from datetime import datetime
-from bs4 import BeautifulSoup
+import storage
+import notifier
+from pipeline import Pipeline, Stage
+from egress import EgressPool, print_egress_report
+from enrichment import Enricher, fetch_token_detail
+from indicators import IndicatorEngine
+from anomalies import AnomalyDetector
+from validation import Validator, QUARANTINE_PATH, normalize
+from token_registry import default_registry
 
-def scrape_gmgn():
-    """GMGN trending 페이지에서 데이터 수집"""
-    print("🚀 GMGN 데이터 수집 시작...")
-    
-    url = "https://gmgn.ai/?chain=sol&tab=home"
+# 수집 대상 (chain:tab 목록) - 예: GMGN_TARGETS="sol:home,eth:home"
+TARGETS = [tuple(t.split(':', 1)) for t in os.environ.get('GMGN_TARGETS', 'sol:home').split(',') if t]
+
+# 급등 알림 기준 (24시간 변동률 %)
+ALERT_THRESHOLD = 30
+
+def fetch_trending(chain='sol', tab='home'):
+    """GMGN trending 페이지 원본 수집"""
+    url = f"https://gmgn.ai/?chain={chain}&tab={tab}"
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     }
     
+    # 실제 요청은 일단 주석처리하고 Mock 데이터 사용
+    # response = requests.get(url, headers=headers, timeout=10)
+    # response.raise_for_status()
+    # return {'chain': chain, 'tab': tab, 'url': url, 'html': response.text}
+    
+    # Mock 데이터로 시작 (실제 파싱은 나중에)
+    mock_data = [
+        {
+            'symbol': 'PEPE',
+            'name': 'Pepe Token',
+            'price': 0.000012,
+            'change_24h': 45.2,
+            'market_cap': 5000000,
+            'volume_24h': 2500000,
+            'timestamp': datetime.now().isoformat()
+        },
+        {
+            'symbol': 'DOGE',
+            'name': 'Dogecoin Style', 
+            'price': 0.0025,
+            'change_24h': -12.5,
+            'market_cap': 10000000,
+            'volume_24h': 3000000,
+            'timestamp': datetime.now().isoformat()
+        },
+        {
+            'symbol': 'MOON',
+            'name': 'Moon Token',
+            'price': 0.15,
+            'change_24h': 125.8,
+            'market_cap': 25000000,
+            'volume_24h': 8000000,
+            'timestamp': datetime.now().isoformat()
+        }
+    ]
+    
+    return {'chain': chain, 'tab': tab, 'url': url, 'records': mock_data}
+
+def parse_trending(raw):
+    """수집한 원본에서 토큰 목록 추출 (수집 대상 체인 표시)"""
+    # HTML 파싱(BeautifulSoup)은 실제 요청을 켤 때 이 함수 안에서 import (시작 시간 단축)
+    chain = raw.get('chain')
+    records = raw.get('records', [])
+    if not chain:
+        return records
+    return [{'chain': chain, **record} if isinstance(record, dict) else record for record in records]
+
+def scrape_gmgn(chain='sol', tab='home'):
+    """GMGN trending 페이지에서 데이터 수집"""
+    print("🚀 GMGN 데이터 수집 시작...")
+    
     try:
-        # 실제 요청은 일단 주석처리하고 Mock 데이터 사용
-        # response = requests.get(url, headers=headers, timeout=10)
-        # response.raise_for_status()
-        
-        # Mock 데이터로 시작 (실제 파싱은 나중에)
-        mock_data = [
-            {
-                'symbol': 'PEPE',
-                'name': 'Pepe Token',
-                'price': 0.000012,
-                'change_24h': 45.2,
-                'market_cap': 5000000,
-                'volume_24h': 2500000,
-                'timestamp': datetime.now().isoformat()
-            },
-            {
-                'symbol': 'DOGE',
-                'name': 'Dogecoin Style', 
-                'price': 0.0025,
-                'change_24h': -12.5,
-                'market_cap': 10000000,
-                'volume_24h': 3000000,
-                'timestamp': datetime.now().isoformat()
-            },
-            {
-                'symbol': 'MOON',
-                'name': 'Moon Token',
-                'price': 0.15,
-                'change_24h': 125.8,
-                'market_cap': 25000000,
-                'volume_24h': 8000000,
-                'timestamp': datetime.now().isoformat()
-            }
-        ]
+        data = Validator(QUARANTINE_PATH).validate(parse_trending(fetch_trending(chain, tab)))
+        default_registry().assign(data)
         
-        print(f"✅ {len(mock_data)}개 토큰 데이터 수집 완료")
-        return mock_data
+        print(f"✅ {len(data)}개 토큰 데이터 수집 완료")
+        return data
         
     except Exception as e:
         print(f"❌ 스크래핑 실패: {e}")
         return []
 
 def save_data(data):
-    """데이터를 JSON 파일에 저장"""
+    """데이터를 저장 (기본: JSON 파일, GMGN_STORAGE=sqlite 이면 SQLite)"""
+    if storage.STORAGE_BACKEND == 'sqlite':
+        try:
+            snapshot_id = storage.save_snapshot(data)
+            print(f"💾 데이터 저장 완료: {storage.DB_PATH} (snapshot #{snapshot_id})")
+        except Exception as e:
+            print(f"❌ 저장 실패: {e}")
+        return
+
     # 마이크로초 단위까지 포함하여 파일명 유니크하게 생성
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]  # 밀리초까지
     filename = f"gmgn_data_{timestamp}.json"
@@ -73,55 +113,203 @@ def save_data(data):
         
         print(f"💾 데이터 저장 완료: {filename}")
         
-        # 최신 데이터를 latest.json으로도 저장
+        # 최신 데이터를 latest.json으로도 저장 - 수정 시각을 아카이브 시각과 맞춰
+        # 웹 앱이 같은 스냅샷을 아카이브(warm_leaderboard)와 같은 시각으로 반영하도록 함
         with open('latest.json', 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        ts = storage.snapshot_file_time(filename)
+        os.utime('latest.json', (ts, ts))
             
     except Exception as e:
         print(f"❌ 저장 실패: {e}")
 
-def check_alerts(data):
-    """급등 토큰 알림 확인"""
+def check_alerts(data, dispatcher=None, alerting=None):
+    """급등 토큰 알림 확인 (dispatcher가 있으면 알림 큐로 전달)
+
+    data는 검증 단계(validation)를 거친 토큰 목록이라고 가정합니다.
+    alerting(급등 상태인 토큰 id 집합)을 넘기면 급등 상태로 새로 들어온 토큰만 알리고,
+    이번 목록에서 기준 아래로 내려간 토큰은 집합에서 빼서 다음 급등 때 다시 알립니다.
+    """
     print("\n🚨 급등 토큰 확인 중...")
-    
+
+    try:
+        pumping = [token for token in data if token['change_24h'] > ALERT_THRESHOLD]  # 30% 이상 상승
+    except (KeyError, TypeError, AttributeError):
+        # 검증되지 않은 데이터 - 배치 전체를 한 번 정규화한 뒤 다시 계산
+        print("   ⚠️ 검증되지 않은 데이터, 정규화 후 확인")
+        data, _, _ = normalize(data)
+        pumping = [token for token in data if token['change_24h'] > ALERT_THRESHOLD]
+
+    rising = pumping
+    if alerting is not None:
+        registry = default_registry()
+        keys = {registry.key(token) for token in pumping}
+        alerting.difference_update({registry.key(token) for token in data} - keys)
+        rising = [token for token in pumping if registry.key(token) not in alerting]
+        alerting.update(keys)
+
     alerts = []
-    for token in data:
-        try:
-            # 필수 필드가 있는지 확인 후 처리
-            if 'change_24h' in token and 'symbol' in token:
-                if token['change_24h'] > 30:  # 30% 이상 상승
-                    alert_msg = f"🚀 급등 알림: {token['symbol']} (+{token['change_24h']:.1f}%)"
-                    print(alert_msg)
-                    alerts.append(alert_msg)
-        except (KeyError, TypeError, ValueError) as e:
-            # 잘못된 데이터는 무시하고 계속 진행
-            print(f"   ⚠️ 토큰 데이터 오류 무시: {e}")
-            continue
-    
-    if not alerts:
+    for token in rising:
+        alert_msg = f"🚀 급등 알림: {token['symbol']} (+{token['change_24h']:.1f}%)"
+        print(alert_msg)
+        alerts.append(alert_msg)
+        if dispatcher is not None:
+            dispatcher.submit(alert_msg)
+
+    if not pumping:
         print("   현재 급등하는 토큰이 없습니다.")
-    
+    elif not alerts:
+        print(f"   새로 급등한 토큰이 없습니다. (급등 유지 {len(pumping)}개)")
+
+    return alerts
+
+def check_anomalies(data, detector, dispatcher=None):
+    """이상 징후(급락/거래량 이상치/유동성·시가총액 급감) 확인 - 급등 알림과 같은 채널로 전달"""
+    alerts = []
+    for _, _, alert_msg in detector.update(data):
+        print(alert_msg)
+        alerts.append(alert_msg)
+        if dispatcher is not None:
+            dispatcher.submit(alert_msg)
     return alerts
 
+def is_pumping(token):
+    """급등 알림 대상인지 확인"""
+    change = token.get('change_24h')
+    return isinstance(change, (int, float)) and change > ALERT_THRESHOLD
+
+def merge_snapshots(parts):
+    """대상별 토큰 목록을 하나의 스냅샷으로 합침 (여러 대상에 나온 토큰은 처음 나온 것 하나만)"""
+    registry = default_registry()
+    merged, seen = [], set()
+    for data in parts:
+        for token in data:
+            key = registry.key(token)
+            if key is None or key not in seen:
+                seen.add(key)
+                merged.append(token)
+    return merged
+
+def create_pipeline(dispatcher=None, results=None, enricher=None, indicators=None, validator=None,
+                    detector=None, fetch_workers=2, parse_workers=1, enrich_workers=1,
+                    persist_workers=1, evaluate_workers=1, queue_size=8):
+    """fetch → parse(+검증) → enrich → persist → evaluate 단계별 수집 파이프라인 생성
+
+    여러 대상(GMGN_TARGETS)을 수집하면 persist 단계가 대상별 최근 결과를 합친 스냅샷 하나를 저장하므로
+    latest.json(또는 SQLite 최신 스냅샷)에 마지막으로 처리한 대상만 남지 않습니다.
+    detector(AnomalyDetector)와 급등 알림 상태는 토큰별로 갱신되므로 evaluate 단계는 작업자 1개로 실행합니다.
+    급등 알림은 파이프라인이 살아 있는 동안(모니터의 여러 주기) 토큰마다 급등 상태로 들어올 때 한 번만 보냅니다.
+    """
+    results = [] if results is None else results
+    alerting = set()
+    latest = {}   # (체인, 탭) → 마지막으로 수집한 토큰 목록
+    latest_lock = threading.Lock()
+    enricher = enricher if enricher is not None else Enricher()
+    validator = validator if validator is not None else Validator()
+
+    def fetch(target):
+        chain, tab = target
+        print(f"🚀 GMGN 데이터 수집 시작... ({chain}/{tab})")
+        return fetch_trending(chain, tab)
+
+    def parse(raw):
+        records = parse_trending(raw)
+        data = default_registry().assign(validator.validate(records))
+        rejected = len(records) - len(data)
+        print(f"✅ {len(data)}개 토큰 데이터 수집 완료" + (f" (격리 {rejected}개)" if rejected else ""))
+        return ((raw.get('chain'), raw.get('tab')), data) if data else None
+
+    def enrich(item):
+        # 새 토큰과 급등 토큰만 상세 페이지 조회 (나머지는 캐시 사용)
+        target, data = item
+        return target, enricher.enrich(data, priority=is_pumping)
+
+    def persist(item):
+        target, data = item
+        with latest_lock:
+            latest[target] = data
+            save_data(merge_snapshots(latest.values()))
+        if indicators is not None:
+            indicators.update(data)
+        return data
+
+    def evaluate(data):
+        alerts = check_alerts(data, dispatcher, alerting)
+        if detector is not None:
+            alerts += check_anomalies(data, detector, dispatcher)
+        results.append((data, alerts))
+
+    return Pipeline([
+        Stage('fetch', fetch, workers=fetch_workers, queue_size=queue_size),
+        Stage('parse', parse, workers=parse_workers, queue_size=queue_size),
+        Stage('enrich', enrich, workers=enrich_workers, queue_size=queue_size),
+        Stage('persist', persist, workers=persist_workers, queue_size=queue_size),
+        Stage('evaluate', evaluate, workers=evaluate_workers, queue_size=queue_size),
+    ])
+
+def print_pipeline_stats(stats):
+    """단계별 처리 통계 출력"""
+    print("\n⏱️ 단계별 통계:")
+    for name, stage in stats.items():
+        print(f"   {name:<9} 처리 {stage['processed']}건, 오류 {stage['errors']}건, "
+              f"평균 {stage['latency_avg'] * 1000:.1f}ms, 최대 큐 {stage['queue_max_depth']}/{stage['queue_capacity']}")
+
+def print_validation_stats(stats):
+    """검증 단계 집계 출력"""
+    reasons = ', '.join(f"{reason} {count}" for reason, count in stats['reasons'].items())
+    print(f"🧹 검증: 정상 {stats['accepted']}개, 격리 {stats['rejected']}개, 문자열 변환 {stats['coerced']}개"
+          + (f" ({reasons})" if reasons else ""))
+
+def print_anomaly_stats(stats):
+    """이상 징후 누적 탐지 건수 출력"""
+    print(f"🧨 이상 징후: 유동성 급감 {stats['liquidity_pull']}건, 시가총액 급감 {stats['market_cap_collapse']}건, "
+          f"급락 {stats['dump']}건, 급등 {stats['spike']}건, 거래량 {stats['volume']}건 (토큰 {stats['tokens']}개)")
+
 def main():
     """메인 실행 함수"""
     print("=" * 50)
     print("🎯 GMGN 트래커 - 간단 버전")
     print("=" * 50)
     
-    # 1. 데이터 수집
-    data = scrape_gmgn()
+    # 알림 채널이 설정되어 있으면 발송기 시작
+    dispatcher = notifier.create_dispatcher_from_env(notifier.outbox_path('scraper'))
+    if dispatcher is not None:
+        dispatcher.start()
+
+    # 수집 → 파싱 → 저장 → 알림 확인을 단계별 파이프라인으로 실행
+    # GMGN_EGRESS_PROXIES가 설정되어 있으면 상세 요청을 egress 경로(프록시)로 나눠서 전송
+    results = []
+    egress = EgressPool.from_env()
+    enricher = Enricher(fetch=functools.partial(fetch_token_detail, egress=egress))
+    indicators = IndicatorEngine.load()
+    detector = AnomalyDetector.load()
+    validator = Validator(QUARANTINE_PATH)
+    collector = create_pipeline(dispatcher, results, enricher, indicators, validator, detector).start()
+    for target in TARGETS:
+        collector.submit(target)
+    collector.stop()
+    enricher.close()
+    if egress is not None:
+        egress.close()
+
+    # 지표/이상 탐지 상태 저장 (다음 실행에서 이어서 계산)
+    try:
+        indicators.save()
+        detector.save()
+    except Exception as e:
+        print(f"⚠️ 지표 상태 저장 실패: {e}")
     
-    if data:
-        # 2. 데이터 저장
-        save_data(data)
-        
-        # 3. 알림 확인
-        alerts = check_alerts(data)
-        
-        # 4. 결과 출력
-        print(f"\n📊 수집된 토큰: {len(data)}개")
-        print(f"🚨 급등 알림: {len(alerts)}개")
+    # 결과 출력
+    if results:
+        print(f"\n📊 수집된 토큰: {sum(len(data) for data, _ in results)}개")
+        print(f"🚨 알림: {sum(len(alerts) for _, alerts in results)}개")
+    print_anomaly_stats(detector.stats())
+    print_pipeline_stats(collector.stats())
+    print_validation_stats(validator.stats())
+    print_egress_report(egress)
+
+    if dispatcher is not None:
+        dispatcher.stop()
         
     print("\n✅ 완료!")
 
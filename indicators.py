@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+기술 지표 엔진 - EMA, RSI, VWAP, 변동성을 스냅샷마다 증분 계산
+
+토큰별 상태는 numpy 배열의 한 행으로 관리하며, 한 주기의 모든 토큰을
+한 번의 벡터 연산으로 갱신합니다 (토큰당 O(1), 전체 히스토리 재계산 없음).
+"""
+import glob
+import os
+import numpy as np
+from snapshot_diff import token_key
+from memory_budget import DICT_ENTRY_BYTES, estimate_size
+
+INDICATORS_PATH = os.environ.get('GMGN_INDICATORS_PATH', os.path.join('data', 'indicators.npz'))
+
+STATE_FIELDS = ('last_price', 'ema_fast', 'ema_slow', 'avg_gain', 'avg_loss',
+                'pv_sum', 'v_sum', 'var', 'count', 'last_update')
+
+SPILL_NAMESPACE = 'indicators'
+
+
+class TokenArrays:
+    """토큰별 상태를 numpy 배열의 행으로 보관 - 행 배정, 메모리 예산, 저장/복원 공통 부분
+
+    하위 클래스는 fields(상태 배열 이름), spill_namespace, default_path를 정하고
+    상태 배열에 'last_update'(마지막 갱신 순번)를 포함해야 합니다.
+    """
+    fields = ()
+    spill_namespace = None
+    default_path = None
+
+    def __init__(self, capacity=256, spill=None):
+        self.spill = spill
+        self.path = None    # load()한 파일 (save()의 기본 경로)
+        self.keys = []
+        self.index = {}
+        self.state = {name: np.zeros(capacity) for name in self.fields}
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _row(self, key):
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row >= len(self.state['last_update']):
+                for name, values in self.state.items():
+                    self.state[name] = np.concatenate([values, np.zeros(len(values))])
+            self.index[key] = row
+            self.keys.append(key)
+
+            # 디스크로 옮겨진 토큰이면 상태 복원
+            saved = self.spill.pop(self.spill_namespace, key) if self.spill is not None else None
+            if saved is not None:
+                for name, value in saved.items():
+                    self.state[name][row] = value
+        return row
+
+    # --- 메모리 예산 (MemoryBudget) 인터페이스 ---
+
+    def memory_usage(self):
+        size = len(self.keys)
+        arrays = sum(values.nbytes for values in self.state.values())
+        per_key = estimate_size(self.keys[-1]) if size else 0
+        # 키 문자열 + 키 목록 슬롯 + 인덱스 dict 항목
+        return int(arrays + size * (per_key + 8 + DICT_ENTRY_BYTES))
+
+    def evict(self, count):
+        """가장 오래 갱신되지 않은 토큰 count개의 상태를 디스크로 옮기고 배열을 압축"""
+        size = len(self.keys)
+        count = min(count, size)
+        if count <= 0 or self.spill is None:
+            return 0
+
+        order = np.argsort(self.state['last_update'][:size], kind='stable')
+        evicted = order[:count]
+        rows = {name: values[evicted].tolist() for name, values in self.state.items()}
+        self.spill.put_many(self.spill_namespace, [
+            (self.keys[row], {name: rows[name][i] for name in self.fields})
+            for i, row in enumerate(evicted.tolist())])
+
+        keep = np.ones(size, dtype=bool)
+        keep[evicted] = False
+        for name, values in self.state.items():
+            compacted = np.zeros(len(values))
+            compacted[:size - count] = values[:size][keep]
+            self.state[name] = compacted
+        self.keys = [key for key, kept in zip(self.keys, keep.tolist()) if kept]
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        return count
+
+    def save(self, path=None):
+        """상태 저장 (재시작 시 히스토리 재생 불필요)"""
+        path = path or self.path or self.default_path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        size = len(self.keys)
+        keys = list(self.keys)
+        arrays = {name: values[:size] for name, values in self.state.items()}
+
+        # 메모리 예산으로 디스크에 옮겨진 토큰도 함께 저장 (웹 지표 조회/재시작 시 누락 방지)
+        spilled = [(key, saved) for key, saved in self.spill.items(self.spill_namespace)
+                   if key not in self.index] if self.spill is not None else []
+        if spilled:
+            keys += [key for key, _ in spilled]
+            arrays = {name: np.concatenate([values, [saved.get(name, 0.0) for _, saved in spilled]])
+                      for name, values in arrays.items()}
+
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, keys=np.array(keys, dtype=np.int64), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=None, **kwargs):
+        """저장된 상태에서 복원 (파일이 없으면 빈 상태)"""
+        path = path or cls.default_path
+        engine = cls(**kwargs)
+        engine.path = path
+        if not os.path.exists(path):
+            return engine
+
+        with np.load(path) as saved:
+            if saved['keys'].dtype.kind not in 'iu':
+                # 심볼 키로 저장된 예전 상태는 버리고 새로 시작
+                return engine
+            keys = saved['keys'].tolist()
+            engine.keys = keys
+            engine.index = {key: i for i, key in enumerate(keys)}
+            capacity = max(len(keys), len(engine.state['last_update']))
+            for name in cls.fields:
+                values = np.zeros(capacity)
+                if name in saved.files:
+                    values[:len(keys)] = saved[name]
+                engine.state[name] = values
+            engine.updates = int(engine.state['last_update'].max(initial=0))
+
+        # 저장 파일에 디스크 항목까지 들어 있으므로 디스크 사본은 삭제
+        if engine.spill is not None:
+            engine.spill.delete_many(engine.spill_namespace, keys)
+        return engine
+
+
+class IndicatorEngine(TokenArrays):
+    """토큰별 지표 상태를 배열로 보관하고 배치 단위로 갱신"""
+    fields = STATE_FIELDS
+    spill_namespace = SPILL_NAMESPACE
+    default_path = INDICATORS_PATH
+
+    def __init__(self, fast_span=12, slow_span=26, rsi_period=14, vol_lambda=0.94, capacity=256, spill=None):
+        super().__init__(capacity, spill)
+        self.fast_span = fast_span
+        self.slow_span = slow_span
+        self.rsi_period = rsi_period
+        self.vol_lambda = vol_lambda
+
+    def update(self, tokens):
+        """한 스냅샷의 토큰들로 지표 상태 갱신"""
+        rows, prices, volumes = [], [], []
+        batch = set()
+        for token in tokens:
+            key = token_key(token)
+            price = token.get('price')
+            if key is None or key in batch or not isinstance(price, (int, float)) or not price > 0:
+                continue
+            batch.add(key)
+            rows.append(self._row(key))
+            prices.append(price)
+            volume = token.get('volume_24h')
+            volumes.append(volume if isinstance(volume, (int, float)) and volume > 0 else 0.0)
+
+        if not rows:
+            return 0
+
+        s = self.state
+        rows = np.asarray(rows)
+        price = np.asarray(prices, dtype=float)
+        volume = np.asarray(volumes, dtype=float)
+
+        count = s['count'][rows]
+        first = count == 0
+        last = np.where(first, price, s['last_price'][rows])
+
+        # EMA
+        for name, span in (('ema_fast', self.fast_span), ('ema_slow', self.slow_span)):
+            prev = np.where(first, price, s[name][rows])
+            s[name][rows] = prev + (price - prev) * (2.0 / (span + 1))
+
+        # RSI (Wilder 평활, 초기 구간은 단순 평균)
+        diff = price - last
+        alpha = np.where(first, 0.0, 1.0 / np.minimum(np.maximum(count, 1), self.rsi_period))
+        for name, move in (('avg_gain', np.maximum(diff, 0.0)), ('avg_loss', np.maximum(-diff, 0.0))):
+            s[name][rows] += (move - s[name][rows]) * alpha
+
+        # 변동성 (로그 수익률의 EWMA 분산)
+        log_return = np.log(price / last)
+        s['var'][rows] = np.where(first, 0.0,
+                                  self.vol_lambda * s['var'][rows] + (1 - self.vol_lambda) * log_return ** 2)
+
+        # VWAP
+        s['pv_sum'][rows] += price * volume
+        s['v_sum'][rows] += volume
+
+        s['last_price'][rows] = price
+        s['count'][rows] = count + 1
+        self.updates += 1
+        s['last_update'][rows] = self.updates
+        return len(rows)
+
+    def _compute(self, rows):
+        s = self.state
+        gain = s['avg_gain'][rows]
+        loss = s['avg_loss'][rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(loss > 0, 100.0 - 100.0 / (1.0 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+            vwap = np.where(s['v_sum'][rows] > 0, s['pv_sum'][rows] / s['v_sum'][rows], s['last_price'][rows])
+        return {
+            'ema_fast': s['ema_fast'][rows],
+            'ema_slow': s['ema_slow'][rows],
+            'rsi': rsi,
+            'vwap': vwap,
+            'volatility': np.sqrt(s['var'][rows]) * 100,
+            'samples': s['count'][rows],
+        }
+
+    def values(self, key):
+        """토큰 하나의 현재 지표 값 (디스크로 옮겨진 토큰은 다시 불러옴)"""
+        row = self.index.get(key)
+        if row is None:
+            if self.spill is None or self.spill.get(SPILL_NAMESPACE, key) is None:
+                return None
+            row = self._row(key)
+        computed = self._compute(np.array([row]))
+        return {name: float(values[0]) for name, values in computed.items()}
+
+    def snapshot(self):
+        """모든 토큰의 현재 지표 값 {key: {...}}"""
+        if not self.keys:
+            return {}
+        computed = self._compute(np.arange(len(self.keys)))
+        columns = {name: values.tolist() for name, values in computed.items()}
+        return {key: {name: columns[name][i] for name in columns} for i, key in enumerate(self.keys)}
+
+
+_cache = {'mtime': None, 'values': {}}
+
+
+def indicator_files(path=None):
+    """지표 파일과 인스턴스별 지표 파일(indicators_<id>.npz, 여러 모니터 인스턴스 실행 시) 목록"""
+    path = path or INDICATORS_PATH
+    stem, ext = os.path.splitext(path)
+    # 저장 중인 임시 파일(*.tmp.npz)은 제외
+    return [path] + sorted(name for name in glob.glob(glob.escape(stem) + '_*' + ext)
+                           if not name.endswith('.tmp' + ext))
+
+
+def load_indicator_values(path=None):
+    """저장된 지표 값 조회 - 인스턴스별 파일을 합쳐서 반환 (파일이 바뀔 때만 다시 읽음)"""
+    stamps = []
+    for name in indicator_files(path):
+        try:
+            stamps.append((name, os.path.getmtime(name)))
+        except OSError:
+            continue
+    if not stamps:
+        return {}
+
+    stamps = tuple(stamps)
+    if _cache['mtime'] != stamps:
+        values = {}
+        # 같은 토큰이 여러 파일에 있으면 나중에 저장된 파일 기준
+        for name, _ in sorted(stamps, key=lambda stamp: stamp[1]):
+            values.update(IndicatorEngine.load(name).snapshot())
+        _cache['values'] = values
+        _cache['mtime'] = stamps
+    return _cache['values']
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+상승/하락/거래량 급증 리더보드 - 5분/1시간/24시간 구간별로 수집 시점에 증분 갱신
+
+토큰별로 구간 시작 가격을 deque로 유지하고(구간당 최대 resolution개 샘플),
+스냅샷마다 상위 K개 목록을 힙으로 미리 계산해 두므로 조회는 O(K)입니다.
+"""
+import heapq
+import threading
+import time
+from collections import deque
+from snapshot_diff import token_key, token_label
+from memory_budget import SpillableDict
+
+WINDOWS = {'5m': 300, '1h': 3600, '24h': 86400}
+
+BOARDS = ('gainers', 'losers', 'volume_spikes')
+
+
+def _last_ts(dq):
+    """구간 히스토리의 마지막 샘플 시각 (디스크 항목 정리 기준)"""
+    return dq[-1][0]
+
+
+class Leaderboard:
+    """구간별 상위 K개 변동 토큰"""
+
+    def __init__(self, windows=None, k=20, resolution=300, spill=None):
+        self.windows = dict(windows or WINDOWS)
+        self.k = k
+        self.resolution = resolution
+        self.updated_at = None
+
+        self._history = {name: SpillableDict(f'leaderboard:{name}', spill, stamp=_last_ts) for name in self.windows}
+        self._boards = {name: {board: [] for board in BOARDS} for name in self.windows}
+        self._lock = threading.Lock()
+
+    def ingest(self, tokens, ts=None):
+        """스냅샷 하나 반영 - 이미 반영한 시각 이전(같은 시각 포함)의 스냅샷은 무시, 반영 여부 반환"""
+        ts = time.time() if ts is None else ts
+        if self.updated_at is not None and ts <= self.updated_at:
+            return False
+        samples = {}
+        for token in tokens:
+            key = token_key(token)
+            price = token.get('price')
+            if key is None or not isinstance(price, (int, float)) or not price > 0:
+                continue
+            volume = token.get('volume_24h')
+            volume = volume if isinstance(volume, (int, float)) and volume > 0 else 0.0
+            samples[key] = (ts, price, volume)
+
+        with self._lock:
+            for name, window in self.windows.items():
+                self._boards[name] = self._update_window(self._history[name], samples, ts, window)
+            self.updated_at = ts
+        return True
+
+    def _update_window(self, history, samples, ts, window):
+        step = window / self.resolution
+        cutoff = ts - window
+        moves = []
+
+        for key, sample in samples.items():
+            dq = history.get(key)
+            if dq is None or dq[-1][0] < cutoff - window:
+                # 처음 보거나 (디스크에서 다시 불러온) 오래된 히스토리는 새로 시작
+                dq = history[key] = deque()
+            if not dq or sample[0] - dq[-1][0] >= step:
+                dq.append(sample)
+
+            # 구간 시작 이전의 가장 최근 샘플 하나를 기준점으로 남김
+            while len(dq) > 1 and dq[1][0] <= cutoff:
+                dq.popleft()
+
+            _, ref_price, ref_volume = dq[0]
+            change = (sample[1] / ref_price - 1.0) * 100
+            volume_ratio = sample[2] / ref_volume if ref_volume > 0 else 0.0
+            moves.append((key, change, volume_ratio, sample[1]))
+
+        # 구간 동안 보이지 않은 토큰 정리 (디스크로 옮겨진 토큰 포함)
+        history.prune(cutoff, keep=samples)
+
+        def entry(move):
+            return {'key': move[0], 'symbol': token_label(move[0]), 'change': move[1],
+                    'volume_ratio': move[2], 'price': move[3]}
+
+        return {
+            'gainers': [entry(m) for m in heapq.nlargest(self.k, moves, key=lambda m: m[1])],
+            'losers': [entry(m) for m in heapq.nsmallest(self.k, moves, key=lambda m: m[1])],
+            'volume_spikes': [entry(m) for m in heapq.nlargest(self.k, moves, key=lambda m: m[2])],
+        }
+
+    def top(self, window, k=None):
+        """구간의 상위 K개 목록 (미리 계산된 결과를 잘라서 반환)"""
+        k = self.k if k is None else max(0, min(k, self.k))
+        with self._lock:
+            boards = self._boards[window]
+            return {board: boards[board][:k] for board in BOARDS}
+
+    def tracked_tokens(self):
+        """구간별 추적 중인 토큰 수"""
+        with self._lock:
+            return {name: len(history) for name, history in self._history.items()}
+
+    # --- 메모리 예산 (MemoryBudget) 인터페이스 ---
+
+    def __len__(self):
+        return sum(len(history) for history in self._history.values())
+
+    def memory_usage(self):
+        with self._lock:
+            return sum(history.memory_usage() for history in self._history.values())
+
+    def evict(self, count):
+        """구간별로 오래 갱신되지 않은 토큰 히스토리를 디스크로 이동"""
+        with self._lock:
+            total = sum(len(history) for history in self._history.values())
+            if not total:
+                return 0
+            return sum(history.evict(-(-count * len(history) // total))
+                       for history in self._history.values())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+수집 대상 임대(lease) - 여러 모니터 인스턴스가 수집 대상(chain:tab)을 나눠 맡기
+
+공유 볼륨(./data)의 SQLite 파일에 인스턴스 생존 신호와 대상별 임대를 기록합니다.
+각 인스턴스는 (대상 수 / 살아 있는 인스턴스 수)만큼만 임대를 잡고,
+생존 신호가 끊긴 인스턴스의 임대는 만료 후 다른 인스턴스가 가져갑니다.
+대상별로 마지막으로 수집한 주기 번호를 조건부로 갱신하므로, 임대가 주기 중간에
+넘어가더라도 한 주기에 같은 대상을 두 번 수집하지 않습니다.
+
+설정: GMGN_LEASE_DB=/app/data/leases.db (비어 있으면 임대 없이 모든 대상 수집)
+"""
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+LEASE_DB_PATH = os.environ.get('GMGN_LEASE_DB', '')
+
+# 인스턴스 식별자 (컨테이너에서는 호스트 이름 = 컨테이너 id)
+INSTANCE_ID = os.environ.get('GMGN_INSTANCE_ID') or socket.gethostname()
+
+# 생존 신호/임대 유효 시간 (초) - 이 시간 동안 갱신이 없으면 다른 인스턴스가 가져감
+LEASE_TTL = float(os.environ.get('GMGN_LEASE_TTL', '60'))
+
+LEASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    id TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    target TEXT PRIMARY KEY,
+    owner TEXT,
+    expires_at REAL NOT NULL DEFAULT 0,
+    done_cycle INTEGER NOT NULL DEFAULT -1
+);
+"""
+
+SQL_HEARTBEAT = "INSERT OR REPLACE INTO instances (id, expires_at) VALUES (?, ?)"
+SQL_PRUNE_INSTANCES = "DELETE FROM instances WHERE expires_at < ?"
+SQL_LIVE_INSTANCES = "SELECT id FROM instances ORDER BY id"
+SQL_ADD_TARGET = "INSERT OR IGNORE INTO leases (target) VALUES (?)"
+SQL_LEASE_ROWS = "SELECT target, owner, expires_at FROM leases"
+SQL_RENEW = "UPDATE leases SET expires_at = ? WHERE owner = ? AND expires_at >= ?"
+SQL_EXTEND = "UPDATE leases SET expires_at = ? WHERE target = ? AND owner = ?"
+SQL_TAKE = "UPDATE leases SET owner = ?, expires_at = ? WHERE target = ? AND (owner IS NULL OR expires_at < ?)"
+SQL_GIVE_UP = "UPDATE leases SET owner = NULL, expires_at = 0 WHERE target = ? AND owner = ?"
+SQL_RELEASE_ALL = "UPDATE leases SET owner = NULL, expires_at = 0 WHERE owner = ?"
+SQL_LEAVE = "DELETE FROM instances WHERE id = ?"
+SQL_BEGIN_CYCLE = ("UPDATE leases SET done_cycle = ? "
+                   "WHERE target = ? AND owner = ? AND expires_at >= ? AND done_cycle < ?")
+
+
+def instance_path(path, instance_id=None):
+    """인스턴스별 파일 경로 - data/indicators.npz → data/indicators_<id>.npz (instance_id가 없으면 그대로)"""
+    if not instance_id:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_{instance_id}{ext}"
+
+
+def cycle_id(interval_seconds, now=None):
+    """모든 인스턴스가 같은 값을 얻는 시각 기준 주기 번호"""
+    return int((time.time() if now is None else now) // interval_seconds)
+
+
+class LeaseCoordinator:
+    """SQLite 공유 파일 기반 대상 임대 관리"""
+
+    def __init__(self, db_path=None, instance_id=None, ttl=LEASE_TTL, clock=time.time):
+        self.db_path = db_path or LEASE_DB_PATH
+        self.instance_id = instance_id or INSTANCE_ID
+        self.ttl = ttl
+        self.clock = clock
+        self.held = []
+        self.live = 1
+        self.scraped = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 트랜잭션은 직접 관리 (BEGIN IMMEDIATE로 임대 배분을 직렬화)
+        self._conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.executescript(LEASE_SCHEMA)
+
+    def _transaction(self, work):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self.clock())
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def heartbeat(self):
+        """생존 신호와 보유 중인 임대 갱신 (임대 유효 시간보다 자주 호출)"""
+        def work(now):
+            self._conn.execute(SQL_HEARTBEAT, (self.instance_id, now + self.ttl))
+            self._conn.execute(SQL_RENEW, (now + self.ttl, self.instance_id, now))
+        self._transaction(work)
+
+    def start_heartbeat(self, interval=None, stop=None):
+        """생존 신호 갱신 스레드 시작 - 수집 주기가 길어져도 그동안 임대가 만료되지 않음
+
+        반환한 Event를 set()하면 종료합니다.
+        """
+        interval = max(1.0, self.ttl / 3) if interval is None else interval
+        stop = stop or threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    print(f"⚠️ 생존 신호 갱신 실패: {e}")
+
+        threading.Thread(target=run, name='lease-heartbeat', daemon=True).start()
+        return stop
+
+    def claim(self, targets):
+        """내 몫만큼 임대를 잡고 보유한 대상 목록 반환 (targets 순서)
+
+        이미 보유한 대상을 우선 유지하고, 몫보다 많이 보유했으면 나머지는 놓아서
+        새로 들어온 인스턴스가 가져갈 수 있게 합니다.
+        """
+        targets = list(dict.fromkeys(targets))
+
+        def work(now):
+            conn = self._conn
+            conn.execute(SQL_HEARTBEAT, (self.instance_id, now + self.ttl))
+            conn.execute(SQL_PRUNE_INSTANCES, (now,))
+            self.live = max(1, len(conn.execute(SQL_LIVE_INSTANCES).fetchall()))
+            conn.executemany(SQL_ADD_TARGET, [(t,) for t in targets])
+
+            wanted = set(targets)
+            rows = {row[0]: row for row in conn.execute(SQL_LEASE_ROWS) if row[0] in wanted}
+            mine = [t for t in targets if rows[t][1] == self.instance_id and rows[t][2] >= now]
+            free = [t for t in targets if rows[t][1] is None or rows[t][2] < now]
+
+            share = math.ceil(len(targets) / self.live)
+            keep = mine[:share]
+            for target in mine[share:]:
+                conn.execute(SQL_GIVE_UP, (target, self.instance_id))
+            for target in keep:
+                conn.execute(SQL_EXTEND, (now + self.ttl, target, self.instance_id))
+
+            taken = []
+            for target in free[:max(0, share - len(keep))]:
+                if conn.execute(SQL_TAKE, (self.instance_id, now + self.ttl, target, now)).rowcount:
+                    taken.append(target)
+
+            held = set(keep) | set(taken)
+            return [t for t in targets if t in held]
+
+        self.held = self._transaction(work)
+        return self.held
+
+    def begin(self, target, cycle):
+        """이번 주기에 target을 수집해도 되는지 - 임대 보유 중이고 아직 아무도 수집하지 않았으면 True"""
+        def work(now):
+            return self._conn.execute(SQL_BEGIN_CYCLE, (cycle, target, self.instance_id, now, cycle)).rowcount == 1
+        started = self._transaction(work)
+        if started:
+            self.scraped += 1
+        else:
+            self.skipped += 1
+        return started
+
+    def assign(self, targets, cycle):
+        """임대를 잡고 이번 주기에 수집할 대상 목록 반환"""
+        return [t for t in self.claim(targets) if self.begin(t, cycle)]
+
+    def assignments(self):
+        """대상 → 유효한 임대 보유 인스턴스 (없으면 None)"""
+        now = self.clock()
+        with self._lock:
+            return {target: owner if owner is not None and expires_at >= now else None
+                    for target, owner, expires_at in self._conn.execute(SQL_LEASE_ROWS)}
+
+    def stats(self):
+        return {'instance': self.instance_id, 'live_instances': self.live, 'held': len(self.held),
+                'scraped': self.scraped, 'skipped': self.skipped}
+
+    def release(self):
+        """종료 시 임대와 생존 신호 반납 (다른 인스턴스가 만료를 기다리지 않고 가져감)"""
+        def work(now):
+            self._conn.execute(SQL_RELEASE_ALL, (self.instance_id,))
+            self._conn.execute(SQL_LEAVE, (self.instance_id,))
+        self._transaction(work)
+        self.held = []
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+메모리 예산 관리 - 토큰별 구조의 메모리 사용량 보고 및 비활성 토큰 디스크 이동(spill)
+
+예산을 넘으면 가장 큰 구조부터 오래 사용되지 않은 토큰을 디스크(SQLite)로 옮기고,
+다시 조회되면 투명하게 메모리로 불러옵니다.
+"""
+import math
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict, deque
+import numpy as np
+
+MEMORY_BUDGET_MB = float(os.environ.get('GMGN_MEMORY_BUDGET_MB', '256'))
+SPILL_DIR = os.environ.get('GMGN_SPILL_DIR', 'data')
+
+# dict 항목 하나의 대략적인 오버헤드 (해시 테이블 슬롯 + 인덱스)
+DICT_ENTRY_BYTES = 48
+
+# stamp: 항목의 마지막 갱신 시각 (SpillableDict(stamp=...)일 때) - 디스크 항목을 읽지 않고 정리하는 데 사용
+SPILL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spill (
+    namespace TEXT NOT NULL,
+    key BLOB NOT NULL,
+    value BLOB NOT NULL,
+    stamp REAL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+SPILL_INDEX = "CREATE INDEX IF NOT EXISTS spill_stamp ON spill (namespace, stamp)"
+
+
+def estimate_size(obj, _depth=0):
+    """객체의 대략적인 메모리 크기 (바이트) - 컨테이너는 내부까지 계산"""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + sys.getsizeof(obj)
+    size = sys.getsizeof(obj)
+    if _depth > 4:
+        return size
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(estimate_size(item, _depth + 1) for item in obj)
+    return size
+
+
+class SpillFile:
+    """디스크로 옮긴 항목을 보관하는 SQLite 파일 (namespace별 key → pickle 값)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+
+    @property
+    def _conn(self):
+        """첫 사용 시 연결 (spill이 필요 없으면 파일을 만들지 않음)"""
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SPILL_SCHEMA)
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(spill)")]
+            if 'stamp' not in columns:
+                # stamp 열이 없던 예전 파일
+                self._db.execute("ALTER TABLE spill ADD COLUMN stamp REAL")
+            self._db.execute(SPILL_INDEX)
+        return self._db
+
+    def put_many(self, namespace, items, stamp=None):
+        """(key, 값) 저장 - stamp(값)이 있으면 마지막 갱신 시각도 기록 (delete_before용)"""
+        rows = [(namespace, pickle.dumps(k), pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL),
+                 None if stamp is None else stamp(v))
+                for k, v in items]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO spill (namespace, key, value, stamp) VALUES (?, ?, ?, ?)", rows)
+
+    def delete_before(self, namespace, ts):
+        """마지막 갱신 시각이 ts 이전인 항목 삭제 (값을 읽지 않음), 삭제한 개수 반환"""
+        if self._db is None and not os.path.exists(self.path):
+            return 0
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM spill WHERE namespace = ? AND stamp < ?",
+                                      (namespace, ts)).rowcount
+
+    def get(self, namespace, key, default=None):
+        if self._db is None and not os.path.exists(self.path):
+            return default
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM spill WHERE namespace = ? AND key = ?",
+                                     (namespace, pickle.dumps(key))).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    def pop(self, namespace, key, default=None):
+        if self._db is None and not os.path.exists(self.path):
+            return default
+        packed = pickle.dumps(key)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value FROM spill WHERE namespace = ? AND key = ?",
+                                     (namespace, packed)).fetchone()
+            if row is None:
+                return default
+            self._conn.execute("DELETE FROM spill WHERE namespace = ? AND key = ?", (namespace, packed))
+        return pickle.loads(row[0])
+
+    def delete(self, namespace, key):
+        if self._db is None and not os.path.exists(self.path):
+            return
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM spill WHERE namespace = ? AND key = ?",
+                               (namespace, pickle.dumps(key)))
+
+    def delete_many(self, namespace, keys):
+        keys = [pickle.dumps(k) for k in keys]
+        if not keys or (self._db is None and not os.path.exists(self.path)):
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM spill WHERE namespace = ? AND key = ?",
+                                   [(namespace, k) for k in keys])
+
+    def contains(self, namespace, key):
+        if self._db is None and not os.path.exists(self.path):
+            return False
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM spill WHERE namespace = ? AND key = ?",
+                                      (namespace, pickle.dumps(key))).fetchone() is not None
+
+    def items(self, namespace):
+        """namespace의 (key, 값) 목록 (메모리로 다시 불러오지 않음)"""
+        if self._db is None and not os.path.exists(self.path):
+            return []
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM spill WHERE namespace = ?",
+                                      (namespace,)).fetchall()
+        return [(pickle.loads(k), pickle.loads(v)) for k, v in rows]
+
+    def count(self, namespace):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM spill WHERE namespace = ?",
+                                      (namespace,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_MISSING = object()
+
+
+class SpillableDict:
+    """최근 사용 순서(LRU)를 유지하는 dict - 오래된 항목은 디스크로 옮기고 조회 시 다시 로드
+
+    keys()/items()/len()은 메모리에 있는 (활성) 항목만 대상으로 합니다 (메모리 예산 인터페이스).
+    in과 get()은 디스크의 항목까지 보고, 디스크 항목까지 포함한 정리/저장은 prune()과 all_items()를 사용합니다.
+    stamp(값)을 주면 디스크로 옮길 때 마지막 갱신 시각을 함께 기록해 prune()이 값을 읽지 않고 정리합니다.
+    """
+
+    def __init__(self, namespace, spill=None, stamp=None):
+        self.namespace = namespace
+        self.spill = spill
+        self.stamp = stamp    # 값 → 마지막 갱신 시각 (prune() 사용 시 필요)
+        self._data = OrderedDict()
+        self.spilled = 0
+        self.reloaded = 0
+
+    def get(self, key, default=None):
+        value = self._data.get(key, _MISSING)
+        if value is not _MISSING:
+            self._data.move_to_end(key)
+            return value
+
+        if self.spill is not None:
+            value = self.spill.pop(self.namespace, key, _MISSING)
+            if value is not _MISSING:
+                self._data[key] = value
+                self.reloaded += 1
+                return value
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+    def __delitem__(self, key):
+        if self._data.pop(key, _MISSING) is _MISSING:
+            if self.spill is None:
+                raise KeyError(key)
+            self.spill.delete(self.namespace, key)
+
+    def __contains__(self, key):
+        return key in self._data or (self.spill is not None and self.spill.contains(self.namespace, key))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def keys(self):
+        return self._data.keys()
+
+    def items(self):
+        return self._data.items()
+
+    def values(self):
+        return self._data.values()
+
+    def all_items(self):
+        """메모리와 디스크의 모든 (key, 값) - 디스크 항목은 다시 불러오지 않음 (체크포인트용)"""
+        items = list(self._data.items())
+        if self.spill is not None:
+            items += [(k, v) for k, v in self.spill.items(self.namespace) if k not in self._data]
+        return items
+
+    def prune(self, before, keep=()):
+        """마지막 갱신 시각(stamp)이 before 이전인 항목을 메모리와 디스크에서 삭제 (keep의 키는 유지)
+
+        디스크 항목은 stamp 열의 인덱스로 지우므로 디스크로 옮긴 항목 수와 관계없이 한 번의 쿼리입니다.
+        (다시 불러온 항목은 get()에서 디스크 사본을 지우므로 keep의 키는 디스크에 없음)
+        """
+        removed = [k for k, v in self._data.items() if k not in keep and self.stamp(v) < before]
+        for key in removed:
+            del self._data[key]
+
+        if self.spill is not None:
+            return len(removed) + self.spill.delete_before(self.namespace, before)
+        return len(removed)
+
+    def evict(self, count):
+        """가장 오래 사용되지 않은 항목 count개를 디스크로 이동, 이동한 개수 반환"""
+        count = min(count, len(self._data))
+        if count <= 0 or self.spill is None:
+            return 0
+
+        items = [self._data.popitem(last=False) for _ in range(count)]
+        self.spill.put_many(self.namespace, items, self.stamp)
+        self.spilled += count
+        return count
+
+    def memory_usage(self, sample=16):
+        """항목 일부를 표본으로 추정한 메모리 사용량"""
+        if not self._data:
+            return 0
+        items = list(self._data.items())[-sample:]
+        per_item = sum(estimate_size(k) + estimate_size(v) for k, v in items) / len(items)
+        return int((per_item + DICT_ENTRY_BYTES) * len(self._data))
+
+
+class MemoryBudget:
+    """여러 구조의 메모리 사용량을 합산하고 예산을 넘으면 비활성 항목 제거
+
+    등록하는 구조는 memory_usage(), evict(count), __len__()을 제공해야 합니다.
+    """
+
+    def __init__(self, limit_mb=None):
+        self.limit_bytes = int((MEMORY_BUDGET_MB if limit_mb is None else limit_mb) * 1024 * 1024)
+        self.structures = {}
+        self.evicted = {}
+
+    def register(self, name, structure):
+        self.structures[name] = structure
+        self.evicted.setdefault(name, 0)
+        return structure
+
+    def usage(self):
+        return {name: s.memory_usage() for name, s in self.structures.items()}
+
+    def enforce(self):
+        """예산 초과분만큼 큰 구조부터 오래된 항목을 제거, 제거한 항목 수 반환"""
+        usage = self.usage()
+        overflow = sum(usage.values()) - self.limit_bytes
+        total_evicted = 0
+
+        for name in sorted(usage, key=usage.get, reverse=True):
+            if overflow <= 0:
+                break
+            structure = self.structures[name]
+            entries = len(structure)
+            if not entries:
+                continue
+
+            per_entry = usage[name] / entries
+            count = min(entries, math.ceil(overflow / per_entry) if per_entry else entries)
+            evicted = structure.evict(count)
+            self.evicted[name] += evicted
+            total_evicted += evicted
+            overflow -= evicted * per_entry
+
+        return total_evicted
+
+    def report(self):
+        """구조별 메모리 사용량 보고"""
+        usage = self.usage()
+        return {
+            'limit_bytes': self.limit_bytes,
+            'total_bytes': sum(usage.values()),
+            'structures': {name: {'bytes': usage[name], 'entries': len(self.structures[name]),
+                                  'evicted': self.evicted[name]}
+                           for name in self.structures},
+        }
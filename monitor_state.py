@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+모니터 상태 관리 - 구간 가격 히스토리, 알림 쿨다운, 체크포인트 + WAL 복구
+
+재시작 시 체크포인트 파일을 mmap으로 읽고, 마지막 체크포인트 이후의
+스냅샷을 WAL(write-ahead log)에서 재생하여 바로 유효한 알림을 낼 수 있게 합니다.
+"""
+import json
+import mmap
+import os
+import struct
+import time
+from collections import deque
+import numpy as np
+from snapshot_diff import token_key, token_label
+from memory_budget import SpillableDict
+
+STATE_DIR = os.environ.get('GMGN_STATE_DIR', os.path.join('data', 'monitor'))
+
+# PROJECT_PLAN: 30분 내 30% 이상 상승 시 알림
+WINDOW_SECONDS = 30 * 60
+WINDOW_THRESHOLD = 30.0
+COOLDOWN_SECONDS = 30 * 60
+
+# 구간 시작점이 이 비율 이상 확보되면 유효한 구간으로 판단 (수집 주기 오차 허용)
+WINDOW_COVERAGE = 0.9
+
+CHECKPOINT_MAGIC = b'GMCK'
+CHECKPOINT_HEADER = struct.Struct('<4sIdQIII')  # magic, format, created, wal_seq, keys_len, samples, cooldowns
+SAMPLE_DTYPE = np.dtype([('key', '<u4'), ('ts', '<f8'), ('price', '<f8'), ('volume', '<f8')])
+COOLDOWN_DTYPE = np.dtype([('key', '<u4'), ('ts', '<f8')])
+
+HISTORY_NAMESPACE = 'monitor:history'
+
+
+def last_sample_ts(dq):
+    """구간 히스토리의 마지막 샘플 시각 (디스크 항목 정리 기준)"""
+    return dq[-1][0]
+
+
+def extract_samples(tokens):
+    """토큰 목록에서 (key, price, volume) 샘플 추출"""
+    samples = []
+    for token in tokens:
+        key = token_key(token)
+        price = token.get('price')
+        if key is None or not isinstance(price, (int, float)) or not price > 0:
+            continue
+        volume = token.get('volume_24h')
+        samples.append((key, price, volume if isinstance(volume, (int, float)) else 0.0))
+    return samples
+
+
+class MonitorState:
+    """토큰별 구간 히스토리와 알림 쿨다운"""
+
+    def __init__(self, window=WINDOW_SECONDS, threshold=WINDOW_THRESHOLD, cooldown=COOLDOWN_SECONDS, spill=None):
+        self.window = window
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.history = SpillableDict(HISTORY_NAMESPACE, spill, stamp=last_sample_ts)
+        self.cooldowns = {}
+
+        self.started_at = time.time()
+        self.recovery_seconds = 0.0
+        self.replayed_entries = 0
+        self.ready_at = None
+        self.first_alert_at = None
+
+    def last_price(self, key):
+        dq = self.history.get(key)
+        return dq[-1][1] if dq else None
+
+    def process(self, tokens, ts=None):
+        """스냅샷 하나를 반영하고 새 알림 목록 반환"""
+        ts = time.time() if ts is None else ts
+        return self.apply_samples(extract_samples(tokens), ts)
+
+    def apply_samples(self, samples, ts, emit=True):
+        """샘플 반영 - 구간 상승률이 기준을 넘고 쿨다운이 지난 토큰에 알림"""
+        cutoff = ts - self.window
+        alerts = []
+        seen = set()
+        covered_any = False
+
+        for key, price, volume in samples:
+            seen.add(key)
+            dq = self.history.get(key)
+            if dq is None or dq[-1][0] < cutoff - self.window:
+                # 처음 보거나 (디스크에서 다시 불러온) 오래된 히스토리는 새로 시작
+                dq = self.history[key] = deque()
+            dq.append((ts, price, volume))
+            while len(dq) > 1 and dq[1][0] <= cutoff:
+                dq.popleft()
+
+            ref_ts, ref_price, _ = dq[0]
+            if ts - ref_ts < self.window * WINDOW_COVERAGE:
+                continue
+            covered_any = True
+
+            change = (price / ref_price - 1.0) * 100
+            if change >= self.threshold and ts - self.cooldowns.get(key, float('-inf')) >= self.cooldown:
+                self.cooldowns[key] = ts
+                alerts.append(f"🚀 {self.window // 60}분 급등 알림: {token_label(key)} (+{change:.1f}%)")
+
+        # 구간 동안 보이지 않은 토큰(디스크로 옮겨진 토큰 포함)과 만료된 쿨다운 정리
+        self.history.prune(cutoff, keep=seen)
+        for key in [k for k, t in self.cooldowns.items() if ts - t >= self.cooldown]:
+            del self.cooldowns[key]
+
+        if not emit:
+            return []
+
+        now = time.time()
+        if covered_any and self.ready_at is None:
+            self.ready_at = now
+        if alerts and self.first_alert_at is None:
+            self.first_alert_at = now
+        return alerts
+
+    # --- 메모리 예산 (MemoryBudget) 인터페이스 ---
+
+    def __len__(self):
+        return len(self.history)
+
+    def memory_usage(self):
+        return self.history.memory_usage()
+
+    def evict(self, count):
+        return self.history.evict(count)
+
+    def metrics(self):
+        """복구 및 재시작 후 첫 유효 알림까지의 시간"""
+        def since_start(t):
+            return None if t is None else t - self.started_at
+
+        return {
+            'tokens': len(self.history),
+            'samples': sum(len(dq) for dq in self.history.values()),
+            'cooldowns': len(self.cooldowns),
+            'recovery_seconds': self.recovery_seconds,
+            'replayed_entries': self.replayed_entries,
+            'time_to_first_valid_alert': since_start(self.ready_at),
+            'time_to_first_alert': since_start(self.first_alert_at),
+        }
+
+
+class StateStore:
+    """체크포인트 파일 + WAL 기반 상태 저장소"""
+
+    def __init__(self, directory=None, fsync=True):
+        self.directory = directory or STATE_DIR
+        self.fsync = fsync
+        self.checkpoint_path = os.path.join(self.directory, 'checkpoint.bin')
+        self.wal_path = os.path.join(self.directory, 'wal.log')
+        self.seq = 0
+        self._wal = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    # --- WAL ---
+
+    def log(self, tokens, ts):
+        """스냅샷 샘플을 WAL에 추가하고 샘플 목록 반환"""
+        samples = extract_samples(tokens)
+        self.seq += 1
+        if self._wal is None:
+            self._wal = open(self.wal_path, 'a', encoding='utf-8')
+
+        self._wal.write(json.dumps({'seq': self.seq, 'ts': ts, 'samples': samples},
+                                   ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._wal.flush()
+        if self.fsync:
+            os.fsync(self._wal.fileno())
+        return samples
+
+    def _read_wal(self):
+        if not os.path.exists(self.wal_path):
+            return
+        with open(self.wal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 기록 도중 중단된 마지막 줄은 무시
+                    break
+                yield entry
+
+    # --- 체크포인트 ---
+
+    def checkpoint(self, state):
+        """현재 상태를 체크포인트로 저장하고 WAL 비우기"""
+        # 디스크로 옮겨진 토큰의 히스토리도 포함
+        history = state.history.all_items()
+        keys = list({key for key, _ in history} | state.cooldowns.keys())
+        index = {key: i for i, key in enumerate(keys)}
+
+        samples = np.array([(index[key], ts, price, volume)
+                            for key, dq in history
+                            for ts, price, volume in dq], dtype=SAMPLE_DTYPE)
+        cooldowns = np.array([(index[key], ts) for key, ts in state.cooldowns.items()],
+                             dtype=COOLDOWN_DTYPE)
+        keys_blob = json.dumps(keys, ensure_ascii=False).encode('utf-8')
+
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, 1, time.time(), self.seq,
+                                           len(keys_blob), len(samples), len(cooldowns)))
+            f.write(keys_blob)
+            f.write(samples.tobytes())
+            f.write(cooldowns.tobytes())
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+        # 체크포인트에 포함된 WAL 항목 제거
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+        open(self.wal_path, 'w').close()
+
+    def _load_checkpoint(self, state):
+        """체크포인트를 mmap으로 읽어 상태 복원, 체크포인트 시점의 WAL seq 반환"""
+        if not os.path.exists(self.checkpoint_path) or os.path.getsize(self.checkpoint_path) == 0:
+            return 0
+
+        with open(self.checkpoint_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, _, _, wal_seq, keys_len, n_samples, n_cooldowns = CHECKPOINT_HEADER.unpack_from(mm, 0)
+            if magic != CHECKPOINT_MAGIC:
+                raise ValueError("잘못된 체크포인트 파일")
+
+            offset = CHECKPOINT_HEADER.size
+            keys = json.loads(mm[offset:offset + keys_len].decode('utf-8'))
+            offset += keys_len
+
+            samples = np.frombuffer(mm, dtype=SAMPLE_DTYPE, count=n_samples, offset=offset)
+            offset += samples.nbytes
+            cooldowns = np.frombuffer(mm, dtype=COOLDOWN_DTYPE, count=n_cooldowns, offset=offset)
+
+            sample_rows = zip(samples['key'].tolist(), samples['ts'].tolist(),
+                              samples['price'].tolist(), samples['volume'].tolist())
+            cooldown_rows = zip(cooldowns['key'].tolist(), cooldowns['ts'].tolist())
+            del samples, cooldowns
+
+            # 체크포인트에 디스크 항목까지 들어 있으므로 디스크 사본은 지우고 체크포인트 기준으로 다시 구성
+            if state.history.spill is not None:
+                state.history.spill.delete_many(HISTORY_NAMESPACE, keys)
+            history = {}
+            for key_idx, ts, price, volume in sample_rows:
+                history.setdefault(keys[key_idx], deque()).append((ts, price, volume))
+            for key, dq in history.items():
+                state.history[key] = dq
+            for key_idx, ts in cooldown_rows:
+                state.cooldowns[keys[key_idx]] = ts
+
+        return wal_seq
+
+    def recover(self, **kwargs):
+        """체크포인트 로드 + WAL 재생으로 상태 복구"""
+        start = time.perf_counter()
+        state = MonitorState(**kwargs)
+
+        try:
+            wal_seq = self._load_checkpoint(state)
+        except (ValueError, struct.error) as e:
+            print(f"⚠️ 체크포인트 로드 실패, WAL만 재생: {e}")
+            state = MonitorState(**kwargs)
+            wal_seq = 0
+        self.seq = wal_seq
+
+        for entry in self._read_wal():
+            if entry['seq'] <= wal_seq:
+                continue
+            state.apply_samples([tuple(s) for s in entry['samples']], entry['ts'], emit=False)
+            state.replayed_entries += 1
+            self.seq = entry['seq']
+
+        state.recovery_seconds = time.perf_counter() - start
+        return state
+
+    def close(self):
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+알림 발송기 - 스크래핑 주기와 분리된 비동기 알림 전송
+
+알림은 큐로 전달되고, 채널별로 짧은 시간 동안 모아서 한 번에 전송합니다.
+실패한 전송은 outbox 파일에 저장되어 백오프 후 재시도됩니다. outbox는 변경 기록을 한 줄씩
+덧붙이는 파일(JSON lines)이라 전송마다 전체를 다시 쓰지 않고, 기록이 쌓이면 가끔 압축합니다.
+"""
+import json
+import os
+import queue
+import smtplib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+import requests
+from requests.adapters import HTTPAdapter
+
+OUTBOX_PATH = os.environ.get('GMGN_OUTBOX_PATH', os.path.join('data', 'outbox.jsonl'))
+
+# outbox 기록 줄 수가 남은 배치 수의 이 배수(최소 OUTBOX_COMPACT_MIN줄)를 넘으면 남은 배치만 다시 씀
+OUTBOX_COMPACT_RATIO = 4
+OUTBOX_COMPACT_MIN = 256
+
+
+def outbox_path(role, instance_id=None):
+    """프로세스별 outbox 파일 - data/outbox_<role>[_<instance>].jsonl (프로세스끼리 같은 파일을 쓰지 않도록)"""
+    stem, ext = os.path.splitext(OUTBOX_PATH)
+    return f"{stem}_{role}" + (f"_{instance_id}" if instance_id else '') + ext
+
+
+class WebhookChannel:
+    """일반 웹훅 채널 (JSON POST)"""
+
+    def __init__(self, url, name='webhook', timeout=10):
+        self.name = name
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, session, alerts):
+        payload = {'alerts': [a['message'] for a in alerts], 'count': len(alerts)}
+        response = session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class TelegramChannel:
+    """Telegram Bot API 채널"""
+
+    def __init__(self, token, chat_id, api_base='https://api.telegram.org', name='telegram', timeout=10):
+        self.name = name
+        self.url = f"{api_base}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+
+    def send(self, session, alerts):
+        text = '\n'.join(a['message'] for a in alerts)
+        response = session.post(self.url, json={'chat_id': self.chat_id, 'text': text},
+                                timeout=self.timeout)
+        response.raise_for_status()
+
+
+class EmailChannel:
+    """SMTP 이메일 채널"""
+
+    def __init__(self, host, port, sender, recipients, name='email', timeout=10):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.timeout = timeout
+
+    def send(self, session, alerts):
+        message = EmailMessage()
+        message['Subject'] = f"GMGN 급등 알림 {len(alerts)}건"
+        message['From'] = self.sender
+        message['To'] = ', '.join(self.recipients)
+        message.set_content('\n'.join(a['message'] for a in alerts))
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(message)
+
+
+class NotificationDispatcher:
+    """큐 기반 알림 발송기 (배치, 동시성 제한, 재시도)"""
+
+    def __init__(self, channels, batch_window=2.0, max_workers=4, max_retries=5,
+                 backoff_base=1.0, queue_size=10000, outbox_path=None):
+        self.channels = {c.name: c for c in channels}
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.outbox_path = outbox_path or OUTBOX_PATH
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='notify')
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._outbox_file = None
+        self._outbox_lines = 0
+        self._outbox = self._load_outbox()
+        self._in_flight = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.stats = {'submitted': 0, 'dropped': 0, 'sent': 0, 'failed': 0, 'retried': 0, 'dead': 0}
+        self._latencies = []
+
+    # --- 공개 API ---
+
+    def start(self):
+        """백그라운드 발송 스레드 시작"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='notify-dispatcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, message):
+        """알림 하나를 큐에 넣기 (블로킹 없음)"""
+        try:
+            self._queue.put_nowait({'message': message, 'created_at': time.time()})
+        except queue.Full:
+            with self._lock:
+                self.stats['dropped'] += 1
+            return False
+        with self._lock:
+            self.stats['submitted'] += 1
+        return True
+
+    def stop(self, timeout=10.0):
+        """남은 알림을 전송 시도한 뒤 종료"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                pending = any(b['attempts'] == 0 for b in self._outbox.values())
+            if self._queue.empty() and not pending and not self._in_flight:
+                break
+            time.sleep(0.05)
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(0.0, deadline - time.time()) + 1.0)
+            self._thread = None
+        self._executor.shutdown(wait=True)
+        self._session.close()
+        with self._lock:
+            if self._outbox_file is not None:
+                self._outbox_file.close()
+                self._outbox_file = None
+
+    def metrics(self):
+        """큐 깊이 및 전송 지연 통계"""
+        with self._lock:
+            latencies = list(self._latencies)
+            outbox_size = len(self._outbox)
+            in_flight = len(self._in_flight)
+            stats = dict(self.stats)
+
+        return dict(
+            stats,
+            queue_depth=self._queue.qsize(),
+            outbox_size=outbox_size,
+            in_flight=in_flight,
+            latency_avg=sum(latencies) / len(latencies) if latencies else 0.0,
+            latency_max=max(latencies) if latencies else 0.0,
+        )
+
+    # --- 내부 처리 ---
+
+    def _run(self):
+        pending = []
+        window_start = None
+
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=0.05)
+                pending.append(item)
+                if window_start is None:
+                    window_start = time.time()
+            except queue.Empty:
+                pass
+
+            if pending and time.time() - window_start >= self.batch_window:
+                self._enqueue_batches(pending)
+                pending = []
+                window_start = None
+
+            self._dispatch_due()
+
+        if pending:
+            self._enqueue_batches(pending)
+            self._dispatch_due()
+
+    def _enqueue_batches(self, alerts):
+        """채널별 배치를 outbox에 기록"""
+        with self._lock:
+            records = []
+            for name in self.channels:
+                batch_id = uuid.uuid4().hex
+                self._outbox[batch_id] = {
+                    'id': batch_id,
+                    'channel': name,
+                    'alerts': alerts,
+                    'attempts': 0,
+                    'next_attempt': 0.0,
+                }
+                records.append({'put': self._outbox[batch_id]})
+            self._append_outbox(records)
+
+    def _dispatch_due(self):
+        """전송 시각이 된 배치를 워커 풀에 제출"""
+        now = time.time()
+        with self._lock:
+            due = [b for b in self._outbox.values()
+                   if b['id'] not in self._in_flight and b['next_attempt'] <= now]
+            for batch in due:
+                self._in_flight.add(batch['id'])
+
+        for batch in due:
+            self._executor.submit(self._deliver, batch)
+
+    def _deliver(self, batch):
+        channel = self.channels.get(batch['channel'])
+        try:
+            if channel is None:
+                raise RuntimeError(f"알 수 없는 채널: {batch['channel']}")
+            channel.send(self._session, batch['alerts'])
+        except Exception as e:
+            self._on_failure(batch, e)
+        else:
+            self._on_success(batch)
+
+    def _on_success(self, batch):
+        now = time.time()
+        with self._lock:
+            self._outbox.pop(batch['id'], None)
+            self._in_flight.discard(batch['id'])
+            self._latencies.extend(now - a['created_at'] for a in batch['alerts'])
+            del self._latencies[:-1000]
+            self.stats['sent'] += 1
+            self._append_outbox([{'done': batch['id']}])
+
+    def _on_failure(self, batch, error):
+        with self._lock:
+            self._in_flight.discard(batch['id'])
+            batch['attempts'] += 1
+            self.stats['failed'] += 1
+
+            if batch['attempts'] > self.max_retries:
+                self._outbox.pop(batch['id'], None)
+                self.stats['dead'] += 1
+                print(f"❌ 알림 전송 포기 ({batch['channel']}): {error}")
+                record = {'done': batch['id']}
+            else:
+                batch['next_attempt'] = time.time() + self.backoff_base * 2 ** (batch['attempts'] - 1)
+                self.stats['retried'] += 1
+                record = {'retry': batch['id'], 'attempts': batch['attempts'],
+                          'next_attempt': batch['next_attempt']}
+            self._append_outbox([record])
+
+    def _load_outbox(self):
+        """outbox 기록을 처음부터 재생해 남은 배치 복원"""
+        outbox = {}
+        try:
+            if os.path.exists(self.outbox_path):
+                with open(self.outbox_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # 기록 도중 중단된 마지막 줄은 무시
+                            break
+                        self._outbox_lines += 1
+                        if 'put' in record:
+                            outbox[record['put']['id']] = record['put']
+                        elif 'done' in record:
+                            outbox.pop(record['done'], None)
+                        elif record.get('retry') in outbox:
+                            outbox[record['retry']].update(attempts=record['attempts'],
+                                                           next_attempt=record['next_attempt'])
+        except Exception as e:
+            print(f"⚠️ outbox 로드 실패: {e}")
+        return outbox
+
+    def _append_outbox(self, records):
+        """outbox에 변경 기록 추가, 기록이 쌓이면 남은 배치만으로 다시 씀 (호출자가 lock 보유)"""
+        try:
+            if self._outbox_file is None:
+                directory = os.path.dirname(self.outbox_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._outbox_file = open(self.outbox_path, 'a', encoding='utf-8')
+            for record in records:
+                self._outbox_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._outbox_file.flush()
+            self._outbox_lines += len(records)
+
+            if self._outbox_lines > max(OUTBOX_COMPACT_MIN, OUTBOX_COMPACT_RATIO * len(self._outbox)):
+                self._compact_outbox()
+        except Exception as e:
+            print(f"⚠️ outbox 저장 실패: {e}")
+
+    def _compact_outbox(self):
+        """남은 배치만 새 파일에 쓰고 원자적으로 교체 (호출자가 lock 보유)"""
+        self._outbox_file.close()
+        self._outbox_file = None
+        tmp_path = self.outbox_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for batch in self._outbox.values():
+                f.write(json.dumps({'put': batch}, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.outbox_path)
+        self._outbox_lines = len(self._outbox)
+
+
+def create_dispatcher_from_env(outbox_path=None):
+    """환경변수로 설정된 채널이 있으면 발송기 생성, 없으면 None (outbox_path: 프로세스별 outbox 파일, outbox_path())"""
+    channels = []
+
+    if os.environ.get('GMGN_WEBHOOK_URL'):
+        channels.append(WebhookChannel(os.environ['GMGN_WEBHOOK_URL']))
+
+    if os.environ.get('GMGN_TELEGRAM_TOKEN') and os.environ.get('GMGN_TELEGRAM_CHAT_ID'):
+        channels.append(TelegramChannel(os.environ['GMGN_TELEGRAM_TOKEN'],
+                                        os.environ['GMGN_TELEGRAM_CHAT_ID']))
+
+    if os.environ.get('GMGN_SMTP_HOST') and os.environ.get('GMGN_EMAIL_TO'):
+        channels.append(EmailChannel(os.environ['GMGN_SMTP_HOST'],
+                                     int(os.environ.get('GMGN_SMTP_PORT', '25')),
+                                     os.environ.get('GMGN_EMAIL_FROM', 'gmgn@localhost'),
+                                     os.environ['GMGN_EMAIL_TO'].split(',')))
+
+    if not channels:
+        return None
+    return NotificationDispatcher(channels, outbox_path=outbox_path)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+단계별 수집 파이프라인 - 단계 사이에 크기 제한 큐를 두어 역압(backpressure) 적용
+
+각 단계는 자신의 워커 수만큼 병렬로 실행되므로, 전체 처리량은
+모든 단계 시간의 합이 아니라 가장 느린 단계에 의해 결정됩니다.
+"""
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class Stage:
+    """파이프라인 단계 하나 - func(item)의 반환값이 다음 단계로 전달됨 (None이면 중단)"""
+
+    def __init__(self, name, func, workers=1, queue_size=10):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.max_depth = 0
+
+    def record(self, elapsed, error=False):
+        with self._lock:
+            if error:
+                self.errors += 1
+            else:
+                self.processed += 1
+            self.total_time += elapsed
+            self.max_time = max(self.max_time, elapsed)
+
+    def stats(self):
+        with self._lock:
+            count = self.processed + self.errors
+            return {
+                'workers': self.workers,
+                'processed': self.processed,
+                'errors': self.errors,
+                'queue_depth': self.queue.qsize(),
+                'queue_max_depth': self.max_depth,
+                'queue_capacity': self.queue.maxsize,
+                'latency_avg': self.total_time / count if count else 0.0,
+                'latency_max': self.max_time,
+            }
+
+
+class Pipeline:
+    """여러 Stage를 큐로 연결한 파이프라인"""
+
+    def __init__(self, stages):
+        self.stages = stages
+        self._threads = []
+
+    def start(self):
+        """모든 단계의 워커 스레드 시작"""
+        for index, stage in enumerate(self.stages):
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            for n in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(stage, next_stage),
+                                          name=f"{stage.name}-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def submit(self, item, timeout=None):
+        """첫 단계에 작업 투입 - 큐가 가득 차면 빈 자리가 날 때까지 대기"""
+        self._put(self.stages[0], item, timeout)
+
+    def join(self):
+        """투입된 작업이 모든 단계를 통과할 때까지 대기"""
+        for stage in self.stages:
+            stage.queue.join()
+
+    def stop(self):
+        """남은 작업을 처리한 뒤 워커 종료"""
+        self.join()
+        for stage in self.stages:
+            for _ in range(stage.workers):
+                stage.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def stats(self):
+        """단계별 지연 시간 및 큐 깊이 통계"""
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def _put(self, stage, item, timeout=None):
+        stage.queue.put(item, timeout=timeout)
+        depth = stage.queue.qsize()
+        if depth > stage.max_depth:
+            with stage._lock:
+                stage.max_depth = max(stage.max_depth, depth)
+
+    def _worker(self, stage, next_stage):
+        while True:
+            item = stage.queue.get()
+            if item is _STOP:
+                stage.queue.task_done()
+                break
+
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                stage.record(time.perf_counter() - start, error=True)
+                print(f"   ⚠️ [{stage.name}] 처리 실패: {e}")
+                result = None
+            else:
+                stage.record(time.perf_counter() - start)
+
+            if result is not None and next_stage is not None:
+                self._put(next_stage, result)
+            stage.queue.task_done()
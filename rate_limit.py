@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+웹 API 클라이언트별 속도 제한 및 과부하 시 요청 차단(load shedding)
+
+클라이언트마다 토큰 버킷(egress.TokenBucket)을 두고, 요청 종류(우선순위)마다 비용을 다르게
+차감합니다. 처리 중인 요청 수가 한도에 가까워지면 낮은 우선순위부터 429 + Retry-After로
+바로 돌려보내므로, 봇이 /api/update나 전체 /api/tokens를 두드려도 대시보드 요청은 처리됩니다.
+
+설정: GMGN_RATE_LIMIT=20 (클라이언트당 초당 요청), GMGN_RATE_BURST=100, GMGN_MAX_INFLIGHT=16,
+      GMGN_TRUST_PROXY=1 (리버스 프록시 뒤에서 X-Forwarded-For 첫 주소를 클라이언트로 사용)
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from egress import TokenBucket
+
+RATE_LIMIT = float(os.environ.get('GMGN_RATE_LIMIT', '20'))
+RATE_BURST = float(os.environ.get('GMGN_RATE_BURST', '100'))
+MAX_INFLIGHT = int(os.environ.get('GMGN_MAX_INFLIGHT', '16'))
+TRUST_PROXY = os.environ.get('GMGN_TRUST_PROXY', '') == '1'
+
+# 버킷을 보관할 최대 클라이언트 수 (넘으면 가장 오래 조용한 클라이언트부터 제거)
+MAX_CLIENTS = 10000
+
+# 우선순위별 버킷 비용과, 처리 중 요청이 MAX_INFLIGHT의 이 비율에 도달하면 차단
+COSTS = {'high': 1, 'normal': 1, 'low': 10, 'stream': 1}
+SHED_AT = {'high': 1.0, 'normal': 0.75, 'low': 0.5}
+
+# 과부하로 차단할 때 안내할 재시도 시간 (초)
+SHED_RETRY_AFTER = 1
+
+
+def request_priority(method, path, args, serves_delta=None):
+    """요청 우선순위 - None(제한 없음) / high / normal / low / stream(처리 중 수에 포함하지 않음)
+
+    serves_delta(since): /api/tokens?since=가 변경분만으로 응답되는지 (SnapshotTracker.covers).
+    범위를 벗어난 since(예: since=0)는 전체 스냅샷을 보내므로 since 없는 요청과 같이 취급합니다.
+    """
+    if path == '/healthz':
+        return None
+    if path == '/' or path.startswith('/static/'):
+        return 'high'
+    if path == '/api/tokens':
+        # 대시보드는 변경분만 요청, 전체 스냅샷 요청은 낮은 우선순위
+        try:
+            since = int(args['since'])
+        except (KeyError, TypeError, ValueError):
+            return 'low'
+        return 'high' if serves_delta is not None and serves_delta(since) else 'low'
+    if path in ('/api/update', '/api/export') or (path == '/api/tokens/batch' and method == 'POST'):
+        return 'low'
+    if path.endswith('/stream') or (path.endswith('/events') and 'wait' in args):
+        return 'stream'
+    return 'normal'
+
+
+def client_id(remote_addr, forwarded_for=None):
+    """속도 제한 키 - 프록시를 신뢰하면 X-Forwarded-For의 첫 주소"""
+    if TRUST_PROXY and forwarded_for:
+        return forwarded_for.split(',')[0].strip()
+    return remote_addr or 'unknown'
+
+
+class RateLimiter:
+    """클라이언트별 토큰 버킷 + 처리 중 요청 수 기반 우선순위 차단"""
+
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_BURST, max_inflight=MAX_INFLIGHT,
+                 max_clients=MAX_CLIENTS, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_inflight = max_inflight
+        self.max_clients = max_clients
+        self.clock = clock
+        self.in_flight = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = {'rate_limited': 0, 'shed': 0}
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def admit(self, client, priority):
+        """요청 허용 여부 - (True, 0) 또는 (False, Retry-After 초, 사유). 허용한 요청은 끝나면 release() 호출"""
+        with self._lock:
+            # 과부하 차단은 버킷을 소모하지 않음 (재시도 시 불이익 없음)
+            limit = SHED_AT.get(priority)
+            if limit is not None and self.in_flight >= self.max_inflight * limit:
+                self.rejected['shed'] += 1
+                return False, SHED_RETRY_AFTER, 'shed'
+
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, self.clock)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+
+            cost = COSTS[priority]
+            if not bucket.try_acquire(cost):
+                self.rejected['rate_limited'] += 1
+                return False, max(1, math.ceil(bucket.wait_time(cost))), 'rate_limited'
+
+            if priority in SHED_AT:
+                self.in_flight += 1
+            return True, 0, None
+
+    def release(self):
+        """admit로 허용한 요청 종료"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def stats(self):
+        with self._lock:
+            return {'clients': len(self._buckets), 'in_flight': self.in_flight,
+                    'max_inflight': self.max_inflight, **self.rejected}
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+알림 규칙 백테스트 - 저장된 스냅샷을 시간 순서로 재생하여 규칙별 정밀도 계산
+
+기간을 여러 구간으로 나눠 프로세스별로 처리하고, 각 구간은 (시간 × 토큰) 행렬로
+만들어 모든 규칙을 벡터 연산으로 평가합니다. 알림 후 horizon 시간 뒤 가격이
+알림 시점보다 높으면 "계속 상승"으로 집계합니다.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import storage
+from snapshot_diff import token_key
+
+# 기본 규칙 - check_alerts(30%), 대시보드 pumping_count(20%), 모니터 30분 구간 상승(30%)
+DEFAULT_RULES = {
+    'change_24h>30': ('change_24h', 30.0),
+    'change_24h>20': ('change_24h', 20.0),
+    'window_30m>=30': ('window', 30 * 60, 30.0),
+}
+
+
+def load_matrix(start, end, directory='.'):
+    """구간의 스냅샷을 (times, keys, price[T, N], change[T, N]) 행렬로 변환"""
+    if storage.STORAGE_BACKEND == 'sqlite':
+        return _load_matrix_db(start, end)
+
+    times = []
+    index = {}
+    rows = []
+    for ts, tokens in storage.iter_snapshots(start, end, directory):
+        row = {}
+        for token in tokens:
+            key = token_key(token)
+            if key is None:
+                continue
+            column = index.get(key)
+            if column is None:
+                column = index[key] = len(index)
+            row[column] = (token.get('price'), token.get('change_24h'))
+        times.append(ts)
+        rows.append(row)
+
+    price = np.full((len(times), len(index)), np.nan)
+    change = np.full((len(times), len(index)), np.nan)
+    for t, row in enumerate(rows):
+        if not row:
+            continue
+        columns = np.fromiter(row.keys(), dtype=int, count=len(row))
+        values = np.array([[_number(p), _number(c)] for p, c in row.values()], dtype=float)
+        price[t, columns] = values[:, 0]
+        change[t, columns] = values[:, 1]
+
+    return np.array(times, dtype=float), list(index), price, change
+
+
+def _load_matrix_db(start, end):
+    """SQLite에서 열 단위로 읽어 행렬 구성 (토큰별 dict 생성 없음)"""
+    rows = storage.load_price_rows(start, end)
+    if not rows:
+        return np.array([]), [], np.empty((0, 0)), np.empty((0, 0))
+
+    ts_col, key_col, price_col, change_col = zip(*rows)
+    # 행이 ts 순서로 정렬되어 있으므로 factorize 결과도 시간 순서
+    t_index, times = pd.factorize(np.array(ts_col, dtype=float))
+    k_index, keys = pd.factorize(pd.Series(key_col, dtype=object), use_na_sentinel=True)
+    # token_id가 NULL인 행은 -1이 되어 마지막 토큰 열에 덮어쓰므로 제외 (시각은 그대로 유지)
+    valid = k_index >= 0
+
+    price = np.full((len(times), len(keys)), np.nan)
+    change = np.full((len(times), len(keys)), np.nan)
+    price[t_index[valid], k_index[valid]] = np.array(price_col, dtype=float)[valid]
+    change[t_index[valid], k_index[valid]] = np.array(change_col, dtype=float)[valid]
+    return np.asarray(times, dtype=float), list(keys), price, change
+
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+def rule_mask(rule, times, price, change):
+    """규칙이 참인 (시간, 토큰) 위치의 bool 행렬"""
+    if rule[0] == 'change_24h':
+        with np.errstate(invalid='ignore'):
+            return change > rule[1]
+
+    _, window, threshold = rule
+    # 각 시점에서 window 이전 (또는 그 직전) 스냅샷의 가격과 비교
+    ref = np.searchsorted(times, times - window, side='right') - 1
+    valid = ref >= 0
+    ref_price = np.where(valid[:, None], price[np.maximum(ref, 0)], np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (price / ref_price - 1.0) * 100 >= threshold
+
+
+def evaluate_range(start, end, horizon, rules, directory='.', backend=None, db_path=None):
+    """[start, end) 구간에서 발생한 알림을 평가 (horizon만큼 뒤 데이터까지 읽음)"""
+    if backend:
+        storage.STORAGE_BACKEND = backend
+    if db_path:
+        storage.DB_PATH = db_path
+
+    # 구간 시작 직전 상태(알림 엣지 판단)와 window 규칙의 기준 가격을 위해 앞쪽도 함께 읽음
+    lookback = max([r[1] for r in rules.values() if r[0] == 'window'] + [horizon])
+    times, _, price, change = load_matrix(start - lookback, end + horizon, directory)
+    stats = {name: {'alerts': 0, 'evaluated': 0, 'rising': 0, 'return_sum': 0.0} for name in rules}
+    if len(times) == 0:
+        return stats
+
+    # horizon 뒤 첫 스냅샷 위치 (없으면 평가 불가)
+    future = np.searchsorted(times, times + horizon, side='left')
+    has_future = future < len(times)
+    future_price = np.where(has_future[:, None], price[np.minimum(future, len(times) - 1)], np.nan)
+    in_range = (times >= start) & (times < end)
+
+    for name, rule in rules.items():
+        fired = rule_mask(rule, times, price, change)
+        # 규칙이 거짓 → 참으로 바뀌는 시점만 알림으로 간주 (계속 참이면 중복 알림 없음)
+        previous = np.vstack([np.zeros((1, fired.shape[1]), dtype=bool), fired[:-1]])
+        alerts = fired & ~previous & in_range[:, None]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            forward = future_price / price - 1.0
+        known = alerts & np.isfinite(forward)
+
+        stats[name]['alerts'] += int(alerts.sum())
+        stats[name]['evaluated'] += int(known.sum())
+        stats[name]['rising'] += int((forward[known] > 0).sum())
+        stats[name]['return_sum'] += float(forward[known].sum())
+
+    return stats
+
+
+def merge_stats(parts):
+    total = {}
+    for part in parts:
+        for name, counts in part.items():
+            merged = total.setdefault(name, dict.fromkeys(counts, 0))
+            for field, value in counts.items():
+                merged[field] += value
+    return total
+
+
+def run_replay(horizon=3600, rules=None, start=None, end=None, workers=None, chunks=None, directory='.'):
+    """전체 기간을 구간으로 나눠 병렬 평가 후 규칙별 통계 반환"""
+    rules = rules or DEFAULT_RULES
+    bounds = storage.snapshot_bounds(directory)
+    if bounds is None:
+        return {}
+
+    start = bounds[0] if start is None else start
+    end = bounds[1] + 1e-6 if end is None else end
+    workers = workers or os.cpu_count() or 1
+    chunks = chunks or workers * 4
+    edges = np.linspace(start, end, chunks + 1)
+
+    args = [(a, b, horizon, rules, directory, storage.STORAGE_BACKEND, storage.DB_PATH)
+            for a, b in zip(edges[:-1], edges[1:])]
+    if workers == 1:
+        parts = [evaluate_range(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(evaluate_range, *zip(*args)))
+
+    stats = merge_stats(parts)
+    for counts in stats.values():
+        evaluated = counts['evaluated']
+        counts['precision'] = counts['rising'] / evaluated if evaluated else None
+        counts['avg_return'] = counts.pop('return_sum') / evaluated if evaluated else None
+    return stats
+
+
+def parse_rule(text):
+    """규칙 문자열 파싱: change_24h>25 또는 window_15m>=40"""
+    if text.startswith('change_24h>'):
+        return text, ('change_24h', float(text.split('>', 1)[1]))
+    if text.startswith('window_') and '>=' in text:
+        span, threshold = text[len('window_'):].split('>=', 1)
+        return text, ('window', int(span.rstrip('m')) * 60, float(threshold))
+    raise ValueError(f"규칙 형식 오류: {text}")
+
+
+def parse_time(text):
+    if text is None:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text).timestamp()
+
+
+def print_stats(stats, horizon, elapsed):
+    print(f"\n📊 알림 규칙 백테스트 결과 (horizon {horizon / 60:.0f}분, {elapsed:.2f}초)")
+    print(f"   {'규칙':<18}{'알림':>8}{'평가':>8}{'정밀도':>10}{'평균 수익률':>12}")
+    for name, counts in stats.items():
+        precision = '-' if counts['precision'] is None else f"{counts['precision'] * 100:.1f}%"
+        avg_return = '-' if counts['avg_return'] is None else f"{counts['avg_return'] * 100:+.2f}%"
+        print(f"   {name:<18}{counts['alerts']:>8}{counts['evaluated']:>8}{precision:>10}{avg_return:>12}")
+
+
+def build_parser(parser=None):
+    parser = parser or argparse.ArgumentParser(description="알림 규칙 백테스트")
+    parser.add_argument('--horizon', type=int, default=60, help="알림 후 평가 시점 (분)")
+    parser.add_argument('--rule', action='append', help="규칙 (예: change_24h>25, window_30m>=30), 여러 번 지정 가능")
+    parser.add_argument('--start', help="시작 시각 (ISO 또는 epoch)")
+    parser.add_argument('--end', help="종료 시각 (ISO 또는 epoch)")
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--dir', default='.', help="JSON 아카이브 디렉토리")
+    return parser
+
+
+def main(args=None):
+    """메인 실행 함수"""
+    if args is None:
+        args = build_parser().parse_args()
+
+    rules = dict(parse_rule(r) for r in args.rule) if args.rule else DEFAULT_RULES
+    horizon = args.horizon * 60
+
+    started = time.perf_counter()
+    stats = run_replay(horizon, rules, parse_time(args.start), parse_time(args.end),
+                       args.workers, directory=args.dir)
+    if not stats:
+        print("❌ 재생할 스냅샷이 없습니다.")
+        return
+
+    print_stats(stats, horizon, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
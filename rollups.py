@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+다중 해상도 롤업 (1m/5m/1h/1d) - 스냅샷 저장 시 토큰별 구간 OHLC를 증분 갱신
+
+구간마다 처음/마지막 샘플 시각을 함께 저장해서 늦게 도착하거나 순서가 뒤바뀐
+스냅샷도 올바르게 반영합니다 (open은 가장 이른 샘플, close/거래량/시가총액은
+가장 늦은 샘플 기준). 긴 기간 조회는 원본 대신 구간 행 수백 개만 읽습니다.
+구간은 토큰 id(token_registry) 단위로 관리합니다.
+"""
+from snapshot_diff import token_key
+
+# 해상도 이름 → 구간 길이 (초)
+RESOLUTIONS = {'1m': 60, '5m': 300, '1h': 3600, '1d': 86400}
+
+# 조회 시 이 행 수 이하가 되는 가장 세밀한 해상도 선택
+MAX_ROWS = 500
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution INTEGER NOT NULL,
+    token_id INTEGER NOT NULL,
+    bucket REAL NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    first_ts REAL NOT NULL,
+    last_ts REAL NOT NULL,
+    volume_24h REAL,
+    market_cap REAL,
+    samples INTEGER NOT NULL,
+    PRIMARY KEY (resolution, token_id, bucket)
+) WITHOUT ROWID;
+"""
+
+# SET 절의 컬럼 참조는 모두 갱신 전 값이므로 비교 순서와 무관
+UPSERT_ROLLUP_SQL = """
+INSERT INTO rollups (resolution, token_id, bucket, open, high, low, close, first_ts, last_ts,
+                     volume_24h, market_cap, samples)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+ON CONFLICT (resolution, token_id, bucket) DO UPDATE SET
+    open = CASE WHEN excluded.first_ts < first_ts THEN excluded.open ELSE open END,
+    first_ts = MIN(first_ts, excluded.first_ts),
+    high = MAX(high, excluded.high),
+    low = MIN(low, excluded.low),
+    close = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close ELSE close END,
+    volume_24h = CASE WHEN excluded.last_ts >= last_ts
+                      THEN COALESCE(excluded.volume_24h, volume_24h) ELSE volume_24h END,
+    market_cap = CASE WHEN excluded.last_ts >= last_ts
+                      THEN COALESCE(excluded.market_cap, market_cap) ELSE market_cap END,
+    last_ts = MAX(last_ts, excluded.last_ts),
+    samples = samples + 1
+"""
+
+ROLLUP_RANGE_SQL = (
+    "SELECT bucket, open, high, low, close, volume_24h, market_cap, samples FROM rollups"
+    " WHERE resolution = ? AND token_id = ? AND bucket >= ? AND bucket <= ? ORDER BY bucket"
+)
+
+
+def bucket_start(ts, seconds):
+    return ts - ts % seconds
+
+
+def rollup_rows(ts, tokens, resolutions=None):
+    """스냅샷 하나의 UPSERT 파라미터 생성 (가격이 없는 토큰 제외)"""
+    seconds = [RESOLUTIONS[name] for name in (resolutions or RESOLUTIONS)]
+    for token in tokens:
+        price = token.get('price')
+        key = token_key(token)
+        if key is None or not isinstance(price, (int, float)):
+            continue
+        volume = token.get('volume_24h')
+        market_cap = token.get('market_cap')
+        for resolution in seconds:
+            yield (resolution, key, bucket_start(ts, resolution), price, price, price, price, ts, ts,
+                   volume if isinstance(volume, (int, float)) else None,
+                   market_cap if isinstance(market_cap, (int, float)) else None)
+
+
+def update_rollups(conn, ts, tokens):
+    """스냅샷 하나를 모든 해상도 롤업에 반영 (호출 측 트랜잭션 안에서 실행)"""
+    conn.executemany(UPSERT_ROLLUP_SQL, rollup_rows(ts, tokens))
+
+
+def pick_resolution(span, max_rows=MAX_ROWS):
+    """span초 구간을 max_rows행 이하로 읽을 수 있는 가장 세밀한 해상도 이름"""
+    for name, seconds in RESOLUTIONS.items():
+        if span / seconds <= max_rows:
+            return name
+    return list(RESOLUTIONS)[-1]
+
+
+def load_rollups(conn, key, resolution, start=None, end=None):
+    """토큰의 구간 행 목록 - load_history와 같은 키(price = 구간 종가)에 open/high/low/samples 추가"""
+    seconds = RESOLUTIONS[resolution]
+    start = float('-inf') if start is None else bucket_start(start, seconds)
+    end = float('inf') if end is None else end
+
+    return [{'ts': bucket, 'open': open_, 'high': high, 'low': low, 'price': close,
+             'volume_24h': volume, 'market_cap': market_cap, 'samples': samples}
+            for bucket, open_, high, low, close, volume, market_cap, samples
+            in conn.execute(ROLLUP_RANGE_SQL, (seconds, key, start, end))]
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+토큰 검색 인덱스 - 심볼, 이름, 컨트랙트 주소의 접두사 및 오타 허용 검색
+
+검색어(term)는 정렬된 목록으로 관리해 접두사를 이진 탐색으로 찾고,
+오타 허용 검색은 3-gram 역색인으로 후보를 좁힌 뒤 편집 거리로 확인합니다.
+새 토큰이 등장하거나 이름이 바뀐 토큰만 인덱스를 갱신하고, 스냅샷에서 사라진 토큰은 지웁니다.
+"""
+import bisect
+import heapq
+import re
+import threading
+from collections import Counter
+import numpy as np
+from snapshot_diff import token_key
+
+# 점수 - 정확히 일치 > 심볼 접두사 > 이름/주소 접두사 > 오타 허용 일치
+SCORE_EXACT = 100.0
+SCORE_SYMBOL_PREFIX = 80.0
+SCORE_PREFIX = 60.0
+SCORE_FUZZY = 40.0
+
+# 접두사 검색 시 확인할 최대 검색어 수 (짧은 검색어가 너무 많은 항목과 일치하는 경우)
+PREFIX_SCAN_LIMIT = 500
+FUZZY_CANDIDATES = 20
+
+# 이보다 많은 검색어에 등장하는 3-gram은 오타 허용 후보 선정에서 제외
+COMMON_GRAM_TERMS = 500
+
+WORD_PATTERN = re.compile(r'[\w]+')
+
+
+def trigrams(term):
+    """앞뒤에 경계 문자를 붙인 3-gram 집합"""
+    padded = f"^{term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(term):
+    return 1 if len(term) <= 5 else 2
+
+
+def edit_distance(a, b, limit):
+    """편집 거리 - 삽입/삭제/교체와 인접 문자 뒤바뀜 (limit을 넘으면 limit + 1)
+
+    대각선 주변 limit 폭만 계산합니다.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        ca = a[i - 1]
+        for j in range(low, high + 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != b[j - 1]))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == b[j - 1]:
+                cost = min(cost, before[j - 2] + 1)
+            current[j] = cost
+        if min(current[low - 1:high + 1]) > limit:
+            return over
+        before, previous = previous, current
+    return min(previous[-1], over)
+
+
+class SearchIndex:
+    """토큰 검색 인덱스 (증분 갱신)"""
+
+    def __init__(self, capacity=1024):
+        self.docs = []                      # 문서 id → 토큰 요약 (지운 문서는 None)
+        self._free = []                     # 지운 문서 id (새 토큰에 재사용)
+        self._ids = {}                      # 토큰 key → 문서 id
+        self._fields = []                   # 문서 id → (symbol, name, address) - 변경 여부 확인용
+        self._market_cap = np.zeros(capacity)  # 같은 점수 안에서의 순위
+        self._terms = []                    # 정렬된 검색어 목록
+        self._postings = {}                 # 검색어 → {필드: 문서 id 집합}
+        self._grams = {}                    # 3-gram → 검색어 집합
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    @staticmethod
+    def _doc_terms(symbol, name, address):
+        terms = set()
+        if symbol:
+            terms.add((symbol.lower(), 'symbol'))
+        if name:
+            lowered = name.lower()
+            terms.add((lowered, 'name'))
+            terms.update((word, 'name') for word in WORD_PATTERN.findall(lowered))
+        if address:
+            terms.add((address.lower(), 'address'))
+        return terms
+
+    def _add_term(self, term, field, doc_id):
+        postings = self._postings.get(term)
+        if postings is None:
+            postings = self._postings[term] = {}
+            bisect.insort(self._terms, term)
+            for gram in trigrams(term):
+                self._grams.setdefault(gram, set()).add(term)
+        postings.setdefault(field, set()).add(doc_id)
+
+    def _remove_term(self, term, field, doc_id):
+        postings = self._postings[term]
+        postings[field].discard(doc_id)
+        if not postings[field]:
+            del postings[field]
+        if postings:
+            return
+        del self._postings[term]
+        del self._terms[bisect.bisect_left(self._terms, term)]
+        for gram in trigrams(term):
+            terms = self._grams[gram]
+            terms.discard(term)
+            if not terms:
+                del self._grams[gram]
+
+    def _remove_doc(self, key):
+        doc_id = self._ids.pop(key)
+        for term, field in self._doc_terms(*self._fields[doc_id]):
+            self._remove_term(term, field, doc_id)
+        self.docs[doc_id] = None
+        self._fields[doc_id] = None
+        self._market_cap[doc_id] = 0.0
+        self._free.append(doc_id)
+
+    def add(self, tokens):
+        """스냅샷의 토큰 반영 - 새 토큰/바뀐 토큰만 인덱싱, 새로 인덱싱한 수 반환"""
+        with self._lock:
+            return self._index(tokens)
+
+    def sync(self, tokens):
+        """스냅샷 게시 - 스냅샷에 없는 토큰을 인덱스에서 지운 뒤 토큰 반영, 지운 수 반환"""
+        with self._lock:
+            current = {token_key(token) for token in tokens}
+            stale = [key for key in self._ids if key not in current]
+            for key in stale:
+                self._remove_doc(key)
+            self._index(tokens)
+            return len(stale)
+
+    def _index(self, tokens):
+        indexed = 0
+        for token in tokens:
+            key = token_key(token)
+            if key is None:
+                continue
+            fields = (token.get('symbol') or '', token.get('name') or '', token.get('address') or '')
+            doc = {'key': key, 'symbol': fields[0], 'name': fields[1], 'address': fields[2] or None,
+                   'chain': token.get('chain'), 'price': token.get('price'),
+                   'market_cap': token.get('market_cap')}
+
+            doc_id = self._ids.get(key)
+            if doc_id is None and self._free:
+                doc_id = self._ids[key] = self._free.pop()
+                self.docs[doc_id] = doc
+            elif doc_id is None:
+                doc_id = self._ids[key] = len(self.docs)
+                self.docs.append(doc)
+                self._fields.append(None)
+                if doc_id >= len(self._market_cap):
+                    self._market_cap = np.concatenate([self._market_cap, np.zeros(len(self._market_cap))])
+            else:
+                self.docs[doc_id] = doc
+            cap = doc['market_cap']
+            self._market_cap[doc_id] = cap if isinstance(cap, (int, float)) else 0.0
+
+            previous = self._fields[doc_id]
+            if previous == fields:
+                continue
+            old_terms = self._doc_terms(*previous) if previous else set()
+            new_terms = self._doc_terms(*fields)
+            for term, field in old_terms - new_terms:
+                self._remove_term(term, field, doc_id)
+            for term, field in new_terms - old_terms:
+                self._add_term(term, field, doc_id)
+            self._fields[doc_id] = fields
+            indexed += 1
+        return indexed
+
+    def search(self, query, limit=10):
+        """검색어와 일치하는 토큰을 점수 순으로 반환 (같은 점수는 시가총액 순)"""
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        with self._lock:
+            matches = self._prefix_terms(query)
+            found = sum(len(self._postings[term][field]) for _, term, field in matches)
+            if found < limit and len(query) >= 3:
+                matches += self._fuzzy_terms(query, exclude={term for _, term, _ in matches})
+
+            # 점수가 높은 검색어부터 문서를 모으고, limit개가 찬 뒤에는 더 낮은 점수는 보지 않음
+            matches.sort(key=lambda m: -m[0])
+            results = {}
+            floor = None
+            for score, term, field in matches:
+                if len(results) >= limit and score < floor:
+                    break
+                for doc_id in self._top_docs(self._postings[term][field], limit, results):
+                    results[doc_id] = (score, field)
+                floor = score
+
+            ranked = sorted(results.items(), key=lambda item: (-item[1][0], -self._market_cap[item[0]]))
+            return [dict(self.docs[doc_id], score=round(score, 2), matched=field)
+                    for doc_id, (score, field) in ranked[:limit]]
+
+    def _top_docs(self, doc_ids, limit, exclude):
+        """문서 집합에서 시가총액 상위 limit개 (이미 찾은 문서 제외)"""
+        if len(doc_ids) <= limit:
+            return [d for d in doc_ids if d not in exclude]
+        ids = np.fromiter(doc_ids, dtype=np.int64, count=len(doc_ids))
+        take = min(len(ids), limit + len(exclude))
+        top = ids[np.argpartition(-self._market_cap[ids], take - 1)[:take]]
+        return [d for d in top.tolist() if d not in exclude][:limit]
+
+    def _prefix_terms(self, query):
+        """접두사 일치 (점수, 검색어, 필드) - 정렬된 목록에서 이진 탐색 후 연속 구간만 확인"""
+        matches = []
+        start = bisect.bisect_left(self._terms, query)
+        for term in self._terms[start:start + PREFIX_SCAN_LIMIT]:
+            if not term.startswith(query):
+                break
+            for field in self._postings[term]:
+                if term == query:
+                    score = SCORE_EXACT if field == 'symbol' else SCORE_EXACT - 10
+                else:
+                    base = SCORE_SYMBOL_PREFIX if field == 'symbol' else SCORE_PREFIX
+                    score = base - (len(term) - len(query)) / len(term)
+                matches.append((score, term, field))
+        return matches
+
+    def _fuzzy_terms(self, query, exclude):
+        """오타 허용 일치 (점수, 검색어, 필드) - 3-gram을 많이 공유하는 후보만 편집 거리로 확인"""
+        shared = Counter()
+        grams = [self._grams.get(gram, ()) for gram in trigrams(query)]
+        # 너무 흔한 3-gram은 후보를 좁히는 데 도움이 되지 않으므로 제외 (모두 흔하면 그대로 사용)
+        selective = [terms for terms in grams if len(terms) <= COMMON_GRAM_TERMS] or grams
+        for terms in selective:
+            shared.update(terms)
+
+        candidates = [term for term, _ in shared.most_common(FUZZY_CANDIDATES)]
+
+        # 인접 문자가 뒤바뀐 오타는 3-gram이 거의 겹치지 않으므로 뒤바꾼 접두사로 직접 찾음
+        for i in range(len(query) - 1):
+            variant = query[:i] + query[i + 1] + query[i] + query[i + 2:]
+            start = bisect.bisect_left(self._terms, variant)
+            for term in self._terms[start:start + FUZZY_CANDIDATES]:
+                if not term.startswith(variant):
+                    break
+                candidates.append(term)
+
+        typos = max_typos(query)
+        matches = []
+        for term in dict.fromkeys(candidates):
+            if term in exclude:
+                continue
+            # 같은 길이의 접두사까지 비교해 긴 이름의 앞부분 오타도 허용
+            distance = min(edit_distance(query, term, typos),
+                           edit_distance(query, term[:len(query)], typos) + 0.5)
+            if distance <= typos:
+                matches.extend((SCORE_FUZZY - distance * 10 + (field == 'symbol'), term, field)
+                               for field in self._postings[term])
+        return matches
+
+    def stats(self):
+        with self._lock:
+            return {'tokens': len(self._ids), 'terms': len(self._terms), 'grams': len(self._grams)}
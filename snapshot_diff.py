@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+스냅샷 변경분(delta) 계산 - 버전별 증분 응답용
+"""
+import threading
+import time
+from collections import deque
+from token_registry import default_registry
+
+# 변경 여부를 비교하는 필드
+TRACKED_FIELDS = ('name', 'price', 'change_24h', 'market_cap', 'volume_24h')
+
+
+def token_key(token):
+    """토큰 식별자 - (체인, 컨트랙트 주소)의 정수 id (token_registry)"""
+    return default_registry().key(token)
+
+
+def token_label(key):
+    """알림/화면 표시용 토큰 이름 (심볼)"""
+    return default_registry().label(key)
+
+
+def compute_delta(old_tokens, old_ranks, new_tokens):
+    """이전 스냅샷(dict) 대비 새 스냅샷의 변경분 계산
+
+    old_tokens: {key: token}, old_ranks: {key: rank}
+    반환값: (delta, new_tokens_map, new_ranks)
+    """
+    new_map = {}
+    new_ranks = {}
+    for rank, token in enumerate(new_tokens):
+        key = token_key(token)
+        if key is None or key in new_map:
+            continue
+        new_map[key] = token
+        new_ranks[key] = rank
+
+    added = []
+    changed = []
+    moved = []
+    for key, token in new_map.items():
+        old = old_tokens.get(key)
+        if old is None:
+            added.append(token)
+            continue
+
+        fields = {f: token.get(f) for f in TRACKED_FIELDS if token.get(f) != old.get(f)}
+        if fields:
+            changed.append({'key': key, 'fields': fields})
+
+        if old_ranks[key] != new_ranks[key]:
+            moved.append({'key': key, 'from': old_ranks[key], 'to': new_ranks[key]})
+
+    removed = [key for key in old_tokens if key not in new_map]
+
+    delta = {'added': added, 'removed': removed, 'changed': changed, 'moved': moved}
+    return delta, new_map, new_ranks
+
+
+def is_empty_delta(delta):
+    """변경분이 비어 있는지 확인"""
+    return not any(delta[k] for k in ('added', 'removed', 'changed', 'moved'))
+
+
+class SnapshotTracker:
+    """스냅샷 버전 관리 및 최근 변경분 보관"""
+
+    def __init__(self, history_size=100, epoch=None):
+        # 프로세스마다 다른 시작 버전 (ms 시각) - 재시작 전 버전으로 since를 보내면
+        # 이전 프로세스의 번호가 새 번호와 겹치지 않아 전체 재동기화로 처리됨
+        self.epoch = int(time.time() * 1000) if epoch is None else epoch
+        self.version = self.epoch
+        self._tokens = {}
+        self._ranks = {}
+        self._snapshot = []
+        self._deltas = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def publish(self, tokens):
+        """새 스냅샷 등록 - 변경이 있을 때만 버전 증가, 현재 버전 반환"""
+        with self._lock:
+            delta, new_map, new_ranks = compute_delta(self._tokens, self._ranks, tokens)
+            if is_empty_delta(delta):
+                return self.version
+
+            self.version += 1
+            delta['version'] = self.version
+            self._deltas.append(delta)
+            self._tokens = new_map
+            self._ranks = new_ranks
+            self._snapshot = list(tokens)
+            return self.version
+
+    def snapshot(self):
+        """(현재 버전, 토큰 목록) 반환"""
+        with self._lock:
+            return self.version, self._snapshot
+
+    def changes_since(self, since):
+        """since 버전 이후의 변경분 목록 반환, 너무 오래되었거나 다른 프로세스의 버전이면 None (전체 재동기화 필요)"""
+        with self._lock:
+            if not self._covers(since):
+                return None
+            return [d for d in self._deltas if d['version'] > since]
+
+    def covers(self, since):
+        """since 버전에 변경분만으로 응답할 수 있는지 (전체 스냅샷이 필요 없으면 True)"""
+        with self._lock:
+            return self._covers(since)
+
+    def _covers(self, since):
+        if since < self.epoch or since > self.version:
+            return False
+        if since == self.version:
+            return True
+        # 보관 중인 가장 오래된 변경분의 기준 버전 이후만 가능
+        return bool(self._deltas) and since >= self._deltas[0]['version'] - 1
@@ -1,11 +1,8 @@
 #!/usr/bin/env python3
 """
-GMGN 트래커 간단 시작 스크립트
+GMGN 트래커 간단 시작 스크립트 - 메뉴 선택을 cli.py 하위 명령으로 같은 프로세스에서 실행
 """
-import os
-import sys
-import time
-import subprocess
+import cli
 
 def show_menu():
     """메뉴 표시"""
@@ -22,31 +19,23 @@ def show_menu():
 def run_scraper():
     """스크래퍼 실행"""
     print("📥 데이터 수집 중...")
-    subprocess.run([sys.executable, 'gmgn_scraper.py'])
+    cli.main(['scrape', '--once'])
 
 def start_web():
     """웹 서버 시작"""
     print("🌐 웹 서버 시작...")
     print("📍 사용 가능한 포트를 자동으로 찾는 중...")
-    subprocess.run([sys.executable, 'web_app.py'])
+    # 디버그 재시작(reloader)은 메뉴 스크립트를 다시 실행하므로 사용하지 않음
+    cli.main(['serve'])
 
 def start_monitor():
     """자동 모니터링 시작"""
     print("🤖 자동 모니터링 시작...")
-    subprocess.run([sys.executable, 'auto_monitor.py'])
+    cli.main(['monitor'])
 
 def show_files():
     """파일 목록 표시"""
-    print("\n📄 생성된 파일들:")
-    files = [f for f in os.listdir('.') if f.endswith('.json')]
-    for file in files:
-        size = os.path.getsize(file)
-        print(f"  📄 {file} ({size} bytes)")
-    
-    if not files:
-        print("  아직 데이터 파일이 없습니다.")
-        print("  먼저 '1. 데이터 수집'을 실행해보세요.")
-    print()
+    cli.main(['ls'])
 
 def main():
     """메인 함수"""
@@ -0,0 +1,307 @@
+// 보이는 구간의 행만 DOM에 두고(가상 스크롤), 토큰 데이터는 컬럼별 typed array로 보관
+const ROW_HEIGHT = 56;
+const OVERSCAN = 8;
+const POLL_MS = 10000;
+const FLASH_MS = 2000;
+const PUMPING_THRESHOLD = 20;
+
+const store = {
+    size: 0,
+    capacity: 0,
+    index: new Map(),   // 토큰 key → 행 번호
+    keys: [], symbol: [], name: [], search: [],
+    price: null, change: null, mcap: null, volume: null, updated: null, rank: null,
+};
+const NUMERIC_FIELDS = { price: 'price', change_24h: 'change', market_cap: 'mcap', volume_24h: 'volume' };
+const view = { order: new Uint32Array(0), sortKey: 'rank', dir: 1, query: '', pumpingOnly: false };
+
+const viewport = document.getElementById('table-viewport');
+const tbody = document.getElementById('token-rows');
+const spacerTop = document.getElementById('spacer-top');
+const spacerBottom = document.getElementById('spacer-bottom');
+const pool = [];
+let version = 0;
+let renderScheduled = false;
+
+// snapshot_diff.token_key와 같은 식별자
+function tokenKey(token) {
+    return token.id;
+}
+
+function grow(minimum) {
+    if (minimum <= store.capacity) return;
+    const capacity = Math.max(minimum, store.capacity * 2, 256);
+    for (const column of ['price', 'change', 'mcap', 'volume', 'updated']) {
+        const next = new Float64Array(capacity).fill(NaN);
+        if (store[column]) next.set(store[column]);
+        store[column] = next;
+    }
+    const rank = new Int32Array(capacity);
+    if (store.rank) rank.set(store.rank);
+    store.rank = rank;
+    store.capacity = capacity;
+}
+
+function setFields(i, fields) {
+    for (const [field, column] of Object.entries(NUMERIC_FIELDS)) {
+        if (field in fields) {
+            store[column][i] = typeof fields[field] === 'number' ? fields[field] : NaN;
+        }
+    }
+    if ('name' in fields) {
+        store.name[i] = fields.name || '';
+        store.search[i] = (store.symbol[i] + ' ' + store.name[i]).toLowerCase();
+    }
+}
+
+function addRow(token, rank, now) {
+    const i = store.size++;
+    grow(store.size);
+    const key = tokenKey(token);
+    store.index.set(key, i);
+    store.keys[i] = key;
+    store.symbol[i] = token.symbol || '';
+    store.name[i] = '';
+    setFields(i, { name: token.name, ...token });
+    store.rank[i] = rank;
+    store.updated[i] = now;
+}
+
+function removeRow(key) {
+    // 마지막 행을 빈자리로 옮겨 O(1) 삭제
+    const i = store.index.get(key);
+    if (i === undefined) return;
+    const last = --store.size;
+    store.index.delete(key);
+    if (i !== last) {
+        for (const column of ['keys', 'symbol', 'name', 'search', 'price', 'change', 'mcap', 'volume',
+                              'updated', 'rank']) {
+            store[column][i] = store[column][last];
+        }
+        store.index.set(store.keys[i], i);
+    }
+    for (const column of ['keys', 'symbol', 'name', 'search']) store[column].length = store.size;
+}
+
+function loadFull(tokens) {
+    store.size = 0;
+    store.index.clear();
+    for (const column of ['keys', 'symbol', 'name', 'search']) store[column].length = 0;
+    grow(tokens.length);
+    tokens.forEach((token, rank) => addRow(token, rank, 0));
+}
+
+function applyDelta(delta, now) {
+    delta.removed.forEach(removeRow);
+    for (const change of delta.changed) {
+        const i = store.index.get(change.key);
+        if (i === undefined) continue;
+        setFields(i, change.fields);
+        store.updated[i] = now;
+    }
+    for (const move of delta.moved) {
+        const i = store.index.get(move.key);
+        if (i !== undefined) store.rank[i] = move.to;
+    }
+    if (!delta.added.length) return;
+
+    // 새 토큰은 기존 토큰이 차지하지 않은 순위를 앞에서부터 차지 (added는 순위 순서)
+    const total = store.size + delta.added.length;
+    const taken = new Uint8Array(total);
+    for (let i = 0; i < store.size; i++) {
+        if (store.rank[i] < total) taken[store.rank[i]] = 1;
+    }
+    let rank = 0;
+    for (const token of delta.added) {
+        while (taken[rank]) rank++;
+        addRow(token, rank++, now);
+    }
+}
+
+function rebuildView() {
+    const query = view.query;
+    const order = new Uint32Array(store.size);
+    let count = 0;
+    for (let i = 0; i < store.size; i++) {
+        if (query && !store.search[i].includes(query)) continue;
+        if (view.pumpingOnly && !(store.change[i] > PUMPING_THRESHOLD)) continue;
+        order[count++] = i;
+    }
+    view.order = order.subarray(0, count);
+
+    const dir = view.dir;
+    const rank = store.rank;
+    if (view.sortKey === 'symbol') {
+        const symbol = store.symbol;
+        view.order.sort((a, b) => dir * (symbol[a] < symbol[b] ? -1 : symbol[a] > symbol[b] ? 1 : 0)
+                                  || rank[a] - rank[b]);
+    } else if (view.sortKey === 'rank') {
+        view.order.sort((a, b) => dir * (rank[a] - rank[b]));
+    } else {
+        // 값이 없는 토큰은 항상 뒤로
+        const column = store[view.sortKey];
+        view.order.sort((a, b) => {
+            const x = column[a], y = column[b];
+            if (x !== x || y !== y) return (x !== x) - (y !== y);
+            return dir * (x - y) || rank[a] - rank[b];
+        });
+    }
+    document.getElementById('visible-count').textContent = `${count} / ${store.size}`;
+}
+
+function formatPrice(value) {
+    return value === value ? '$' + value.toFixed(6) : '-';
+}
+
+function formatChange(value) {
+    return value === value ? (value >= 0 ? '+' : '') + value.toFixed(1) + '%' : '-';
+}
+
+function formatMoney(value) {
+    return value === value ? '$' + Math.round(value).toLocaleString('en-US') : '-';
+}
+
+function createRow() {
+    const tr = document.createElement('tr');
+    tr.className = 'row';
+    tr.innerHTML = '<td><strong></strong><br><small style="color: #666;"></small></td>'
+                 + '<td></td><td></td><td></td><td></td>';
+    const cells = tr.children;
+    tbody.insertBefore(tr, spacerBottom.parentNode);
+    return {
+        tr,
+        changeCell: cells[2],
+        targets: [cells[0].firstChild, cells[0].lastChild, cells[1], cells[2], cells[3], cells[4]],
+        texts: new Array(6).fill(null),
+    };
+}
+
+function patch(row, slot, text) {
+    // 값이 바뀐 셀만 DOM 갱신
+    if (row.texts[slot] !== text) {
+        row.texts[slot] = text;
+        row.targets[slot].textContent = text;
+    }
+}
+
+function bind(row, i, now) {
+    const change = store.change[i];
+    patch(row, 0, store.symbol[i]);
+    patch(row, 1, store.name[i]);
+    patch(row, 2, formatPrice(store.price[i]));
+    patch(row, 3, formatChange(change));
+    patch(row, 4, formatMoney(store.mcap[i]));
+    patch(row, 5, formatMoney(store.volume[i]));
+    row.changeCell.className = change > 0 ? 'positive' : 'negative';
+    row.tr.classList.toggle('updated', now - store.updated[i] < FLASH_MS);
+}
+
+function render() {
+    renderScheduled = false;
+    const total = view.order.length;
+    const visible = Math.ceil(viewport.clientHeight / ROW_HEIGHT) + OVERSCAN * 2;
+    const start = Math.min(Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN),
+                           Math.max(0, total - visible));
+    const end = Math.min(total, start + visible);
+    while (pool.length < visible) pool.push(createRow());
+
+    spacerTop.style.height = (start * ROW_HEIGHT) + 'px';
+    spacerBottom.style.height = ((total - end) * ROW_HEIGHT) + 'px';
+    const now = Date.now();
+    for (let p = 0; p < pool.length; p++) {
+        const row = pool[p];
+        const position = start + p;
+        row.tr.hidden = position >= end;
+        if (!row.tr.hidden) bind(row, view.order[position], now);
+    }
+}
+
+function scheduleRender() {
+    if (!renderScheduled) {
+        renderScheduled = true;
+        requestAnimationFrame(render);
+    }
+}
+
+function updateStats() {
+    let pumping = 0;
+    for (let i = 0; i < store.size; i++) {
+        if (store.change[i] > PUMPING_THRESHOLD) pumping++;
+    }
+    document.getElementById('total-tokens').textContent = store.size;
+    document.getElementById('pumping-count').textContent = pumping;
+}
+
+async function refresh() {
+    try {
+        const response = await fetch('/api/tokens?since=' + version);
+        const result = await response.json();
+        if (!result.success || result.version === version) return;
+
+        const now = Date.now();
+        if (result.full) {
+            loadFull(result.data);
+        } else {
+            result.deltas.forEach(delta => applyDelta(delta, now));
+        }
+        version = result.version;
+        document.getElementById('last-update').textContent = new Date(now).toTimeString().slice(0, 8);
+        rebuildView();
+        updateStats();
+        scheduleRender();
+        setTimeout(scheduleRender, FLASH_MS);
+    } catch (error) {
+        console.error('데이터 갱신 실패:', error);
+    }
+}
+
+async function manualUpdate() {
+    try {
+        const response = await fetch('/api/update', { method: 'POST' });
+        const result = await response.json();
+
+        if (result.success) {
+            alert('데이터 업데이트 완료!');
+            refresh();
+        } else {
+            alert('업데이트 실패: ' + result.error);
+        }
+    } catch (error) {
+        alert('업데이트 실패: ' + error.message);
+    }
+}
+
+document.querySelectorAll('th[data-sort]').forEach(th => th.addEventListener('click', () => {
+    const key = th.dataset.sort;
+    // 같은 컬럼을 다시 누르면 방향 전환, 숫자 컬럼은 큰 값부터
+    view.dir = view.sortKey === key ? -view.dir : (key === 'symbol' ? 1 : -1);
+    view.sortKey = key;
+    rebuildView();
+    scheduleRender();
+}));
+
+document.getElementById('token-filter').addEventListener('input', event => {
+    view.query = event.target.value.trim().toLowerCase();
+    rebuildView();
+    viewport.scrollTop = 0;
+    scheduleRender();
+});
+
+document.getElementById('pumping-only').addEventListener('change', event => {
+    view.pumpingOnly = event.target.checked;
+    rebuildView();
+    viewport.scrollTop = 0;
+    scheduleRender();
+});
+
+viewport.addEventListener('scroll', scheduleRender, { passive: true });
+window.addEventListener('resize', scheduleRender);
+
+const initial = JSON.parse(document.getElementById('initial-data').textContent);
+version = initial.version;
+loadFull(initial.data);
+rebuildView();
+render();
+
+// 주기적으로 변경분만 받아서 반영 (페이지 새로고침 없음)
+setInterval(refresh, POLL_MS);
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+정적 파일(대시보드 CSS/JS) 지문 URL과 사전 압축
+
+시작할 때 static/ 디렉터리의 파일을 한 번 읽어 내용 해시가 들어간 이름
+(dashboard.3f2a9c1e0b.js)을 만들고, gzip(및 brotli 패키지가 있으면 brotli) 압축본을 미리 만들어 둡니다.
+이름이 내용에 따라 바뀌므로 응답은 1년 동안 immutable로 캐시해도 되고,
+HTML은 지문 URL만 참조하므로 데이터에 따라 바뀌는 마크업만 다시 전송됩니다.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# 지문 이름 응답 캐시 헤더 (내용이 바뀌면 이름도 바뀜)
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+HASH_LENGTH = 10
+
+# 이보다 작은 파일은 압축하지 않음
+MIN_COMPRESS_SIZE = 256
+
+
+def _compress(body):
+    """{인코딩: 본문} - 원본보다 작을 때만 압축본 포함"""
+    variants = {'identity': body}
+    if len(body) < MIN_COMPRESS_SIZE:
+        return variants
+    # mtime=0: 같은 내용이면 같은 바이트
+    encoders = [('gzip', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.insert(0, ('br', lambda data: brotli.compress(data, quality=11)))
+    for encoding, encode in encoders:
+        compressed = encode(body)
+        if len(compressed) < len(body):
+            variants[encoding] = compressed
+    return variants
+
+
+def _accepted(header):
+    """Accept-Encoding 헤더에서 허용된 인코딩 집합 (q=0은 제외)"""
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name.strip():
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class StaticAssets:
+    """정적 파일 묶음 - 원래 이름 → 지문 이름, 지문 이름 → 인코딩별 본문"""
+
+    def __init__(self, directory=None, names=None):
+        self.directory = directory or STATIC_DIR
+        self.urls = {}
+        self.files = {}
+        names = names if names is not None else sorted(os.listdir(self.directory))
+        for name in names:
+            with open(os.path.join(self.directory, name), 'rb') as f:
+                self.add(name, f.read())
+
+    def add(self, name, body):
+        """파일 하나 등록 - 지문 이름 반환"""
+        digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+        stem, ext = os.path.splitext(name)
+        fingerprinted = f"{stem}.{digest}{ext}"
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type.endswith('javascript'):
+            content_type += '; charset=utf-8'
+        self.urls[name] = f"/static/{fingerprinted}"
+        self.files[fingerprinted] = {'etag': digest, 'content_type': content_type, 'variants': _compress(body)}
+        return fingerprinted
+
+    def url(self, name):
+        """템플릿에서 쓰는 지문 URL"""
+        return self.urls[name]
+
+    def get(self, fingerprinted, accept_encoding=None):
+        """(본문, 인코딩, 파일 정보) - 없는 이름이면 None. 클라이언트가 받는 것 중 가장 작은 압축본 선택"""
+        entry = self.files.get(fingerprinted)
+        if entry is None:
+            return None
+        accepted = _accepted(accept_encoding)
+        encoding = min((e for e in entry['variants'] if e == 'identity' or e in accepted),
+                       key=lambda e: len(entry['variants'][e]))
+        return entry['variants'][encoding], encoding, entry
+
+    def sizes(self):
+        """{지문 이름: {인코딩: 바이트}} (측정용)"""
+        return {name: {encoding: len(body) for encoding, body in entry['variants'].items()}
+                for name, entry in self.files.items()}
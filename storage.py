@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+SQLite 저장소 - JSON 파일 저장의 대안 백엔드
+
+WAL 모드를 사용하므로 모니터가 쓰는 동안에도 웹 앱이 막힘 없이 읽을 수 있습니다.
+토큰 히스토리는 심볼이 아닌 토큰 id(token_registry)로 조회합니다.
+"""
+import bisect
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+import rollups
+from snapshot_diff import token_key
+
+# 저장 백엔드: 'json' (기본, 파일 저장) 또는 'sqlite'
+STORAGE_BACKEND = os.environ.get('GMGN_STORAGE', 'json')
+DB_PATH = os.environ.get('GMGN_DB_PATH', os.path.join('data', 'gmgn.db'))
+
+# 토큰 테이블에 컬럼으로 저장되는 필드 (나머지는 extra JSON으로 저장, id는 token_id 컬럼)
+TOKEN_COLUMNS = ['id', 'symbol', 'name', 'price', 'change_24h', 'market_cap', 'volume_24h', 'timestamp']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    token_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tokens (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    ts REAL NOT NULL,
+    rank INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    name TEXT,
+    price REAL,
+    change_24h REAL,
+    market_cap REAL,
+    volume_24h REAL,
+    timestamp TEXT,
+    extra TEXT,
+    token_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_ts ON snapshots(ts);
+CREATE INDEX IF NOT EXISTS idx_tokens_ts ON tokens(ts);
+CREATE INDEX IF NOT EXISTS idx_tokens_snapshot ON tokens(snapshot_id);
+"""
+
+# token_id 컬럼이 없던 DB는 컬럼 추가 후 만들어야 하므로 따로 실행
+TOKEN_ID_INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_tokens_token_ts ON tokens(token_id, ts)"
+
+# 쿼리 문자열을 상수로 고정해 두면 sqlite3 모듈의 statement 캐시가
+# 컴파일된 prepared statement를 재사용합니다.
+INSERT_SNAPSHOT_SQL = "INSERT INTO snapshots (ts, token_count) VALUES (?, ?)"
+INSERT_TOKEN_SQL = (
+    "INSERT INTO tokens (snapshot_id, ts, rank, symbol, name, price, change_24h,"
+    " market_cap, volume_24h, timestamp, extra, token_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+LATEST_SNAPSHOT_SQL = "SELECT id, ts FROM snapshots ORDER BY id DESC LIMIT 1"
+SNAPSHOT_TOKENS_SQL = (
+    "SELECT token_id, symbol, name, price, change_24h, market_cap, volume_24h, timestamp, extra"
+    " FROM tokens WHERE snapshot_id = ? ORDER BY rank"
+)
+SNAPSHOT_BOUNDS_SQL = "SELECT MIN(ts), MAX(ts) FROM snapshots"
+SNAPSHOT_RANGE_SQL = "SELECT id, ts FROM snapshots WHERE ts >= ? AND ts <= ? ORDER BY ts"
+PRICE_ROWS_SQL = (
+    "SELECT ts, token_id, price, change_24h FROM tokens WHERE ts >= ? AND ts <= ? ORDER BY ts"
+)
+HISTORY_SQL = (
+    "SELECT ts, price, change_24h, market_cap, volume_24h FROM tokens"
+    " WHERE token_id = ? AND ts >= ? AND ts <= ? ORDER BY ts"
+)
+
+_local = threading.local()
+
+
+def get_connection(db_path=None):
+    """스레드별 SQLite 연결 반환 (WAL 모드)"""
+    db_path = db_path or DB_PATH
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(db_path)
+    if conn is None:
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(db_path, timeout=10, cached_statements=128)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=10000")
+        conn.executescript(SCHEMA)
+        _migrate_token_ids(conn)
+        conn.executescript(rollups.ROLLUP_SCHEMA)
+        _backfill_rollups(conn)
+        connections[db_path] = conn
+
+    return conn
+
+
+def _migrate_token_ids(conn):
+    """token_id 도입 전 DB 변환 - 기존 행에 토큰 id 채우고, 심볼 키 롤업은 지워서 다시 생성"""
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(tokens)")}
+    rollup_columns = {row['name'] for row in conn.execute("PRAGMA table_info(rollups)")}
+    if 'token_id' in columns and 'symbol' not in rollup_columns:
+        conn.execute(TOKEN_ID_INDEX_SQL)
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(tokens)")}
+        if 'token_id' not in columns:
+            conn.execute("ALTER TABLE tokens ADD COLUMN token_id INTEGER")
+            conn.execute("DROP INDEX IF EXISTS idx_tokens_symbol_ts")
+            rows = conn.execute("SELECT rowid, symbol, extra FROM tokens").fetchall()
+            conn.executemany("UPDATE tokens SET token_id = ? WHERE rowid = ?", [
+                (token_key(dict(json.loads(row['extra']) if row['extra'] else {}, symbol=row['symbol'])),
+                 row['rowid']) for row in rows])
+        if 'symbol' in {row['name'] for row in conn.execute("PRAGMA table_info(rollups)")}:
+            conn.execute("DROP TABLE rollups")
+        conn.execute(TOKEN_ID_INDEX_SQL)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _backfill_rollups(conn):
+    """롤업 도입 전에 저장된 스냅샷이 있으면 한 번만 롤업 생성 (다른 프로세스와 동시에 열어도 한 번)"""
+    if conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone():
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if not conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone():
+            for snapshot in conn.execute(SNAPSHOT_RANGE_SQL, (float('-inf'), float('inf'))).fetchall():
+                rows = conn.execute(SNAPSHOT_TOKENS_SQL, (snapshot['id'],)).fetchall()
+                rollups.update_rollups(conn, snapshot['ts'], [_row_to_token(row) for row in rows])
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def close_connections():
+    """현재 스레드의 연결 모두 닫기"""
+    connections = getattr(_local, 'connections', None) or {}
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
+
+
+def _token_row(snapshot_id, ts, rank, token):
+    """토큰 dict를 INSERT 파라미터 튜플로 변환"""
+    extra = {k: v for k, v in token.items() if k not in TOKEN_COLUMNS}
+    return (
+        snapshot_id, ts, rank,
+        token.get('symbol', ''), token.get('name'),
+        token.get('price'), token.get('change_24h'),
+        token.get('market_cap'), token.get('volume_24h'),
+        token.get('timestamp'),
+        json.dumps(extra, ensure_ascii=False) if extra else None,
+        token_key(token),
+    )
+
+
+def _row_to_token(row):
+    """DB 행을 토큰 dict로 변환"""
+    token = {
+        'id': row['token_id'],
+        'symbol': row['symbol'],
+        'name': row['name'],
+        'price': row['price'],
+        'change_24h': row['change_24h'],
+        'market_cap': row['market_cap'],
+        'volume_24h': row['volume_24h'],
+        'timestamp': row['timestamp'],
+    }
+    if row['extra']:
+        token.update(json.loads(row['extra']))
+    return token
+
+
+def save_snapshot(data, db_path=None, ts=None):
+    """스냅샷 하나를 단일 트랜잭션으로 저장(롤업 갱신 포함)하고 snapshot id 반환"""
+    conn = get_connection(db_path)
+    ts = time.time() if ts is None else ts
+
+    with conn:
+        cursor = conn.execute(INSERT_SNAPSHOT_SQL, (ts, len(data)))
+        snapshot_id = cursor.lastrowid
+        conn.executemany(
+            INSERT_TOKEN_SQL,
+            (_token_row(snapshot_id, ts, rank, token) for rank, token in enumerate(data))
+        )
+        rollups.update_rollups(conn, ts, data)
+
+    return snapshot_id
+
+
+def load_latest(db_path=None):
+    """가장 최근 스냅샷의 토큰 목록 반환"""
+    conn = get_connection(db_path)
+    snapshot = conn.execute(LATEST_SNAPSHOT_SQL).fetchone()
+    if snapshot is None:
+        return []
+
+    rows = conn.execute(SNAPSHOT_TOKENS_SQL, (snapshot['id'],)).fetchall()
+    return [_row_to_token(row) for row in rows]
+
+
+def latest_snapshot_id(db_path=None):
+    """가장 최근 스냅샷 id (SQLite 저장소), 없으면 None"""
+    snapshot = get_connection(db_path).execute(LATEST_SNAPSHOT_SQL).fetchone()
+    return None if snapshot is None else snapshot['id']
+
+
+def latest_snapshot_time(db_path=None):
+    """가장 최근 스냅샷 시각 (epoch 초), 없으면 None - 토큰은 읽지 않음"""
+    if STORAGE_BACKEND == 'sqlite':
+        snapshot = get_connection(db_path).execute(LATEST_SNAPSHOT_SQL).fetchone()
+        return None if snapshot is None else snapshot['ts']
+    try:
+        return os.path.getmtime('latest.json')
+    except OSError:
+        return None
+
+
+def load_history(key, start=None, end=None, db_path=None):
+    """토큰 id의 시계열 기록 반환 (start/end는 epoch 초)"""
+    conn = get_connection(db_path)
+    start = float('-inf') if start is None else start
+    end = float('inf') if end is None else end
+
+    rows = conn.execute(HISTORY_SQL, (key, start, end)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def load_rollup_history(key, resolution, start=None, end=None, db_path=None):
+    """토큰 id의 해상도별 구간(OHLC) 기록 반환"""
+    return rollups.load_rollups(get_connection(db_path), key, resolution, start, end)
+
+
+def iter_db_snapshots(start=None, end=None, db_path=None):
+    """SQLite에 저장된 스냅샷을 시간 순서로 (ts, tokens) 생성"""
+    conn = get_connection(db_path)
+    start = float('-inf') if start is None else start
+    end = float('inf') if end is None else end
+
+    for snapshot in conn.execute(SNAPSHOT_RANGE_SQL, (start, end)).fetchall():
+        rows = conn.execute(SNAPSHOT_TOKENS_SQL, (snapshot['id'],)).fetchall()
+        yield snapshot['ts'], [_row_to_token(row) for row in rows]
+
+
+def load_price_rows(start=None, end=None, db_path=None):
+    """구간의 (ts, 토큰 id, price, change_24h) 행을 한 번의 쿼리로 조회 (백테스트용)"""
+    conn = get_connection(db_path)
+    start = float('-inf') if start is None else start
+    end = float('inf') if end is None else end
+
+    cursor = conn.execute(PRICE_ROWS_SQL, (start, end))
+    cursor.row_factory = None
+    return cursor.fetchall()
+
+
+def snapshot_file_time(filename):
+    """gmgn_data_YYYYmmdd_HHMMSS_fff.json 파일명에서 epoch 초 추출 (형식이 다르면 None)"""
+    stamp = os.path.basename(filename)[len('gmgn_data_'):-len('.json')]
+    try:
+        return datetime.strptime(stamp, '%Y%m%d_%H%M%S_%f').timestamp()
+    except ValueError:
+        return None
+
+
+def _file_stamp(ts):
+    """epoch 초 → 파일명 시각 문자열 (밀리초 이하는 버림)"""
+    return datetime.fromtimestamp(ts).strftime('%Y%m%d_%H%M%S_%f')[:-3]
+
+
+def iter_json_snapshots(start=None, end=None, directory='.'):
+    """JSON 아카이브(gmgn_data_*.json)를 시간 순서로 (ts, tokens) 생성
+
+    파일명 시각은 문자열 순서가 곧 시간 순서이므로, 정렬된 파일명에서 구간 밖은 이분 탐색으로 잘라내고
+    구간 안의 파일만 시각을 해석하고 엽니다.
+    """
+    names = sorted(os.path.basename(f) for f in glob.glob(os.path.join(directory, 'gmgn_data_*.json')))
+    low = 0 if start is None else bisect.bisect_left(names, f"gmgn_data_{_file_stamp(start)}")
+    high = len(names) if end is None else bisect.bisect_right(names, f"gmgn_data_{_file_stamp(end)}.json")
+
+    files = []
+    for name in names[low:high]:
+        filename = os.path.join(directory, name)
+        ts = snapshot_file_time(filename)
+        if ts is None or (start is not None and ts < start) or (end is not None and ts > end):
+            continue
+        files.append((ts, filename))
+
+    for ts, filename in sorted(files):
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                yield ts, json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 스냅샷 파일 읽기 실패 ({filename}): {e}")
+
+
+def iter_snapshots(start=None, end=None, directory='.'):
+    """현재 백엔드의 스냅샷을 시간 순서로 (ts, tokens) 생성"""
+    if STORAGE_BACKEND == 'sqlite':
+        return iter_db_snapshots(start, end)
+    return iter_json_snapshots(start, end, directory)
+
+
+def snapshot_bounds(directory='.'):
+    """저장된 스냅샷의 (최초 ts, 최종 ts), 없으면 None"""
+    if STORAGE_BACKEND == 'sqlite':
+        first, last = get_connection().execute(SNAPSHOT_BOUNDS_SQL).fetchone()
+        return None if first is None else (first, last)
+
+    times = [ts for ts in map(snapshot_file_time, glob.glob(os.path.join(directory, 'gmgn_data_*.json')))
+             if ts is not None]
+    return (min(times), max(times)) if times else None
+
+
+def load_token_history(key, start=None, end=None, resolution=None):
+    """현재 백엔드에서 토큰 id의 히스토리 조회 (SQLite 또는 JSON 아카이브)
+
+    SQLite에서 resolution을 지정하면 원본 대신 해당 해상도의 롤업(price = 구간 종가)을 읽습니다.
+    """
+    if STORAGE_BACKEND == 'sqlite':
+        if resolution is not None:
+            return load_rollup_history(key, resolution, start, end)
+        return load_history(key, start, end)
+
+    history = []
+    for ts, tokens in iter_json_snapshots(start, end):
+        for token in tokens:
+            if token_key(token) == key:
+                history.append({
+                    'ts': ts,
+                    'price': token.get('price'),
+                    'change_24h': token.get('change_24h'),
+                    'market_cap': token.get('market_cap'),
+                    'volume_24h': token.get('volume_24h'),
+                })
+                break
+    return history
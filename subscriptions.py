@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+관심 목록/필터 구독 - 주기마다 바뀐 토큰을 조건이 맞는 구독에만 전달
+
+구독마다 가장 좁은 조건 하나(관심 토큰 > 이벤트 종류 > 숫자 범위 > 체인)만 역색인에 올리고,
+바뀐 토큰 하나당 그 조건이 맞는 구독에서만 나머지 조건을 확인해 전달합니다.
+"chain=sol"처럼 넓은 조건을 가진 구독이 많아도 좁은 조건이 함께 있으면 후보에 오르지 않으므로
+비용은 구독 수가 아니라 후보 수에 비례합니다.
+
+오래 조회하지 않은 구독은 만료되고, 구독 수에는 상한이 있습니다.
+
+필터 문자열 예: "chain=sol, mcap<5M, volume_spike"
+"""
+import bisect
+import itertools
+import operator
+import os
+import re
+import threading
+import time
+from collections import deque
+import numpy as np
+from token_registry import DEFAULT_CHAIN
+from snapshot_diff import token_key
+from validation import coerce_numeric
+
+# 필터에서 사용할 수 있는 숫자 필드 (별칭 → 토큰 필드)
+RANGE_FIELDS = {
+    'price': 'price',
+    'change': 'change_24h',
+    'change_24h': 'change_24h',
+    'mcap': 'market_cap',
+    'market_cap': 'market_cap',
+    'volume': 'volume_24h',
+    'volume_24h': 'volume_24h',
+}
+
+# 이벤트 종류
+FLAGS = ('new', 'pumping', 'volume_spike')
+FLAG_SELECTIVITY = ('volume_spike', 'pumping', 'new')   # 드문 이벤트부터
+PUMPING_THRESHOLD = 30.0    # gmgn_scraper.ALERT_THRESHOLD과 같은 기준
+VOLUME_SPIKE_RATIO = 2.0    # 직전 대비 거래량 배수
+
+INBOX_SIZE = 200
+SUBSCRIPTION_TTL = float(os.environ.get('GMGN_SUBSCRIPTION_TTL', '3600'))   # 조회 없이 유지하는 초
+MAX_SUBSCRIPTIONS = int(os.environ.get('GMGN_MAX_SUBSCRIPTIONS', '1000'))
+
+OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+RANGE_PATTERN = re.compile(r'^(\w+)\s*(<=|>=|<|>)\s*(\S+)$')
+WORD_PATTERN = re.compile(r'^[a-z]\w*$')
+
+
+class SubscriptionLimit(RuntimeError):
+    """구독 수가 상한에 도달함"""
+
+
+def parse_filter(text):
+    """필터 문자열 → {'chains': set, 'flags': set, 'ranges': [(field, op, value)]}
+
+    조건 형식이 아닌 단어 하나는 체인 이름으로 해석합니다 (예: "sol, mcap<5M").
+    """
+    spec = {'chains': set(), 'flags': set(), 'ranges': []}
+    for clause in filter(None, (c.strip().lower() for c in re.split(r'[,;]', text or ''))):
+        if clause.startswith('chain='):
+            spec['chains'].update(c for c in clause[len('chain='):].split('|') if c)
+            continue
+        if clause.replace(' ', '_') in FLAGS:
+            spec['flags'].add(clause.replace(' ', '_'))
+            continue
+        if WORD_PATTERN.match(clause):
+            spec['chains'].add(clause)
+            continue
+
+        match = RANGE_PATTERN.match(clause)
+        if not match or match.group(1) not in RANGE_FIELDS:
+            raise ValueError(f"필터 조건 형식 오류: {clause}")
+        value = coerce_numeric([match.group(3)])[0][0]
+        if np.isnan(value):
+            raise ValueError(f"필터 값 오류: {clause}")
+        spec['ranges'].append((RANGE_FIELDS[match.group(1)], match.group(2), float(value)))
+    return spec
+
+
+class BoundIndex:
+    """한쪽 경계 조건(값 <= 상한, 값 >= 하한)의 정렬 목록 - 값을 만족하는 구독만 잘라서 반환"""
+
+    def __init__(self):
+        self._uppers = ([], [])   # (정렬된 상한, 구독 id) - 값 <= 상한
+        self._lowers = ([], [])   # (정렬된 하한, 구독 id) - 값 >= 하한
+
+    @staticmethod
+    def _insert(entries, bound, sub_id):
+        bounds, ids = entries
+        position = bisect.bisect_right(bounds, bound)
+        bounds.insert(position, bound)
+        ids.insert(position, sub_id)
+
+    def add(self, sub_id, op, value):
+        # 미만/초과는 바로 옆의 실수로 바꿔 이하/이상으로 통일
+        if op == '<':
+            self._insert(self._uppers, float(np.nextafter(value, -np.inf)), sub_id)
+        elif op == '<=':
+            self._insert(self._uppers, value, sub_id)
+        elif op == '>':
+            self._insert(self._lowers, float(np.nextafter(value, np.inf)), sub_id)
+        else:
+            self._insert(self._lowers, value, sub_id)
+
+    def remove(self, sub_id):
+        for bounds, ids in (self._uppers, self._lowers):
+            keep = [i for i, sid in enumerate(ids) if sid != sub_id]
+            bounds[:] = [bounds[i] for i in keep]
+            ids[:] = [ids[i] for i in keep]
+
+    def matching(self, value):
+        """value가 만족하는 조건의 구독 id 목록"""
+        start = bisect.bisect_left(self._uppers[0], value)
+        end = bisect.bisect_right(self._lowers[0], value)
+        return self._uppers[1][start:] + self._lowers[1][:end]
+
+
+class Subscription:
+    """구독 하나 - 조건과 최근 이벤트 보관함"""
+
+    def __init__(self, sub_id, watchlist, spec, inbox_size=INBOX_SIZE):
+        self.id = sub_id
+        self.watchlist = set(watchlist or ())
+        self.spec = spec
+        self.inbox = deque(maxlen=inbox_size)
+        self.seq = 0
+        self.created_at = time.time()
+        self.touched_at = self.created_at
+
+    def anchor(self):
+        """역색인에 올릴 가장 좁은 조건 - ('token', 키 집합) / ('flag', 종류) / ('range', 조건) / ('chain', 체인 집합)
+
+        범위 조건은 하한 쪽을 먼저 고릅니다 (시가총액·거래량은 작은 값 쪽에 토큰이 몰려 있음).
+        """
+        if self.watchlist:
+            return 'token', self.watchlist
+        if self.spec['flags']:
+            return 'flag', min(self.spec['flags'], key=FLAG_SELECTIVITY.index)
+        if self.spec['ranges']:
+            return 'range', min(self.spec['ranges'], key=lambda r: r[1] not in ('>', '>='))
+        if self.spec['chains']:
+            return 'chain', self.spec['chains']
+        return None
+
+    def matches(self, key, token, flags):
+        """모든 조건을 만족하는지 확인"""
+        if self.watchlist and key not in self.watchlist:
+            return False
+        if self.spec['chains'] and (token.get('chain') or DEFAULT_CHAIN) not in self.spec['chains']:
+            return False
+        if not self.spec['flags'].issubset(flags):
+            return False
+        for field, op, bound in self.spec['ranges']:
+            value = token.get(field)
+            if not isinstance(value, (int, float)) or not OPERATORS[op](value, bound):
+                return False
+        return True
+
+    def describe(self):
+        return {
+            'id': self.id,
+            'watchlist': sorted(self.watchlist),
+            'chains': sorted(self.spec['chains']),
+            'flags': sorted(self.spec['flags']),
+            'ranges': [list(r) for r in self.spec['ranges']],
+            'seq': self.seq,
+        }
+
+
+class SubscriptionRouter:
+    """구독 조건 역색인 및 이벤트 전달"""
+
+    def __init__(self, inbox_size=INBOX_SIZE, ttl=SUBSCRIPTION_TTL, max_subscriptions=MAX_SUBSCRIPTIONS):
+        self.inbox_size = inbox_size
+        self.ttl = ttl
+        self.max_subscriptions = max_subscriptions
+        self.subscriptions = {}
+        self._by_token = {}
+        self._by_chain = {}
+        self._by_flag = {flag: set() for flag in FLAGS}
+        self._ranges = {field: BoundIndex() for field in set(RANGE_FIELDS.values())}
+        self._volumes = {}
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self.routed = 0
+        self.delivered = 0
+        self.expired = 0
+
+    # --- 구독 관리 ---
+
+    def subscribe(self, watchlist=None, filter_text=None):
+        spec = parse_filter(filter_text)
+        with self._cond:
+            sub = Subscription(str(next(self._ids)), watchlist, spec, self.inbox_size)
+            anchor = sub.anchor()
+            if anchor is None:
+                raise ValueError("관심 토큰이나 필터 조건이 하나 이상 필요합니다")
+            self.expire()
+            if len(self.subscriptions) >= self.max_subscriptions:
+                raise SubscriptionLimit(f"구독 수가 상한({self.max_subscriptions})에 도달했습니다")
+
+            self.subscriptions[sub.id] = sub
+            kind, value = anchor
+            if kind == 'token':
+                for key in value:
+                    self._by_token.setdefault(key, set()).add(sub.id)
+            elif kind == 'flag':
+                self._by_flag[value].add(sub.id)
+            elif kind == 'range':
+                field, op, bound = value
+                self._ranges[field].add(sub.id, op, bound)
+            else:
+                for chain in value:
+                    self._by_chain.setdefault(chain, set()).add(sub.id)
+            return sub
+
+    def unsubscribe(self, sub_id):
+        with self._cond:
+            if not self._remove(sub_id):
+                return False
+            self._cond.notify_all()
+            return True
+
+    def _remove(self, sub_id):
+        sub = self.subscriptions.pop(sub_id, None)
+        if sub is None:
+            return False
+        kind, value = sub.anchor()
+        if kind == 'token':
+            for key in value:
+                ids = self._by_token[key]
+                ids.discard(sub_id)
+                if not ids:
+                    del self._by_token[key]
+        elif kind == 'flag':
+            self._by_flag[value].discard(sub_id)
+        elif kind == 'range':
+            self._ranges[value[0]].remove(sub_id)
+        else:
+            for chain in value:
+                ids = self._by_chain[chain]
+                ids.discard(sub_id)
+                if not ids:
+                    del self._by_chain[chain]
+        if not self.subscriptions:
+            # 전달할 곳이 없으면 거래량 기준값도 필요 없음 (다음 구독부터 새로 쌓음)
+            self._volumes.clear()
+        return True
+
+    def expire(self, now=None):
+        """ttl초 넘게 조회하지 않은 구독 해지, 해지한 수 반환 (잠금 안에서 호출)"""
+        if not self.ttl:
+            return 0
+        cutoff = (now or time.time()) - self.ttl
+        stale = [sid for sid, sub in self.subscriptions.items() if sub.touched_at < cutoff]
+        for sid in stale:
+            self._remove(sid)
+        if stale:
+            self.expired += len(stale)
+            self._cond.notify_all()
+        return len(stale)
+
+    # --- 이벤트 전달 ---
+
+    def _flags(self, key, token, is_new):
+        flags = ['new'] if is_new else []
+        change = token.get('change_24h')
+        if isinstance(change, (int, float)) and change >= PUMPING_THRESHOLD:
+            flags.append('pumping')
+
+        volume = token.get('volume_24h')
+        if isinstance(volume, (int, float)):
+            previous = self._volumes.get(key)
+            if previous and volume / previous >= VOLUME_SPIKE_RATIO:
+                flags.append('volume_spike')
+            self._volumes[key] = volume
+        return flags
+
+    def _match(self, key, token, flags):
+        candidates = set(self._by_token.get(key, ()))
+        candidates.update(self._by_chain.get(token.get('chain') or DEFAULT_CHAIN, ()))
+        for flag in flags:
+            candidates.update(self._by_flag[flag])
+        for field, index in self._ranges.items():
+            value = token.get(field)
+            if isinstance(value, (int, float)):
+                candidates.update(index.matching(value))
+        return [sid for sid in candidates if self.subscriptions[sid].matches(key, token, flags)]
+
+    def route(self, added, changed, version=None, removed=()):
+        """한 주기의 새 토큰/바뀐 토큰을 조건이 맞는 구독에 전달, 전달 건수 반환
+
+        removed: 스냅샷에서 사라진 토큰 키 - 거래량 기준값을 함께 지움
+        """
+        delivered = 0
+        now = time.time()
+        with self._cond:
+            self.expire(now)
+            for key in removed:
+                self._volumes.pop(key, None)
+            for reason, tokens in (('added', added), ('changed', changed)):
+                for token in tokens:
+                    key = token_key(token)
+                    if key is None:
+                        continue
+                    flags = self._flags(key, token, reason == 'added')
+                    for sid in self._match(key, token, flags):
+                        sub = self.subscriptions[sid]
+                        sub.seq += 1
+                        sub.inbox.append({'seq': sub.seq, 'version': version, 'ts': now, 'key': key,
+                                          'reason': reason, 'flags': flags, 'token': token})
+                        delivered += 1
+                    self.routed += 1
+            self.delivered += delivered
+            if delivered:
+                self._cond.notify_all()
+        return delivered
+
+    def events(self, sub_id, since=0):
+        """since 이후 이벤트 목록 (구독이 없으면 None)"""
+        with self._cond:
+            sub = self.subscriptions.get(sub_id)
+            if sub is None:
+                return None
+            sub.touched_at = time.time()
+            return [event for event in sub.inbox if event['seq'] > since]
+
+    def wait(self, sub_id, since=0, timeout=15.0):
+        """새 이벤트가 올 때까지 최대 timeout초 대기 후 events() 반환"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                sub = self.subscriptions.get(sub_id)
+                if sub is None or sub.seq > since:
+                    return self.events(sub_id, since)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    sub.touched_at = time.time()   # 대기 중인 연결도 조회로 간주
+                    return []
+                self._cond.wait(remaining)
+
+    def stats(self):
+        with self._cond:
+            return {'subscriptions': len(self.subscriptions), 'routed': self.routed,
+                    'delivered': self.delivered, 'expired': self.expired}
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+이상 징후 탐지 테스트 코드
+"""
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+import gmgn_scraper
+from anomalies import AnomalyDetector
+from enrichment import Enricher, TTLCache
+from snapshot_diff import token_key
+
+
+def token(price, symbol='AAA', volume=1000.0, liquidity=None, market_cap=None):
+    data = {'symbol': symbol, 'price': price, 'volume_24h': volume}
+    if liquidity is not None:
+        data['liquidity'] = liquidity
+    if market_cap is not None:
+        data['market_cap'] = market_cap
+    return data
+
+
+def key(symbol):
+    return token_key({'symbol': symbol})
+
+
+def noisy_prices(n, seed=0):
+    """±2% 안팎으로 움직이는 가격 n개"""
+    returns = np.random.default_rng(seed).normal(0, 0.02, n)
+    return (np.exp(np.cumsum(returns))).tolist()
+
+
+class TestAnomalyDetector:
+    """이상 징후 탐지 테스트 클래스"""
+
+    def test_liquidity_pull_is_flagged(self):
+        """유동성이 직전 대비 절반 이하로 줄면 바로 탐지되는지 테스트"""
+        detector = AnomalyDetector()
+        assert detector.update([token(1.0, liquidity=50000.0)]) == []
+        assert detector.update([token(1.0)]) == []   # 값이 없으면 직전 유동성 유지
+
+        (anomaly,) = detector.update([token(0.98, liquidity=5000.0)])
+
+        assert anomaly[:2] == (key('AAA'), 'liquidity_pull')
+        assert 'AAA' in anomaly[2]
+        assert '-90%' in anomaly[2]
+        assert detector.stats()['liquidity_pull'] == 1
+
+    def test_zero_is_flagged_as_collapse(self):
+        """가격/시가총액/유동성이 0이 되면 건너뛰지 않고 급감으로 탐지하는지 테스트"""
+        detector = AnomalyDetector()
+        detector.update([token(1.0, liquidity=50000.0, market_cap=1e6)])
+
+        anomalies = detector.update([token(0, liquidity=0, market_cap=0.0)])
+
+        assert [kind for _, kind, _ in anomalies] == ['liquidity_pull', 'market_cap_collapse', 'dump']
+        assert '-100%' in anomalies[0][2] and '가격 0' in anomalies[2][2]
+        # 0은 다음 판단의 기준값이 되고, 0에서 회복해도 수익률 통계는 망가지지 않음
+        assert detector.update([token(0, liquidity=0, market_cap=0.0)]) == []
+        assert detector.update([token(1.0)]) == []
+        assert np.isfinite(detector.state['ret_mean']).all()
+
+    def test_invalid_values_are_skipped(self):
+        """숫자가 아니거나 음수인 값은 없는 값으로 보고 직전 값을 유지하는지 테스트 (가격이 그러면 토큰을 건너뜀)"""
+        detector = AnomalyDetector()
+        detector.update([token(1.0, liquidity=50000.0, market_cap=1e6)])
+
+        assert detector.update([token('n/a', liquidity=-1.0, market_cap=None)]) == []
+        assert detector.update([token(-5.0, liquidity=0.0, market_cap=0.0)]) == []
+        assert detector.update([token(1.0, liquidity='?', market_cap=-1e6)]) == []
+
+        row = detector.index[key('AAA')]
+        assert detector.state['last_price'][row] == 1.0
+        assert detector.state['last_liquidity'][row] == 50000.0
+        assert detector.state['last_market_cap'][row] == 1e6
+        assert np.isfinite(detector.state['ret_mean']).all()
+
+    def test_stale_liquidity_is_not_compared(self):
+        """조회한 지 오래된 유동성 값은 판단에 쓰지 않는지 테스트"""
+        detector = AnomalyDetector(liquidity_max_age=600)
+        detector.update([token(1.0, liquidity=50000.0)], now=1000)
+
+        # 캐시에 남은 예전 값(조회 시각 0)은 없는 값으로 보고 직전 값 유지
+        assert detector.update([dict(token(1.0, liquidity=100.0), enriched_at=0.0)], now=1000) == []
+        (anomaly,) = detector.update([dict(token(1.0, liquidity=100.0), enriched_at=950.0)], now=1000)
+
+        assert anomaly[1] == 'liquidity_pull'
+
+    def test_dump_is_z_score_outlier(self):
+        """평소 변동 범위를 벗어난 급락만 탐지되는지 테스트"""
+        detector = AnomalyDetector()
+        prices = noisy_prices(40)
+
+        # Given: 평소 변동에는 알림 없음
+        assert all(detector.update([token(p)]) == [] for p in prices)
+
+        # When: 30% 급락
+        (anomaly,) = detector.update([token(prices[-1] * 0.7)])
+
+        # Then
+        assert anomaly[1] == 'dump'
+        assert '-30.0%' in anomaly[2]
+
+    def test_volume_without_price_move(self):
+        """가격은 그대로인데 거래량만 튀는 경우 탐지 테스트"""
+        detector = AnomalyDetector()
+        for i, p in enumerate(noisy_prices(30, seed=1)):
+            detector.update([token(p, volume=1000.0 * (1 + 0.05 * (i % 3)))])
+        last = detector.state['last_price'][detector.index[key('AAA')]]
+
+        (anomaly,) = detector.update([token(last, volume=50000.0)])
+
+        assert anomaly[1] == 'volume'
+
+    def test_batch_is_independent_and_memory_is_constant(self):
+        """여러 토큰을 한 번에 판단해도 토큰별로 독립적이고, 토큰당 상태 크기가 고정인지 테스트"""
+        batch = AnomalyDetector(capacity=2)
+        single = AnomalyDetector()
+        prices = noisy_prices(30, seed=2)
+        for p in prices:
+            batch.update([token(p * (n + 1), symbol=f'T{n}') for n in range(5)])
+            single.update([token(p * 4, symbol='T3')])
+        usage = batch.memory_usage()
+
+        crash = [token(prices[-1] * (n + 1) * (0.5 if n == 3 else 1.0), symbol=f'T{n}') for n in range(5)]
+        flagged = batch.update(crash)
+        for p in prices:
+            batch.update([token(p * (n + 1), symbol=f'T{n}') for n in range(5)])
+
+        assert [(key, kind) for key, kind, _ in flagged] == [(key('T3'), 'dump')]
+        assert single.update([token(prices[-1] * 2.0, symbol='T3')])[0][1] == 'dump'
+        assert batch.memory_usage() == usage
+
+    def test_state_survives_save_and_load(self, tmp_path):
+        """저장 후 복원해도 이어서 판단하는지 테스트"""
+        path = str(tmp_path / 'anomalies.npz')
+        detector = AnomalyDetector()
+        for p in noisy_prices(20):
+            detector.update([token(p, market_cap=p * 1e6)])
+        detector.save(path)
+
+        restored = AnomalyDetector.load(path)
+        anomalies = restored.update([token(0.2, market_cap=0.2 * 1e6)])
+
+        assert len(restored) == 1
+        assert [kind for _, kind, _ in anomalies] == ['market_cap_collapse', 'dump']
+
+
+class TestAnomalyAlerts:
+    """이상 징후 알림 전달 테스트"""
+
+    def test_anomalies_go_through_dispatcher(self):
+        """이상 징후가 급등 알림과 같은 발송기로 전달되는지 테스트"""
+        detector = AnomalyDetector()
+        dispatcher = MagicMock()
+        detector.update([token(1.0, liquidity=1000.0)])
+
+        with patch('builtins.print'):
+            alerts = gmgn_scraper.check_anomalies([token(1.0, liquidity=100.0)], detector, dispatcher)
+
+        assert len(alerts) == 1
+        dispatcher.submit.assert_called_once_with(alerts[0])
+
+    def test_liquidity_pull_of_non_pumping_token(self):
+        """급등하지 않는 기존 토큰도 상세 캐시 만료 후 다시 조회해 유동성 급감을 잡는지 테스트"""
+        clock = {'now': 0.0}
+        liquidity = {'value': 50000.0}
+        enricher = Enricher(fetch=lambda t: {'liquidity': liquidity['value']},
+                            cache=TTLCache(ttl=600, clock=lambda: clock['now']), refresh_limit=10)
+        detector = AnomalyDetector()
+        calm = [{'symbol': 'CALM', 'price': 1.0, 'change_24h': 1.0, 'volume_24h': 1000.0}]
+
+        # Given: 처음 본 주기에 유동성 조회
+        detector.update(enricher.enrich(calm, priority=gmgn_scraper.is_pumping))
+
+        # When: 다음 수집 주기(캐시 만료)에 유동성이 빠짐
+        liquidity['value'] = 2000.0
+        clock['now'] = 601.0
+        with patch('builtins.print'):
+            alerts = gmgn_scraper.check_anomalies(enricher.enrich(calm, priority=gmgn_scraper.is_pumping),
+                                                  detector)
+        enricher.close()
+
+        assert len(alerts) == 1 and '유동성 급감' in alerts[0]
+
+    def test_pipeline_evaluate_includes_anomalies(self):
+        """수집 파이프라인의 evaluate 단계가 이상 징후 알림을 함께 내는지 테스트"""
+        detector = AnomalyDetector()
+        # Given: 직전 스냅샷에서 MOON의 시가총액이 훨씬 컸음
+        detector.update([{'symbol': 'MOON', 'price': 0.15, 'market_cap': 1e9}])
+        results = []
+
+        with patch('gmgn_scraper.save_data'), patch('builtins.print'):
+            collector = gmgn_scraper.create_pipeline(results=results, detector=detector).start()
+            collector.submit(('sol', 'home'))
+            collector.stop()
+
+        _, alerts = results[0]
+        assert any('시가총액 급감' in alert and 'MOON' in alert for alert in alerts)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
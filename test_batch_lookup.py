@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+여러 토큰 일괄 조회 테스트 코드
+"""
+import json
+import pytest
+from unittest.mock import patch
+from batch_lookup import SnapshotIndex, encode_batch, parse_batch_request
+from snapshot_diff import token_key
+from web_app import app
+
+TOKENS = [
+    {'symbol': 'PEPE', 'name': 'Pepe', 'price': 1.5, 'change_24h': 45.0, 'market_cap': 1000.0, 'volume_24h': 10.0},
+    {'symbol': 'DOGE', 'name': 'Doge', 'price': 0.2, 'change_24h': -3.0, 'market_cap': 500.0, 'volume_24h': 20.0},
+    {'symbol': '한글', 'name': '한글 토큰', 'price': 3.0, 'change_24h': 1.0, 'market_cap': 50.0, 'volume_24h': 5.0},
+]
+
+
+class TestSnapshotIndex:
+    """토큰 해시 인덱스/조각 캐시 테스트 클래스"""
+
+    def test_fragments_are_encoded_once_per_version(self):
+        """같은 버전에서는 토큰 조각을 다시 인코딩하지 않는지 테스트"""
+        index = SnapshotIndex()
+        index.rebuild(1, TOKENS)
+
+        found, missing = index.lookup(['DOGE', 'NOPE', 'PEPE'], ('price',))
+        index.lookup(['PEPE', 'DOGE'], ('price',))
+
+        assert [ref for ref, _, _ in found] == ['DOGE', 'PEPE']
+        assert [key for _, key, _ in found] == [token_key(TOKENS[1]), token_key(TOKENS[0])]
+        assert missing == ['NOPE']
+        assert json.loads(found[1][2]) == {'price': 1.5}
+        assert index.encoded == 2
+
+        # When: 새 버전 → 조각 다시 생성
+        index.rebuild(2, [dict(TOKENS[0], price=2.0)])
+        (hit,), _ = index.lookup([token_key(TOKENS[0])], ('price',))
+        assert json.loads(hit[2]) == {'price': 2.0}
+
+    def test_encoded_batch_is_valid_json(self):
+        """조각을 이어 붙인 응답이 올바른 JSON인지 테스트"""
+        index = SnapshotIndex()
+        index.rebuild(7, TOKENS)
+        found, missing = index.lookup(['한글', 'sol:PEPE', 'X'])
+
+        body = json.loads(encode_batch(7, found, missing, {'한글': {'1h': b'[[1,3.0]]'}, 'sol:PEPE': {'1h': b'[]'}}))
+
+        assert body['version'] == 7
+        assert body['count'] == 2
+        assert body['tokens']['한글'] == TOKENS[2]
+        assert body['tokens']['sol:PEPE'] == TOKENS[0]
+        assert body['history'] == {'한글': {'1h': [[1, 3.0]]}, 'sol:PEPE': {'1h': []}}
+        assert body['missing'] == ['X']
+
+    def test_invalid_requests(self):
+        """잘못된 요청 본문 검증 테스트"""
+        windows = ['5m', '1h']
+        assert parse_batch_request({'tokens': ['A', 'A', 7, '7', 'B'], 'fields': ['price', 'name']}, windows) == \
+            (['A', '7', 'B'], ('name', 'price'), [])
+        for body in (None, {'tokens': []}, {'tokens': 'PEPE'}, {'tokens': [True]}, {'tokens': ['A'], 'fields': 'price'},
+                     {'tokens': ['A'], 'windows': ['7d']}, {'tokens': ['A'] * 501}):
+            with pytest.raises(ValueError):
+                parse_batch_request(body, windows)
+
+
+class TestBatchApi:
+    """POST /api/tokens/batch 테스트 클래스"""
+
+    @pytest.fixture
+    def client(self):
+        app.config['TESTING'] = True
+        with patch('web_app.load_latest_data', return_value=TOKENS), app.test_client() as client:
+            yield client
+
+    def test_batch_returns_requested_tokens(self, client):
+        """요청한 토큰의 지정 필드만 한 번에 반환하는지 테스트"""
+        response = client.post('/api/tokens/batch', json={'tokens': ['PEPE', 'DOGE', 'NOPE'],
+                                                          'fields': ['price', 'change_24h']})
+
+        body = response.get_json()
+        assert response.status_code == 200
+        assert body['tokens'] == {'PEPE': {'change_24h': 45.0, 'price': 1.5},
+                                  'DOGE': {'change_24h': -3.0, 'price': 0.2}}
+        assert body['missing'] == ['NOPE']
+        assert 'history' not in body
+
+    def test_batch_with_window_history(self, client):
+        """구간 히스토리를 함께 요청하면 버전 단위로 캐시해서 반환하는지 테스트"""
+        rows = [{'ts': 100.0, 'price': 1.0}, {'ts': 160.0, 'price': 1.5}]
+        with patch('web_app.storage.load_token_history', return_value=rows) as load:
+            first = client.post('/api/tokens/batch', json={'tokens': ['PEPE'], 'windows': ['1h']}).get_json()
+            client.post('/api/tokens/batch', json={'tokens': ['PEPE'], 'windows': ['1h']})
+
+        assert first['history'] == {'PEPE': {'1h': [[100.0, 1.0], [160.0, 1.5]]}}
+        assert load.call_count == 1
+        assert load.call_args[0][0] == token_key(TOKENS[0])
+
+    def test_batch_by_id(self, client):
+        """토큰 id로 조회하면 응답도 요청한 id 문자열을 키로 쓰는지 테스트"""
+        token_id = token_key(TOKENS[1])
+
+        response = client.post('/api/tokens/batch', json={'tokens': [token_id, str(token_id)], 'fields': ['price']})
+
+        # 12와 "12"를 함께 요청해도 JSON 키는 하나
+        assert response.data.count(f'"{token_id}":'.encode()) == 1
+        assert response.get_json()['tokens'] == {str(token_id): {'price': 0.2}}
+
+    def test_batch_rejects_bad_body(self, client):
+        """잘못된 본문은 400 반환 테스트"""
+        response = client.post('/api/tokens/batch', json={'tokens': ['PEPE'], 'windows': ['1y']})
+
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
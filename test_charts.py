@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+차트 시리즈 및 LTTB 다운샘플링 테스트 코드
+"""
+import numpy as np
+import pytest
+from unittest.mock import patch
+from charts import lttb, build_series
+from snapshot_diff import token_key
+from web_app import app
+
+
+class TestLTTB:
+    """LTTB 다운샘플링 테스트"""
+
+    def test_output_size_and_endpoints(self):
+        """출력 점 개수와 첫/마지막 점 유지 테스트"""
+        x = np.arange(10000, dtype=float)
+        y = np.sin(x / 100)
+
+        xs, ys = lttb(x, y, 500)
+
+        assert len(xs) == 500
+        assert xs[0] == 0 and xs[-1] == 9999
+        assert np.all(np.diff(xs) > 0)
+
+    def test_keeps_spikes(self):
+        """급등 지점(스파이크)이 유지되는지 테스트"""
+        x = np.arange(5000, dtype=float)
+        y = np.ones(5000)
+        y[2345] = 100.0
+
+        xs, ys = lttb(x, y, 50)
+
+        assert 100.0 in ys
+
+    def test_small_input_is_returned_unchanged(self):
+        """출력 크기보다 작은 입력은 그대로 반환 테스트"""
+        xs, ys = lttb([1, 2, 3], [4, 5, 6], 100)
+        assert list(xs) == [1, 2, 3]
+        assert list(ys) == [4, 5, 6]
+
+    def test_build_series_skips_missing_values(self):
+        """가격이 없는 행은 제외하는지 테스트"""
+        history = [{'ts': 1.0, 'price': 1.0}, {'ts': 2.0, 'price': None}, {'ts': 3.0, 'price': 3.0}]
+        assert build_series(history, 100) == [[1.0, 1.0], [3.0, 3.0]]
+
+
+class TestChartApi:
+    """차트 API 테스트"""
+
+    @pytest.fixture
+    def client(self):
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+
+    def test_chart_endpoint_downsamples_and_caches(self, client):
+        """요청 너비로 축소하고 같은 요청은 캐시에서 응답하는지 테스트"""
+        history = [{'ts': float(i), 'price': float(i % 37)} for i in range(3000)]
+        tokens = [{'symbol': 'CHART', 'price': 1.0, 'change_24h': 0.0}]
+
+        with patch('web_app.load_latest_data', return_value=tokens), \
+                patch('storage.load_token_history', return_value=history) as mock_history:
+            first = client.get('/api/chart/CHART?range=24h&width=200').get_json()
+            second = client.get('/api/chart/CHART?range=24h&width=200').get_json()
+
+        assert len(first['points']) == 200
+        assert first['raw_count'] == 3000
+        assert second == first
+        assert mock_history.call_count == 1
+        assert first['symbol'] == 'CHART'
+        assert first['id'] == token_key(tokens[0])
+
+    def test_chart_endpoint_unknown_token(self, client):
+        """등록되지 않은 토큰 요청 테스트"""
+        with patch('web_app.load_latest_data', return_value=[]):
+            response = client.get('/api/chart/sol:NO_SUCH_TOKEN')
+        assert response.status_code == 404
+
+    def test_chart_endpoint_rejects_unknown_range(self, client):
+        """지원하지 않는 기간 요청 테스트"""
+        response = client.get('/api/chart/CHART?range=5y')
+        assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+통합 CLI 테스트 코드
+"""
+import json
+import subprocess
+import sys
+import pytest
+import cli
+
+
+class TestCli:
+    """통합 CLI 테스트 클래스"""
+
+    def test_light_commands_skip_heavy_imports(self):
+        """ls 명령이 무거운 의존성을 import하지 않는지 테스트"""
+        code = ("import sys, cli; cli.main(['ls', '--dir', '.']); "
+                "print(sorted(m for m in cli.HEAVY_MODULES if m in sys.modules))")
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                cwd=cli.ROOT, check=True)
+
+        assert result.stdout.strip().splitlines()[-1] == '[]'
+
+    def test_ls_lists_data_files(self, tmp_path, capsys):
+        """ls 명령의 JSON/저장소 파일 목록 테스트"""
+        (tmp_path / 'latest.json').write_text('{}')
+        (tmp_path / 'data').mkdir()
+        (tmp_path / 'data' / 'gmgn.db').write_bytes(b'x' * 10)
+
+        assert cli.main(['ls', '--dir', str(tmp_path)]) == 0
+        output = capsys.readouterr().out
+
+        assert 'latest.json (2 bytes)' in output
+        assert 'data/gmgn.db (10 bytes)' in output
+
+    def test_export_runs_in_process(self, tmp_path):
+        """export 하위 명령이 export 모듈의 인자/실행을 그대로 사용하는지 테스트"""
+        # Given: JSON 아카이브 하나
+        archive = [{'symbol': 'PEPE', 'name': 'Pepe', 'price': 1.5, 'change_24h': 3.0,
+                    'market_cap': 1000.0, 'volume_24h': 100.0}]
+        (tmp_path / 'gmgn_data_20240101_000000_000.json').write_text(json.dumps(archive))
+        output = tmp_path / 'out.csv'
+
+        # When
+        code = cli.main(['export', '--dir', str(tmp_path), '--format', 'csv', '-o', str(output)])
+
+        # Then
+        assert code == 0
+        assert 'PEPE' in output.read_text()
+
+    def test_unknown_command_is_rejected(self):
+        """알 수 없는 하위 명령은 argparse 오류로 종료되는지 테스트"""
+        with pytest.raises(SystemExit):
+            cli.main(['nope'])
+
+    def test_ls_cold_start_within_budget(self, tmp_path):
+        """새 인터프리터에서 ls가 시작 시간 예산 안에 끝나는지 테스트"""
+        assert cli.cold_start(['ls'], runs=3, cwd=str(tmp_path)) <= cli.COLD_START_BUDGETS['ls']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+egress 경로 풀 테스트 코드 - 로컬 가짜 프록시 사용
+"""
+import pytest
+from egress import CircuitBreaker, EgressPool, EgressUnavailable, FakeProxy, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEgress:
+    """egress 풀 테스트 클래스"""
+
+    def test_token_bucket_refills_over_time(self):
+        """토큰 버킷 소비/충전 테스트"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+
+        assert bucket.try_acquire() and bucket.try_acquire()
+        assert not bucket.try_acquire()
+        assert bucket.wait_time() == pytest.approx(0.5)
+
+        clock.now = 0.5
+        assert bucket.try_acquire()
+
+    def test_circuit_breaker_opens_and_recovers(self):
+        """연속 실패 시 차단, 시간 경과 후 시험 요청 성공 시 복구 테스트"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == 'open' and not breaker.allows()
+
+        # When: 차단 시간 경과 → 시험 요청 하나만 허용
+        clock.now = 10
+        assert breaker.allows()
+        breaker.on_request()
+        assert breaker.state == 'half_open' and not breaker.allows()
+
+        breaker.record_success()
+        assert breaker.state == 'closed' and breaker.allows()
+
+    def test_requests_are_spread_across_routes(self):
+        """여러 프록시 경로로 요청이 나뉘는지 테스트"""
+        with FakeProxy('a') as a, FakeProxy('b') as b:
+            pool = EgressPool([a.url, b.url], rate=0.001, burst=2, wait_timeout=0)
+
+            vias = [pool.get('http://gmgn.test/trending', timeout=5).json()['via'] for _ in range(4)]
+
+            # Then: 경로별 예산(2개)만큼씩 사용, 예산이 없으면 대기 없이 실패
+            assert sorted(vias) == ['a', 'a', 'b', 'b']
+            assert a.requests[0] == 'http://gmgn.test/trending'
+            with pytest.raises(EgressUnavailable):
+                pool.get('http://gmgn.test/trending', timeout=5)
+            # 호스트별 예산이므로 다른 호스트는 요청 가능
+            assert pool.get('http://other.test/', timeout=5).status_code == 200
+            pool.close()
+
+    def test_failing_route_is_retried_elsewhere_and_avoided(self):
+        """실패한 요청은 다른 경로로 재시도되고, 건강 점수가 낮은 경로는 피하는지 테스트"""
+        with FakeProxy('bad', status=503) as bad, FakeProxy('good') as good:
+            pool = EgressPool([bad.url, good.url], rate=100, burst=100)
+
+            for _ in range(6):
+                assert pool.get('http://gmgn.test/', timeout=5).json()['via'] == 'good'
+
+            bad_route, good_route = pool.report()
+            assert bad_route['requests'] == 1 and bad_route['error_rate'] == 1.0
+            assert bad_route['health'] < good_route['health']
+            assert good_route['succeeded'] == 6 and good_route['error_rate'] == 0.0
+            assert good_route['per_minute'] == 6.0
+            pool.close()
+
+    def test_circuit_breaker_trips_failing_route(self):
+        """연속 실패한 경로가 차단되고 마지막 실패 응답을 반환하는지 테스트"""
+        with FakeProxy('bad', status=503) as bad:
+            pool = EgressPool([bad.url], rate=100, burst=100, failure_threshold=2, wait_timeout=0)
+
+            response = pool.get('http://gmgn.test/', timeout=5)
+
+            # Then: 2번 실패 후 차단 → 세 번째 시도 없이 503 반환
+            assert response.status_code == 503
+            assert len(bad.requests) == 2
+            assert pool.report()[0]['state'] == 'open'
+            with pytest.raises(EgressUnavailable):
+                pool.get('http://gmgn.test/', timeout=5)
+            pool.close()
+
+    def test_rate_limited_route_drains_budget(self):
+        """429 응답 시 해당 경로의 예산을 비우고 다른 경로 사용 테스트"""
+        with FakeProxy('limited', status=429) as limited, FakeProxy('ok') as ok:
+            pool = EgressPool([limited.url, ok.url], rate=0.001, burst=5, failure_threshold=10)
+
+            assert pool.get('http://gmgn.test/', timeout=5).json()['via'] == 'ok'
+            assert len(limited.requests) == 1
+
+            # Then: 이후 요청은 예산이 남은 경로로만 전송
+            for _ in range(3):
+                pool.get('http://gmgn.test/', timeout=5)
+            assert len(limited.requests) == 1
+            assert pool.report()[0]['throttled'] == 1
+            pool.close()
+
+    def test_pool_is_opt_in(self, monkeypatch):
+        """프록시 설정이 없으면 기본 수집 경로에 풀을 만들지 않는지 테스트"""
+        monkeypatch.delenv('GMGN_EGRESS_PROXIES', raising=False)
+        assert EgressPool.from_env() is None
+
+        monkeypatch.setenv('GMGN_EGRESS_PROXIES', 'http://proxy1:8080, direct')
+        pool = EgressPool.from_env()
+        assert [route.proxy for route in pool.routes] == ['http://proxy1:8080', None]
+        pool.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
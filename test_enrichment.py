@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+토큰 상세 정보 보강 테스트 코드
+"""
+import threading
+import time
+import pytest
+from enrichment import Enricher, TTLCache, fetch_token_detail, DETAIL_FIELDS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """TTL 캐시 테스트"""
+
+    def test_entries_expire_after_ttl(self):
+        """TTL 경과 후 만료 테스트"""
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, clock=clock)
+        cache.set('a', 1)
+
+        assert cache.get('a') == 1
+        clock.now = 11
+        assert cache.get('a') is None
+
+    def test_lru_eviction_when_full(self):
+        """크기 초과 시 가장 오래 사용하지 않은 항목 제거 테스트"""
+        cache = TTLCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert cache.stats()['evictions'] == 1
+
+
+class TestEnricher:
+    """상세 정보 보강 테스트"""
+
+    @pytest.fixture
+    def tokens(self):
+        return [{'symbol': f'T{i}', 'market_cap': 1000, 'change_24h': 0.0} for i in range(5)]
+
+    def test_fetch_token_detail_fields(self):
+        """상세 정보 필드 테스트"""
+        detail = fetch_token_detail({'symbol': 'PEPE', 'market_cap': 1000})
+        assert set(detail) == set(DETAIL_FIELDS)
+
+    def test_only_new_tokens_are_fetched(self, tokens):
+        """이미 본 토큰은 캐시를 사용하고 새 토큰만 조회하는지 테스트"""
+        calls = []
+        enricher = Enricher(fetch=lambda t: calls.append(t['symbol']) or {'holders': 1})
+
+        # Given: 첫 주기에 5개 조회
+        first = enricher.enrich(tokens)
+        assert len(calls) == 5
+        assert all(t['holders'] == 1 for t in first)
+
+        # When: 같은 토큰 + 새 토큰 1개
+        enricher.enrich(tokens + [{'symbol': 'NEW'}])
+
+        # Then: 새 토큰만 조회
+        assert calls[5:] == ['NEW']
+        enricher.close()
+
+    def test_priority_tokens_refetched_after_expiry(self, tokens):
+        """만료된 캐시는 priority 토큰만 다시 조회하는지 테스트"""
+        clock = FakeClock()
+        calls = []
+        enricher = Enricher(fetch=lambda t: calls.append(t['symbol']) or {'holders': 1},
+                            cache=TTLCache(ttl=10, clock=clock), refresh_limit=0)
+        enricher.enrich(tokens)
+
+        clock.now = 100
+        enricher.enrich(tokens, priority=lambda t: t['symbol'] == 'T0')
+
+        assert calls[5:] == ['T0']
+        enricher.close()
+
+    def test_expired_tokens_are_refreshed_in_turn(self, tokens):
+        """만료된 일반 토큰은 주기마다 refresh_limit개씩 돌아가며 다시 조회하는지 테스트"""
+        clock = FakeClock()
+        calls = []
+        enricher = Enricher(fetch=lambda t: calls.append(t['symbol']) or {'holders': 1},
+                            cache=TTLCache(ttl=10, clock=clock), refresh_limit=2)
+        enricher.enrich(tokens)
+
+        # When: 모두 만료된 뒤 세 주기 (다시 조회한 토큰은 TTL 동안 캐시)
+        for now in (100, 105, 109):
+            clock.now = now
+            result = enricher.enrich(tokens)
+
+        # Then: 다섯 토큰이 모두 한 번씩 갱신되고, 조회 시각이 붙음
+        assert calls[5:] == ['T0', 'T1', 'T2', 'T3', 'T4']
+        assert all('enriched_at' in token for token in result)
+        enricher.close()
+
+    def test_per_host_concurrency_limit(self, tokens):
+        """호스트별 동시 요청 수 제한 테스트"""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_fetch(token):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            return {'holders': 1}
+
+        enricher = Enricher(fetch=slow_fetch, max_workers=8, per_host_limit=2)
+        enricher.enrich(tokens)
+        enricher.close()
+
+        assert max(peak) <= 2
+
+    def test_fetch_errors_leave_token_unchanged(self, tokens):
+        """조회 실패 시 원본 토큰 유지 테스트"""
+        def broken(token):
+            raise RuntimeError("boom")
+
+        enricher = Enricher(fetch=broken)
+        result = enricher.enrich(tokens[:1])
+        enricher.close()
+
+        assert result == tokens[:1]
+        assert enricher.stats()['errors'] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+히스토리 내보내기 테스트 코드
+"""
+import csv
+import io
+import json
+import pytest
+from unittest.mock import patch
+import export
+import storage
+from web_app import app
+
+
+@pytest.fixture
+def history_db(tmp_path):
+    """체인 두 개, 스냅샷 세 개가 저장된 SQLite 저장소"""
+    db_path = str(tmp_path / 'gmgn.db')
+    for minute in range(3):
+        storage.save_snapshot([
+            {'symbol': 'PEPE', 'name': 'Pepe', 'price': 1.0 + minute, 'change_24h': 10.0,
+             'market_cap': 100.0, 'volume_24h': 10.0, 'chain': 'sol'},
+            {'symbol': 'WETH', 'name': 'Wrapped', 'price': 2.0, 'change_24h': -1.0,
+             'market_cap': 200.0, 'volume_24h': 20.0, 'chain': 'eth'},
+        ], db_path=db_path, ts=1000.0 + minute * 60)
+
+    with patch.object(storage, 'STORAGE_BACKEND', 'sqlite'), patch.object(storage, 'DB_PATH', db_path):
+        yield db_path
+    storage.close_connections()
+
+
+class TestExport:
+    """내보내기 테스트 클래스"""
+
+    def test_csv_filters_by_chain_and_range(self, history_db):
+        """체인과 기간으로 거른 CSV 테스트"""
+        chunks = export.export('csv', start=1060, chains={'sol'}, columns=['ts', 'symbol', 'price'])
+
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        assert rows == [['ts', 'symbol', 'price'], ['1060.0', 'PEPE', '2.0'], ['1120.0', 'PEPE', '3.0']]
+
+    def test_ndjson_is_streamed_in_chunks(self, history_db):
+        """chunk_rows개 단위로 나눠 생성되는지 테스트"""
+        chunks = list(export.export('ndjson', symbols={'WETH'}, chunk_rows=2))
+
+        # Then: 3행 → 2개 조각, 한 줄에 하나의 JSON
+        assert len(chunks) == 2
+        records = [json.loads(line) for line in b''.join(chunks).decode('utf-8').splitlines()]
+        assert [r['chain'] for r in records] == ['eth'] * 3
+        assert list(records[0]) == export.DEFAULT_COLUMNS
+
+    def test_json_archive_rows_default_chain(self, tmp_path):
+        """체인 정보가 없는 JSON 아카이브는 기본 체인으로 내보내는지 테스트"""
+        with open(tmp_path / 'gmgn_data_20240101_000000_000.json', 'w', encoding='utf-8') as f:
+            json.dump([{'symbol': 'OLD', 'price': 1.0}], f)
+
+        chunks = export.export('ndjson', chains={'sol'}, directory=str(tmp_path))
+
+        record = json.loads(b''.join(chunks))
+        assert record['symbol'] == 'OLD'
+        assert record['chain'] == 'sol'
+        assert record['market_cap'] is None
+
+    def test_invalid_arguments(self):
+        """잘못된 형식/컬럼 오류 테스트"""
+        with pytest.raises(ValueError):
+            export.export('xlsx')
+        with pytest.raises(ValueError):
+            export.parse_columns('symbol,price;drop')
+
+    @pytest.mark.skipif(export.pa is None, reason="pyarrow 미설치")
+    def test_parquet_round_trip(self, history_db, tmp_path):
+        """Parquet 내보내기 테스트 (pyarrow 설치 시)"""
+        import pyarrow.parquet as pq
+        path = tmp_path / 'out.parquet'
+        path.write_bytes(b''.join(export.export('parquet', chunk_rows=2)))
+
+        table = pq.read_table(str(path))
+        assert table.num_rows == 6
+        assert table.column('symbol').to_pylist()[:2] == ['PEPE', 'WETH']
+
+    def test_export_api_streams_csv(self, history_db):
+        """내보내기 API 스트리밍 응답 테스트"""
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            response = client.get('/api/export?format=csv&symbol=PEPE&columns=symbol,price')
+            streamed = response.is_streamed
+            body = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert streamed
+        assert response.headers['Content-Type'].startswith('text/csv')
+        assert body.splitlines() == ['symbol,price', 'PEPE,1.0', 'PEPE,2.0', 'PEPE,3.0']
+
+    def test_export_api_rejects_bad_format(self):
+        """지원하지 않는 형식 400 테스트"""
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            response = client.get('/api/export?format=xlsx')
+
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
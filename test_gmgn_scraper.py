@@ -75,6 +75,14 @@ class TestGMGNScraper:
                 assert mock_file.called
                 assert mock_json_dump.called
 
+    def test_latest_json_time_matches_archive(self):
+        """latest.json 수정 시각이 같은 스냅샷 아카이브의 시각과 같은지 테스트 (리더보드 중복 반영 방지)"""
+        with patch('builtins.print'):
+            gmgn_scraper.save_data([{'symbol': 'TEST', 'price': 1.0, 'change_24h': 0.0}])
+
+        (archive,) = [name for name in os.listdir('.') if name.startswith('gmgn_data_')]
+        assert os.path.getmtime('latest.json') == gmgn_scraper.storage.snapshot_file_time(archive)
+
     def test_check_alerts_identifies_pumping_tokens(self):
         """급등 토큰 식별 테스트"""
         # Given: 급등/급락 토큰 데이터
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+기술 지표 엔진 테스트 코드
+"""
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from indicators import IndicatorEngine, load_indicator_values
+from leases import instance_path
+from snapshot_diff import token_key
+from web_app import app
+
+
+PRICES = [1.0, 1.1, 1.05, 1.2, 1.15, 1.3, 1.25, 1.4, 1.35, 1.5,
+          1.45, 1.6, 1.55, 1.4, 1.3, 1.35, 1.5, 1.65, 1.6, 1.7]
+
+
+def key(symbol):
+    return token_key({'symbol': symbol})
+
+
+def feed(engine, prices, symbol='AAA', volume=100.0):
+    for price in prices:
+        engine.update([{'symbol': symbol, 'price': price, 'volume_24h': volume}])
+
+
+class TestIndicatorEngine:
+    """기술 지표 엔진 테스트 클래스"""
+
+    def test_ema_matches_pandas(self):
+        """EMA가 pandas ewm 결과와 일치하는지 테스트"""
+        engine = IndicatorEngine()
+        feed(engine, PRICES)
+
+        expected = pd.Series(PRICES).ewm(span=12, adjust=False).mean().iloc[-1]
+        assert engine.values(key('AAA'))['ema_fast'] == pytest.approx(expected)
+
+    def test_rsi_matches_wilder(self):
+        """RSI가 Wilder 방식 계산과 일치하는지 테스트"""
+        engine = IndicatorEngine(rsi_period=14)
+        feed(engine, PRICES)
+
+        diffs = np.diff(PRICES)
+        gains, losses = np.maximum(diffs, 0), np.maximum(-diffs, 0)
+        avg_gain, avg_loss = gains[:14].mean(), losses[:14].mean()
+        for g, l in zip(gains[14:], losses[14:]):
+            avg_gain = (avg_gain * 13 + g) / 14
+            avg_loss = (avg_loss * 13 + l) / 14
+        expected = 100 - 100 / (1 + avg_gain / avg_loss)
+
+        assert engine.values(key('AAA'))['rsi'] == pytest.approx(expected)
+
+    def test_vwap_and_volatility(self):
+        """VWAP 및 변동성 계산 테스트"""
+        engine = IndicatorEngine()
+        engine.update([{'symbol': 'AAA', 'price': 1.0, 'volume_24h': 100}])
+        engine.update([{'symbol': 'AAA', 'price': 2.0, 'volume_24h': 300}])
+
+        values = engine.values(key('AAA'))
+        assert values['vwap'] == pytest.approx((1.0 * 100 + 2.0 * 300) / 400)
+        assert values['volatility'] > 0
+        assert values['samples'] == 2
+
+    def test_batch_update_is_independent_per_token(self):
+        """여러 토큰을 한 번에 갱신해도 토큰별로 독립적인지 테스트"""
+        batch_engine = IndicatorEngine(capacity=2)
+        single_engine = IndicatorEngine()
+        for i, price in enumerate(PRICES):
+            batch_engine.update([{'symbol': f'T{n}', 'price': price * (n + 1)} for n in range(5)])
+            single_engine.update([{'symbol': 'T3', 'price': price * 4}])
+
+        assert len(batch_engine) == 5
+        assert batch_engine.values('T3') == pytest.approx(single_engine.values('T3'))
+
+    def test_invalid_prices_are_skipped(self):
+        """가격이 없거나 0 이하인 토큰은 건너뛰는지 테스트"""
+        engine = IndicatorEngine()
+        updated = engine.update([{'symbol': 'A', 'price': None}, {'symbol': 'B', 'price': 0},
+                                 {'symbol': 'C', 'price': 'x'}, {'name': 'no symbol', 'price': 1.0}])
+        assert updated == 0
+        assert len(engine) == 0
+
+    def test_state_survives_save_and_load(self, tmp_path):
+        """저장 후 복원해도 계속 같은 결과를 내는지 테스트"""
+        path = str(tmp_path / 'indicators.npz')
+        continuous = IndicatorEngine()
+        feed(continuous, PRICES)
+
+        restarted = IndicatorEngine()
+        feed(restarted, PRICES[:10])
+        restarted.save(path)
+        restarted = IndicatorEngine.load(path)
+        feed(restarted, PRICES[10:])
+
+        assert restarted.values(key('AAA')) == pytest.approx(continuous.values(key('AAA')))
+
+    def test_instances_write_separate_files(self, tmp_path):
+        """여러 모니터 인스턴스가 동시에 저장해도 서로 덮어쓰지 않고, 웹 조회는 합쳐서 읽는지 테스트"""
+        path = str(tmp_path / 'indicators.npz')
+        engines = {}
+        for instance, symbol in (('a', 'AAA'), ('b', 'BBB')):
+            engines[instance] = IndicatorEngine.load(instance_path(path, instance))
+            feed(engines[instance], PRICES[:5], symbol=symbol)
+
+        # When: 두 인스턴스가 같은 주기에 반복 저장
+        def run(engine, symbol):
+            for price in PRICES[5:]:
+                feed(engine, [price], symbol=symbol)
+                engine.save()
+
+        threads = [threading.Thread(target=run, args=(engines['a'], 'AAA')),
+                   threading.Thread(target=run, args=(engines['b'], 'BBB'))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Then: 인스턴스별 파일에 각자의 토큰, 웹은 둘 다 조회
+        assert IndicatorEngine.load(instance_path(path, 'a')).keys == [key('AAA')]
+        assert IndicatorEngine.load(instance_path(path, 'b')).keys == [key('BBB')]
+        values = load_indicator_values(path)
+        assert set(values) == {key('AAA'), key('BBB')}
+        assert values[key('BBB')]['samples'] == len(PRICES)
+
+
+class TestIndicatorApi:
+    """/api/tokens 지표 노출 테스트"""
+
+    def test_api_tokens_includes_indicators(self):
+        """토큰 API 응답에 지표 값이 포함되는지 테스트"""
+        tokens = [{'symbol': 'AAA', 'name': 'A', 'price': 1.0, 'change_24h': 0.0}]
+        values = {key('AAA'): {'ema_fast': 1.0, 'rsi': 50.0}}
+        app.config['TESTING'] = True
+
+        with patch('web_app.load_latest_data', return_value=tokens), \
+                patch('web_app.load_indicator_values', return_value=values):
+            data = app.test_client().get('/api/tokens').get_json()
+
+        assert data['indicators'] == {str(key('AAA')): values[key('AAA')]}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+리더보드 테스트 코드
+"""
+import pytest
+from unittest.mock import patch
+from leaderboard import Leaderboard
+from snapshot_diff import token_key
+from web_app import app
+
+
+def snapshot(prices, volumes=None):
+    volumes = volumes or {}
+    return [{'symbol': s, 'price': p, 'volume_24h': volumes.get(s, 100.0)} for s, p in prices.items()]
+
+
+class TestLeaderboard:
+    """리더보드 테스트 클래스"""
+
+    def test_gainers_and_losers_per_window(self):
+        """구간별 상승/하락 순위 테스트"""
+        board = Leaderboard(windows={'5m': 300, '1h': 3600}, k=2)
+
+        # Given: 1시간 전, 5분 전, 현재 가격
+        board.ingest(snapshot({'A': 1.0, 'B': 1.0, 'C': 1.0}), ts=0)
+        board.ingest(snapshot({'A': 2.0, 'B': 1.0, 'C': 1.0}), ts=3300)
+        board.ingest(snapshot({'A': 2.0, 'B': 1.5, 'C': 0.5}), ts=3600)
+
+        # Then: 5분 구간은 B 상승/C 하락, 1시간 구간은 A가 최대 상승
+        five = board.top('5m')
+        assert five['gainers'][0]['symbol'] == 'B'
+        assert five['gainers'][0]['change'] == pytest.approx(50.0)
+        assert five['losers'][0]['symbol'] == 'C'
+
+        hour = board.top('1h')
+        assert hour['gainers'][0]['symbol'] == 'A'
+        assert hour['gainers'][0]['change'] == pytest.approx(100.0)
+
+    def test_top_returns_at_most_k(self):
+        """상위 K개만 반환 테스트"""
+        board = Leaderboard(windows={'5m': 300}, k=5)
+        board.ingest(snapshot({f'T{i}': 1.0 for i in range(100)}), ts=0)
+        board.ingest(snapshot({f'T{i}': 1.0 + i / 100 for i in range(100)}), ts=60)
+
+        top = board.top('5m', k=3)
+        assert [e['symbol'] for e in top['gainers']] == ['T99', 'T98', 'T97']
+        assert len(board.top('5m', k=50)['gainers']) == 5
+
+    def test_volume_spikes(self):
+        """거래량 급증 순위 테스트"""
+        board = Leaderboard(windows={'5m': 300})
+        board.ingest(snapshot({'A': 1.0, 'B': 1.0}), ts=0)
+        board.ingest(snapshot({'A': 1.0, 'B': 1.0}, volumes={'B': 1000.0}), ts=60)
+
+        spike = board.top('5m')['volume_spikes'][0]
+        assert spike['symbol'] == 'B'
+        assert spike['volume_ratio'] == pytest.approx(10.0)
+
+    def test_history_is_bounded_and_pruned(self):
+        """구간당 샘플 수 제한과 사라진 토큰 정리 테스트"""
+        board = Leaderboard(windows={'5m': 300}, resolution=10)
+        for ts in range(0, 600, 1):
+            board.ingest(snapshot({'A': 1.0}), ts=ts)
+        assert len(board._history['5m'][token_key({'symbol': 'A'})]) <= 12
+
+        board.ingest(snapshot({'B': 1.0}), ts=2000)
+        assert board.tracked_tokens() == {'5m': 1}
+
+    def test_same_snapshot_is_not_ingested_twice(self):
+        """이미 반영한 시각의 스냅샷(재시작 후 워밍된 스냅샷 등)은 다시 반영하지 않는지 테스트"""
+        board = Leaderboard(windows={'5m': 300})
+        assert board.ingest(snapshot({'A': 1.0}), ts=100)
+        assert board.ingest(snapshot({'A': 2.0}), ts=160)
+
+        assert not board.ingest(snapshot({'A': 2.0}), ts=160)
+        assert not board.ingest(snapshot({'A': 9.0}), ts=120)
+        assert board.updated_at == 160
+        assert board.top('5m')['gainers'][0]['change'] == pytest.approx(100.0)
+
+    def test_negative_k_returns_nothing(self):
+        """음수 k는 빈 목록 반환 테스트"""
+        board = Leaderboard(windows={'5m': 300})
+        board.ingest(snapshot({'A': 1.0, 'B': 2.0}), ts=0)
+
+        assert board.top('5m', k=-1) == {'gainers': [], 'losers': [], 'volume_spikes': []}
+
+
+class TestLeaderboardApi:
+    """리더보드 API 테스트"""
+
+    @pytest.fixture
+    def client(self):
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+
+    def test_api_leaderboard(self, client):
+        """/api/leaderboard 응답 테스트"""
+        tokens = snapshot({'LB1': 1.0, 'LB2': 2.0})
+        with patch('web_app.load_latest_data', return_value=tokens):
+            data = client.get('/api/leaderboard?window=1h&k=5').get_json()
+
+        assert data['success'] is True
+        assert set(data['windows']) == {'1h'}
+        assert set(data['windows']['1h']) == {'gainers', 'losers', 'volume_spikes'}
+
+    def test_api_leaderboard_uses_snapshot_time(self, client):
+        """리더보드가 요청 시각이 아니라 스냅샷 시각으로 반영되는지 테스트"""
+        with patch('web_app.load_latest_data', return_value=snapshot({'LB3': 1.0})), \
+                patch('web_app.leaderboard', Leaderboard()), \
+                patch('web_app.storage.latest_snapshot_time', return_value=1234.5):
+            data = client.get('/api/leaderboard?window=5m').get_json()
+
+        assert data['updated_at'] == 1234.5
+        assert client.get('/api/leaderboard?k=-1').status_code == 400
+
+    def test_api_leaderboard_rejects_unknown_window(self, client):
+        """지원하지 않는 구간 요청 테스트"""
+        with patch('web_app.load_latest_data', return_value=[]):
+            assert client.get('/api/leaderboard?window=3d').status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+수집 대상 임대 테스트 코드
+"""
+import threading
+import pytest
+from unittest.mock import patch
+import auto_monitor
+from leases import LeaseCoordinator
+
+TARGETS = ['sol:home', 'sol:new', 'eth:home', 'eth:new', 'base:home', 'bsc:home']
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLeases:
+    """임대 배분 테스트 클래스"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / 'leases.db')
+
+    def test_targets_are_rebalanced_when_instance_joins(self, db_path):
+        """새 인스턴스가 들어오면 기존 인스턴스가 몫을 넘겨주는지 테스트"""
+        clock = FakeClock()
+        a = LeaseCoordinator(db_path, 'a', ttl=60, clock=clock)
+        b = LeaseCoordinator(db_path, 'b', ttl=60, clock=clock)
+
+        # Given: a 혼자 모든 대상 보유
+        assert a.claim(TARGETS) == TARGETS
+
+        # When: b 합류 → a가 몫(3개)만 남기고 놓음 → b가 가져감
+        assert b.claim(TARGETS) == []
+        held_a = a.claim(TARGETS)
+        held_b = b.claim(TARGETS)
+
+        # Then: 겹치지 않게 절반씩
+        assert len(held_a) == len(held_b) == 3
+        assert set(held_a) | set(held_b) == set(TARGETS)
+        assert set(a.assignments().values()) == {'a', 'b'}
+
+    def test_dead_instance_targets_are_taken_over(self, db_path):
+        """생존 신호가 끊긴 인스턴스의 대상을 만료 후 가져가는지 테스트"""
+        clock = FakeClock()
+        a = LeaseCoordinator(db_path, 'a', ttl=60, clock=clock)
+        b = LeaseCoordinator(db_path, 'b', ttl=60, clock=clock)
+        a.claim(TARGETS)
+        b.claim(TARGETS)
+        a.claim(TARGETS)
+        b.claim(TARGETS)
+
+        # When: b만 임대 갱신 (claim), a는 응답 없음
+        clock.now += 40
+        assert len(b.claim(TARGETS)) == 3   # a의 임대는 아직 유효 → 몫 유지
+
+        clock.now += 40
+        held = b.claim(TARGETS)
+
+        # Then: a가 만료되어 b가 전부 보유
+        assert held == TARGETS
+        assert b.stats()['live_instances'] == 1
+
+    def test_target_is_scraped_once_per_cycle(self, db_path):
+        """임대가 넘어가도 같은 주기에 두 번 수집하지 않는지 테스트"""
+        clock = FakeClock()
+        a = LeaseCoordinator(db_path, 'a', ttl=60, clock=clock)
+        b = LeaseCoordinator(db_path, 'b', ttl=60, clock=clock)
+
+        assert a.assign(['sol:home'], cycle=5) == ['sol:home']
+        assert a.assign(['sol:home'], cycle=5) == []
+
+        # When: a 종료 → b가 같은 주기에 임대를 가져감
+        a.release()
+        assert b.claim(['sol:home']) == ['sol:home']
+        assert b.begin('sol:home', 5) is False
+        assert b.begin('sol:home', 6) is True
+
+    def test_concurrent_claims_never_overlap(self, db_path):
+        """여러 인스턴스가 동시에 임대를 잡아도 대상이 겹치지 않는지 테스트"""
+        coordinators = [LeaseCoordinator(db_path, f'i{n}', ttl=60) for n in range(4)]
+        targets = [f'chain{n}:home' for n in range(12)]
+        for c in coordinators:
+            c.heartbeat()
+
+        def worker(coordinator):
+            for _ in range(5):
+                coordinator.claim(targets)
+
+        threads = [threading.Thread(target=worker, args=(c,)) for c in coordinators]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        held = [set(c.claim(targets)) for c in coordinators]
+
+        assert sum(len(h) for h in held) == len(set().union(*held))
+        assert all(len(h) <= 3 for h in held)
+        for c in coordinators:
+            c.close()
+
+    def test_assign_targets_for_monitor(self, db_path):
+        """모니터가 임대받은 대상만 수집 목록으로 받는지 테스트"""
+        a = LeaseCoordinator(db_path, 'a', ttl=60)
+        b = LeaseCoordinator(db_path, 'b', ttl=60)
+        b.heartbeat()
+        targets = [('sol', 'home'), ('eth', 'home')]
+
+        with patch('builtins.print'):
+            mine = auto_monitor.assign_targets(a, targets, now=0)
+            theirs = auto_monitor.assign_targets(b, targets, now=0)
+
+        assert len(mine) == len(theirs) == 1
+        assert set(mine + theirs) == set(targets)
+
+
+    def test_heartbeat_thread_keeps_leases(self, db_path):
+        """수집 주기와 별개의 스레드가 생존 신호를 갱신해 임대를 유지하는지 테스트"""
+        clock = FakeClock()
+        a = LeaseCoordinator(db_path, 'a', ttl=60, clock=clock)
+        b = LeaseCoordinator(db_path, 'b', ttl=60, clock=clock)
+        assert a.claim(TARGETS) == TARGETS
+
+        # Given: 원래 만료(1060) 직전에 갱신 스레드가 돌고
+        clock.now = 1050.0
+        beats = []
+        heartbeat = a.heartbeat
+        with patch.object(a, 'heartbeat', side_effect=lambda: beats.append(heartbeat())):
+            stop = a.start_heartbeat(interval=0.01)
+            while not beats:
+                threading.Event().wait(0.01)
+            stop.set()
+
+        # When: 메인 스레드가 한 번도 갱신하지 않은 채 원래 만료 시각이 지나도
+        clock.now = 1100.0
+
+        # Then: b가 가져가지 못함
+        assert b.claim(TARGETS) == []
+
+    def test_monitor_releases_leases_when_first_cycle_fails(self, db_path):
+        """첫 주기에서 중단돼도 체크포인트를 남기고 임대를 반납하는지 테스트"""
+        with patch.object(auto_monitor, 'LEASE_DB_PATH', db_path), \
+                patch.object(auto_monitor, 'run_cycle', side_effect=KeyboardInterrupt), \
+                patch.object(auto_monitor.StateStore, 'checkpoint') as checkpoint, \
+                patch('auto_monitor.signal.signal'), patch('builtins.print'):
+            auto_monitor.main()
+
+        checkpoint.assert_called_once()
+        other = LeaseCoordinator(db_path, 'other', ttl=60)
+        assert set(other.claim(TARGETS)) == set(TARGETS)
+        other.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+메모리 예산 및 디스크 이동(spill) 테스트 코드
+"""
+import pytest
+from unittest.mock import patch
+from indicators import IndicatorEngine, load_indicator_values
+from leaderboard import Leaderboard
+from memory_budget import MemoryBudget, SpillFile, SpillableDict
+from monitor_state import MonitorState, StateStore
+from snapshot_diff import token_key
+from web_app import app
+
+
+def key(symbol):
+    return token_key({'symbol': symbol})
+
+
+def tokens(count, price=1.0, prefix='T'):
+    return [{'symbol': f'{prefix}{i}', 'price': price, 'volume_24h': 100.0} for i in range(count)]
+
+
+class TestMemoryBudget:
+    """메모리 예산 테스트 클래스"""
+
+    def test_spillable_dict_reloads_evicted_entries(self, tmp_path):
+        """오래된 항목이 디스크로 이동하고 조회 시 다시 로드되는지 테스트"""
+        spill = SpillFile(str(tmp_path / 'spill.db'))
+        data = SpillableDict('test', spill)
+        for i in range(10):
+            data[i] = [i] * 3
+        data.get(0)  # 0은 최근 사용
+
+        # When: 3개 이동
+        assert data.evict(3) == 3
+
+        # Then: 가장 오래 사용되지 않은 1, 2, 3이 디스크로 이동
+        assert len(data) == 7
+        assert 1 not in data.keys() and 0 in data.keys()
+        assert 1 in data   # in은 디스크 항목까지 확인 (다시 불러오지 않음)
+        assert spill.count('test') == 3
+
+        # Then: 조회하면 다시 메모리로
+        assert data.get(1) == [1, 1, 1]
+        assert 1 in data
+        assert spill.count('test') == 2
+        spill.close()
+
+    def test_prune_removes_spilled_entries(self, tmp_path):
+        """사라진 토큰은 디스크로 옮겨진 뒤에도 정리되는지 테스트"""
+        spill = SpillFile(str(tmp_path / 'spill.db'))
+        state = MonitorState(window=600, spill=spill)
+        state.process(tokens(5), ts=0)
+        state.evict(5)
+
+        # When: 구간이 지나도록 T0만 계속 보임
+        for ts in (400, 800):
+            state.process(tokens(1), ts=ts)
+
+        # Then: 디스크에 남은 T1~T4 히스토리도 삭제
+        assert spill.count('monitor:history') == 0
+        assert [k for k, _ in state.history.all_items()] == [key('T0')]
+        spill.close()
+
+    def test_checkpoint_includes_spilled_history(self, tmp_path):
+        """체크포인트에 디스크로 옮겨진 히스토리도 저장되는지 테스트"""
+        spill = SpillFile(str(tmp_path / 'spill.db'))
+        store = StateStore(str(tmp_path / 'monitor'), fsync=False)
+        state = MonitorState(spill=spill)
+        state.process(tokens(5), ts=0)
+        state.evict(3)
+
+        store.checkpoint(state)
+        recovered = StateStore(str(tmp_path / 'monitor'), fsync=False).recover()
+
+        assert sorted(recovered.history.keys()) == sorted(key(f'T{i}') for i in range(5))
+        spill.close()
+
+    def test_restart_with_spilled_history_keeps_samples_once(self, tmp_path):
+        """디스크로 옮긴 히스토리가 있는 상태로 재시작해도 샘플이 중복되지 않는지 테스트"""
+        spill_path = str(tmp_path / 'spill.db')
+        spill = SpillFile(spill_path)
+        store = StateStore(str(tmp_path / 'monitor'), fsync=False)
+        state = MonitorState(spill=spill)
+        for ts in (1000, 1060, 1120):
+            state.process(tokens(3, price=1.0 + ts / 1e4), ts=ts)
+        state.evict(2)
+        store.checkpoint(state)
+        store.close()
+        spill.close()
+
+        # When: 같은 디스크 파일로 재시작
+        spill = SpillFile(spill_path)
+        recovered = StateStore(str(tmp_path / 'monitor'), fsync=False).recover(spill=spill)
+
+        # Then: 체크포인트의 샘플만 한 번씩, 디스크 사본은 삭제
+        assert spill.count('monitor:history') == 0
+        for i in range(3):
+            assert [ts for ts, _, _ in recovered.history.get(key(f'T{i}'))] == [1000, 1060, 1120]
+        spill.close()
+
+    def test_prune_does_not_read_spilled_values(self, tmp_path):
+        """정리할 때 디스크 항목을 읽지 않고 마지막 갱신 시각으로 지우는지 테스트"""
+        spill = SpillFile(str(tmp_path / 'spill.db'))
+        data = SpillableDict('test', spill, stamp=lambda v: v[-1])
+        for i in range(10):
+            data[i] = [i, float(i)]
+        data.evict(8)
+
+        with patch.object(SpillFile, 'items', side_effect=AssertionError('full scan')):
+            removed = data.prune(5.0)
+
+        assert removed == 5
+        assert sorted(k for k, _ in data.all_items()) == [5, 6, 7, 8, 9]
+        assert spill.count('test') == 3
+        spill.close()
+
+    def test_indicator_save_includes_spilled_rows(self, tmp_path):
+        """지표 저장 파일에 디스크로 옮겨진 토큰이 포함되고, 다시 불러오면 디스크 사본은 지우는지 테스트"""
+        spill = SpillFile(str(tmp_path / 'spill.db'))
+        path = str(tmp_path / 'indicators.npz')
+        engine = IndicatorEngine(spill=spill)
+        engine.update(tokens(10, price=1.0))
+        engine.update(tokens(10, price=1.2))
+        expected = engine.snapshot()
+        engine.evict(6)
+
+        engine.save(path)
+
+        saved = load_indicator_values(path)
+        assert sorted(saved) == sorted(expected)
+        assert all(saved[k] == pytest.approx(expected[k]) for k in expected)
+        restored = IndicatorEngine.load(path, spill=spill)
+        assert len(restored) == 10
+        assert spill.count('indicators') == 0
+        spill.close()
+
+    def test_spill_file_created_lazily(self, tmp_path):
+        """디스크 이동이 없으면 파일을 만들지 않는지 테스트"""
+        path = tmp_path / 'sub' / 'spill.db'
+        data = SpillableDict('test', SpillFile(str(path)))
+        data['a'] = 1
+
+        assert data.get('missing') is None
+        assert not path.exists()
+
+    def test_budget_evicts_largest_structure_first(self, tmp_path):
+        """예산 초과 시 가장 큰 구조부터 줄이는지 테스트"""
+        spill = SpillFile(str(tmp_path / 'spill.db'))
+        big = SpillableDict('big', spill)
+        small = SpillableDict('small', spill)
+        for i in range(1000):
+            big[i] = list(range(50))
+        for i in range(10):
+            small[i] = i
+
+        budget = MemoryBudget(limit_mb=0.1)
+        budget.register('big', big)
+        budget.register('small', small)
+
+        # When: 예산 적용
+        evicted = budget.enforce()
+
+        # Then: 예산 이하로 줄고, 작은 구조는 그대로
+        report = budget.report()
+        assert evicted > 0
+        assert report['total_bytes'] <= report['limit_bytes']
+        assert len(small) == 10
+        assert report['structures']['big']['evicted'] == evicted
+        spill.close()
+
+    def test_leaderboard_results_unchanged_after_spill(self, tmp_path):
+        """리더보드 히스토리를 디스크로 옮겨도 순위가 같은지 테스트"""
+        spill = SpillFile(str(tmp_path / 'spill.db'))
+        board = Leaderboard(windows={'1h': 3600}, k=3, spill=spill)
+        reference = Leaderboard(windows={'1h': 3600}, k=3)
+
+        for b in (board, reference):
+            b.ingest(tokens(50), ts=0)
+        board.evict(len(board))
+        assert len(board) == 0
+
+        # When: 가격 변화 후 다시 반영
+        moved = tokens(50, price=1.0)
+        moved[7]['price'] = 3.0
+        for b in (board, reference):
+            b.ingest(moved, ts=1800)
+
+        # Then: 디스크에서 불러온 기준 가격으로 같은 결과
+        assert board.top('1h') == reference.top('1h')
+        assert board.top('1h')['gainers'][0]['symbol'] == 'T7'
+        spill.close()
+
+    def test_monitor_state_reloads_window_history(self, tmp_path):
+        """모니터 구간 히스토리를 디스크로 옮겨도 알림이 나는지 테스트"""
+        spill = SpillFile(str(tmp_path / 'spill.db'))
+        state = MonitorState(spill=spill)
+        state.process(tokens(5), ts=0)
+        state.evict(5)
+
+        alerts = state.process(tokens(5, price=2.0), ts=1800)
+
+        assert len(alerts) == 5
+        spill.close()
+
+    def test_indicator_rows_restored_from_spill(self, tmp_path):
+        """지표 상태를 디스크로 옮긴 뒤 조회/갱신 시 복원되는지 테스트"""
+        spill = SpillFile(str(tmp_path / 'spill.db'))
+        engine = IndicatorEngine(spill=spill)
+        reference = IndicatorEngine()
+        for price in (1.0, 1.1, 1.2):
+            for e in (engine, reference):
+                e.update(tokens(20, price=price))
+        engine.update(tokens(5, price=1.3))
+        reference.update(tokens(5, price=1.3))
+
+        # When: 가장 오래 갱신되지 않은 15개 이동 (T5~T19)
+        assert engine.evict(15) == 15
+        assert len(engine) == 5
+        assert key('T4') in engine.index and key('T5') not in engine.index
+
+        # Then: 조회와 갱신 결과가 이동하지 않은 엔진과 같음
+        assert engine.values(key('T10')) == pytest.approx(reference.values(key('T10')))
+        for e in (engine, reference):
+            e.update(tokens(20, price=1.5))
+        assert engine.values(key('T15')) == pytest.approx(reference.values(key('T15')))
+        assert engine.values(key('T2')) == pytest.approx(reference.values(key('T2')))
+        spill.close()
+
+    def test_memory_api(self):
+        """메모리 사용량 API 테스트"""
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            response = client.get('/api/memory')
+
+        data = response.get_json()
+        assert data['success'] is True
+        assert {'leaderboard', 'chart_cache'} <= set(data['structures'])
+        assert data['limit_bytes'] > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+모니터 상태 체크포인트/WAL 복구 테스트 코드
+"""
+import os
+import pytest
+from unittest.mock import patch
+import auto_monitor
+import gmgn_scraper
+from monitor_state import MonitorState, StateStore
+from snapshot_diff import token_key
+
+
+def tokens(**prices):
+    return [{'symbol': s, 'price': p, 'volume_24h': 100.0} for s, p in prices.items()]
+
+
+class TestMonitorState:
+    """모니터 상태 테스트 클래스"""
+
+    def test_window_alert_requires_full_window(self):
+        """구간 히스토리가 채워진 뒤에만 알림이 나는지 테스트"""
+        state = MonitorState(window=1800, threshold=30)
+
+        assert state.process(tokens(A=1.0), ts=0) == []
+        assert state.process(tokens(A=2.0), ts=600) == []  # 구간 미확보
+
+        alerts = state.process(tokens(A=2.0), ts=1800)
+        assert len(alerts) == 1
+        assert 'A' in alerts[0]
+
+    def test_cooldown_suppresses_repeat_alerts(self):
+        """쿨다운 동안 같은 토큰의 반복 알림이 억제되는지 테스트"""
+        state = MonitorState(window=600, threshold=30, cooldown=1200)
+        state.process(tokens(A=1.0), ts=0)
+
+        assert len(state.process(tokens(A=2.0), ts=600)) == 1
+        assert state.process(tokens(A=3.0), ts=1200) == []
+        assert len(state.process(tokens(A=5.0), ts=1800)) == 1
+
+
+class TestStateStore:
+    """체크포인트 + WAL 저장소 테스트"""
+
+    @pytest.fixture
+    def directory(self, tmp_path):
+        return str(tmp_path / 'monitor')
+
+    def run(self, store, state, snapshots):
+        alerts = []
+        for ts, data in snapshots:
+            samples = store.log(data, ts)
+            alerts += state.apply_samples(samples, ts)
+        return alerts
+
+    def test_recover_from_checkpoint_and_wal(self, directory):
+        """체크포인트 + WAL 재생으로 동일한 상태가 복원되는지 테스트"""
+        store = StateStore(directory, fsync=False)
+        state = store.recover(window=1800)
+        self.run(store, state, [(0, tokens(A=1.0, B=1.0)), (600, tokens(A=1.1, B=1.0))])
+        store.checkpoint(state)
+        self.run(store, state, [(1200, tokens(A=1.2, B=0.9))])
+        store.close()
+
+        # When: 재시작
+        recovered = StateStore(directory, fsync=False).recover(window=1800)
+
+        # Then: 히스토리와 쿨다운이 모두 복원됨
+        assert recovered.replayed_entries == 1
+        assert {k: list(v) for k, v in recovered.history.items()} == \
+            {k: list(v) for k, v in state.history.items()}
+        assert recovered.cooldowns == state.cooldowns
+
+    def test_warm_restart_alerts_on_first_cycle(self, directory):
+        """재시작 직후 첫 주기부터 유효한 알림을 내는지 테스트"""
+        store = StateStore(directory, fsync=False)
+        state = store.recover(window=1800)
+        self.run(store, state, [(0, tokens(A=1.0)), (600, tokens(A=1.0)), (1200, tokens(A=1.0))])
+        store.checkpoint(state)
+        store.close()
+
+        warm = StateStore(directory, fsync=False).recover(window=1800)
+        cold = MonitorState(window=1800)
+
+        assert len(warm.process(tokens(A=2.0), ts=1800)) == 1
+        assert cold.process(tokens(A=2.0), ts=1800) == []
+        assert warm.metrics()['time_to_first_valid_alert'] is not None
+        assert cold.metrics()['time_to_first_valid_alert'] is None
+
+    def test_replayed_alerts_keep_cooldown(self, directory):
+        """WAL 재생 시 이미 보낸 알림의 쿨다운이 유지되는지 테스트"""
+        store = StateStore(directory, fsync=False)
+        state = store.recover(window=600, cooldown=3600)
+        alerts = self.run(store, state, [(0, tokens(A=1.0)), (600, tokens(A=2.0))])
+        assert len(alerts) == 1
+        store.close()
+
+        recovered = StateStore(directory, fsync=False).recover(window=600, cooldown=3600)
+
+        assert recovered.process(tokens(A=3.0), ts=1200) == []
+
+    def test_torn_wal_tail_is_ignored(self, directory):
+        """기록 도중 중단된 WAL 마지막 줄을 무시하는지 테스트"""
+        store = StateStore(directory, fsync=False)
+        state = store.recover()
+        self.run(store, state, [(0, tokens(A=1.0))])
+        store.close()
+        with open(os.path.join(directory, 'wal.log'), 'a', encoding='utf-8') as f:
+            f.write('{"seq": 2, "ts": 60, "sam')
+
+        recovered = StateStore(directory, fsync=False).recover()
+
+        assert recovered.replayed_entries == 1
+        assert recovered.last_price(token_key({'symbol': 'A'})) == 1.0
+
+    def test_checkpoint_truncates_wal(self, directory):
+        """체크포인트 후 WAL이 비워지는지 테스트"""
+        store = StateStore(directory, fsync=False)
+        state = store.recover()
+        self.run(store, state, [(0, tokens(A=1.0)), (60, tokens(A=1.0))])
+        store.checkpoint(state)
+
+        assert os.path.getsize(os.path.join(directory, 'wal.log')) == 0
+        assert StateStore(directory, fsync=False).recover().replayed_entries == 0
+
+
+class TestAutoMonitor:
+    """자동 모니터 주기 실행 테스트"""
+
+    def test_run_cycle_logs_and_updates_state(self, tmp_path):
+        """수집 결과가 WAL과 모니터 상태에 반영되는지 테스트"""
+        store = StateStore(str(tmp_path), fsync=False)
+        state = store.recover()
+        results = []
+
+        with patch('gmgn_scraper.save_data'), patch('builtins.print'):
+            collector = gmgn_scraper.create_pipeline(results=results).start()
+            auto_monitor.run_cycle(collector, results, state, store)
+            collector.stop()
+        store.close()
+
+        assert state.last_price(token_key({'symbol': 'PEPE'})) == 0.000012
+        assert StateStore(str(tmp_path), fsync=False).recover().replayed_entries == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
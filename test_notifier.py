@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+알림 발송기 테스트 코드 - 로컬 가짜 HTTP 수신 서버 사용
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from unittest.mock import MagicMock, patch
+import gmgn_scraper
+import notifier
+from notifier import NotificationDispatcher, WebhookChannel
+
+
+class FakeHTTPSink:
+    """테스트용 로컬 HTTP 수신 서버 - 받은 JSON 본문을 기록"""
+
+    def __init__(self, fail_first=0, delay=0.0):
+        self.received = []
+        self.requests_count = 0
+        self.fail_first = fail_first
+        self.delay = delay
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                if sink.delay:
+                    time.sleep(sink.delay)
+
+                with sink._lock:
+                    sink.requests_count += 1
+                    failing = sink.requests_count <= sink.fail_first
+                    if not failing:
+                        sink.received.append(json.loads(body or b'{}'))
+
+                self.send_response(500 if failing else 200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestNotificationDispatcher:
+    """알림 발송기 테스트 클래스"""
+
+    @pytest.fixture
+    def outbox_path(self, tmp_path):
+        return str(tmp_path / 'outbox.jsonl')
+
+    def test_alerts_are_batched_per_channel(self, outbox_path):
+        """짧은 시간 내 알림이 한 번에 묶여 전송되는지 테스트"""
+        with FakeHTTPSink() as sink:
+            # Given: 배치 창 0.2초 발송기
+            dispatcher = NotificationDispatcher([WebhookChannel(sink.url)], batch_window=0.2,
+                                                outbox_path=outbox_path).start()
+
+            # When: 알림 3개 제출
+            for i in range(3):
+                dispatcher.submit(f"alert {i}")
+            dispatcher.stop()
+
+            # Then: 한 번의 요청으로 3개 전송
+            assert len(sink.received) == 1
+            assert sink.received[0]['count'] == 3
+            assert dispatcher.metrics()['sent'] == 1
+
+    def test_failed_delivery_is_retried(self, outbox_path):
+        """전송 실패 시 백오프 후 재시도 테스트"""
+        with FakeHTTPSink(fail_first=2) as sink:
+            dispatcher = NotificationDispatcher([WebhookChannel(sink.url)], batch_window=0.01,
+                                                backoff_base=0.05, outbox_path=outbox_path).start()
+            dispatcher.submit("retry me")
+
+            assert wait_until(lambda: sink.received)
+            dispatcher.stop()
+
+            metrics = dispatcher.metrics()
+            assert metrics['failed'] == 2
+            assert metrics['sent'] == 1
+            assert metrics['outbox_size'] == 0
+
+    def test_outbox_is_persisted_and_recovered(self, outbox_path):
+        """미전송 배치가 outbox에 저장되고 재시작 시 전송되는지 테스트"""
+        # Given: 항상 실패하는 수신 서버
+        with FakeHTTPSink(fail_first=1000) as sink:
+            dispatcher = NotificationDispatcher([WebhookChannel(sink.url, name='hook')], batch_window=0.01,
+                                                backoff_base=60, outbox_path=outbox_path).start()
+            dispatcher.submit("persist me")
+            assert wait_until(lambda: dispatcher.metrics()['failed'] == 1)
+            dispatcher.stop(timeout=0.1)
+
+        with open(outbox_path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert records[0]['put']['alerts'][0]['message'] == "persist me"
+        assert records[-1]['retry'] == records[0]['put']['id']
+
+        # When: 정상 서버로 재시작
+        with FakeHTTPSink() as sink:
+            dispatcher = NotificationDispatcher([WebhookChannel(sink.url, name='hook')],
+                                                outbox_path=outbox_path)
+            for batch in dispatcher._outbox.values():
+                batch['next_attempt'] = 0.0
+            dispatcher.start()
+
+            # Then: 저장된 알림이 전송됨
+            assert wait_until(lambda: sink.received)
+            dispatcher.stop()
+            assert sink.received[0]['alerts'] == ["persist me"]
+
+    def test_outbox_is_appended_and_compacted(self, outbox_path, monkeypatch):
+        """전송마다 outbox 전체를 다시 쓰지 않고 기록을 덧붙이며, 쌓이면 남은 배치만 남기는지 테스트"""
+        monkeypatch.setattr(notifier, 'OUTBOX_COMPACT_MIN', 10)
+        replaced = []
+        real_replace = notifier.os.replace
+        monkeypatch.setattr(notifier.os, 'replace', lambda *args: (replaced.append(args), real_replace(*args)))
+
+        with FakeHTTPSink() as sink:
+            dispatcher = NotificationDispatcher([WebhookChannel(sink.url)], batch_window=0.0,
+                                                outbox_path=outbox_path).start()
+            for i in range(20):
+                dispatcher.submit(f"alert {i}")
+                assert wait_until(lambda: dispatcher.metrics()['sent'] == i + 1)
+            dispatcher.stop()
+
+        # Then: 배치 20개(기록 40줄)에 압축은 몇 번뿐이고, 파일에는 남은 배치 기록만
+        with open(outbox_path, encoding='utf-8') as f:
+            lines = f.readlines()
+        assert 1 <= len(replaced) <= 4
+        assert len(lines) <= 10
+        assert NotificationDispatcher([], outbox_path=outbox_path)._outbox == {}
+
+    def test_outbox_path_is_per_process(self):
+        """수집기/모니터 인스턴스마다 다른 outbox 파일을 쓰는지 테스트"""
+        paths = {notifier.outbox_path('scraper'), notifier.outbox_path('monitor'),
+                 notifier.outbox_path('monitor', 'a'), notifier.outbox_path('monitor', 'b')}
+
+        assert len(paths) == 4
+        assert all(path.endswith('.jsonl') for path in paths)
+
+    def test_submit_does_not_block_on_slow_endpoint(self, outbox_path):
+        """느린 수신 서버가 제출을 막지 않는지 테스트"""
+        with FakeHTTPSink(delay=0.5) as sink:
+            dispatcher = NotificationDispatcher([WebhookChannel(sink.url)], batch_window=0.01,
+                                                outbox_path=outbox_path).start()
+
+            start = time.time()
+            for i in range(100):
+                dispatcher.submit(f"alert {i}")
+            elapsed = time.time() - start
+
+            assert elapsed < 0.1
+            assert dispatcher.metrics()['queue_depth'] >= 0
+            dispatcher.stop()
+
+    def test_check_alerts_submits_to_dispatcher(self, outbox_path):
+        """check_alerts가 발송기 큐로 알림을 전달하는지 테스트"""
+        with FakeHTTPSink() as sink:
+            dispatcher = NotificationDispatcher([WebhookChannel(sink.url)], batch_window=0.01,
+                                                outbox_path=outbox_path).start()
+
+            alerts = gmgn_scraper.check_alerts([{'symbol': 'PUMP', 'change_24h': 50.0}], dispatcher)
+            dispatcher.stop()
+
+            assert sink.received[0]['alerts'] == alerts
+
+    def test_alert_is_dispatched_once_per_pump(self):
+        """같은 급등은 주기마다 다시 보내지 않고, 기준 아래로 내려갔다 다시 오르면 보내는지 테스트"""
+        dispatcher = MagicMock()
+        alerting = set()
+        pump = {'symbol': 'PUMP', 'chain': 'sol', 'address': 'P1', 'change_24h': 50.0}
+        calm = {'symbol': 'CALM', 'chain': 'sol', 'address': 'C1', 'change_24h': 5.0}
+
+        with patch('builtins.print'):
+            # Given: 첫 주기에 급등 알림
+            first = gmgn_scraper.check_alerts([pump, calm], dispatcher, alerting)
+            # When: 급등 상태가 이어지는 주기, 다른 대상 목록(토큰 없음)
+            repeated = gmgn_scraper.check_alerts([dict(pump, change_24h=60.0), calm], dispatcher, alerting)
+            other_target = gmgn_scraper.check_alerts([calm], dispatcher, alerting)
+            # 기준 아래로 내려갔다가 다시 급등
+            cooled = gmgn_scraper.check_alerts([dict(pump, change_24h=10.0)], dispatcher, alerting)
+            again = gmgn_scraper.check_alerts([dict(pump, change_24h=40.0)], dispatcher, alerting)
+
+        # Then
+        assert len(first) == 1 and repeated == [] and other_target == [] and cooled == []
+        assert again == ['🚀 급등 알림: PUMP (+40.0%)']
+        assert dispatcher.submit.call_count == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
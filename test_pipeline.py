@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+단계별 수집 파이프라인 테스트 코드
+"""
+import queue
+import threading
+import time
+import pytest
+from unittest.mock import patch
+import gmgn_scraper
+from pipeline import Pipeline, Stage
+
+
+class TestPipeline:
+    """파이프라인 테스트 클래스"""
+
+    def test_items_flow_through_all_stages(self):
+        """모든 단계를 순서대로 통과하는지 테스트"""
+        results = []
+        pipeline = Pipeline([
+            Stage('double', lambda x: x * 2),
+            Stage('inc', lambda x: x + 1),
+            Stage('collect', results.append),
+        ]).start()
+
+        for i in range(5):
+            pipeline.submit(i)
+        pipeline.stop()
+
+        assert sorted(results) == [1, 3, 5, 7, 9]
+        assert pipeline.stats()['double']['processed'] == 5
+
+    def test_throughput_limited_by_slowest_stage(self):
+        """처리 시간이 단계 합이 아니라 가장 느린 단계에 의해 결정되는지 테스트"""
+        def slow(x):
+            time.sleep(0.05)
+            return x
+
+        # Given: 각 0.05초 걸리는 3단계 (순차 실행 시 10개 × 0.15초 = 1.5초)
+        pipeline = Pipeline([Stage('a', slow), Stage('b', slow), Stage('c', slow)]).start()
+
+        # When: 10개 처리
+        start = time.perf_counter()
+        for i in range(10):
+            pipeline.submit(i)
+        pipeline.stop()
+        elapsed = time.perf_counter() - start
+
+        # Then: 약 10 × 0.05 + 0.1초
+        assert elapsed < 1.0
+
+    def test_bounded_queue_applies_backpressure(self):
+        """다음 단계가 막히면 투입이 대기하는지 테스트"""
+        release = threading.Event()
+        pipeline = Pipeline([
+            Stage('fast', lambda x: x, queue_size=1),
+            Stage('blocked', lambda x: release.wait(), queue_size=1),
+        ]).start()
+
+        # 막힌 단계 1개 처리 중 + 큐 1개 + fast 처리 중 1개 + fast 큐 1개 이후에는 가득 참
+        with pytest.raises(queue.Full):
+            for i in range(10):
+                pipeline.submit(i, timeout=0.1)
+
+        release.set()
+        pipeline.stop()
+
+    def test_stage_errors_are_counted_and_skipped(self):
+        """단계 오류가 집계되고 나머지 작업은 계속되는지 테스트"""
+        results = []
+
+        def fail_on_odd(x):
+            if x % 2:
+                raise ValueError("odd")
+            return x
+
+        pipeline = Pipeline([Stage('check', fail_on_odd), Stage('collect', results.append)]).start()
+        with patch('builtins.print'):
+            for i in range(4):
+                pipeline.submit(i)
+            pipeline.stop()
+
+        assert sorted(results) == [0, 2]
+        assert pipeline.stats()['check']['errors'] == 2
+
+
+class TestCollectPipeline:
+    """스크래퍼 수집 파이프라인 테스트"""
+
+    def test_create_pipeline_runs_fetch_to_evaluate(self):
+        """fetch → parse → enrich → persist → evaluate 단계 실행 테스트"""
+        results = []
+        with patch('gmgn_scraper.save_data') as mock_save, patch('builtins.print'):
+            collector = gmgn_scraper.create_pipeline(results=results).start()
+            collector.submit(('sol', 'home'))
+            collector.stop()
+
+        assert mock_save.called
+        data, alerts = results[0]
+        assert len(data) == 3
+        assert len(alerts) == 2
+        assert set(collector.stats()) == {'fetch', 'parse', 'enrich', 'persist', 'evaluate'}
+        assert 'holders' in data[0]
+
+    def test_targets_are_merged_into_one_snapshot(self):
+        """여러 대상을 수집해도 최신 스냅샷에 모든 대상의 토큰이 남는지 테스트"""
+        results = []
+        with patch('gmgn_scraper.save_data') as mock_save, patch('builtins.print'):
+            collector = gmgn_scraper.create_pipeline(results=results).start()
+            for target in (('sol', 'home'), ('eth', 'home'), ('sol', 'home')):
+                collector.submit(target)
+            collector.stop()
+
+        # Then: 마지막 저장은 대상별 최근 결과를 합친 것 (같은 대상의 재수집은 교체)
+        saved = mock_save.call_args_list[-1][0][0]
+        assert mock_save.call_count == 3
+        assert len(saved) == 6
+        assert {token['chain'] for token in saved} == {'sol', 'eth'}
+        assert [len(data) for data, _ in results] == [3, 3, 3]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
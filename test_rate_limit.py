@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+웹 API 속도 제한/과부하 차단 및 헬스체크 테스트 코드
+"""
+import pytest
+from unittest.mock import patch
+import storage
+from rate_limit import RateLimiter, client_id, request_priority
+from snapshot_diff import SnapshotTracker
+from web_app import app
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter:
+    """클라이언트별 토큰 버킷/우선순위 차단 테스트 클래스"""
+
+    def test_bucket_limits_each_client(self):
+        """버킷을 다 쓰면 Retry-After와 함께 거절하고, 다른 클라이언트는 영향 없는지 테스트"""
+        clock = FakeClock()
+        limiter = RateLimiter(rate=2, burst=3, clock=clock)
+
+        # Given: 버스트 3개 소진 (요청마다 바로 종료)
+        for _ in range(3):
+            assert limiter.admit('bot', 'normal')[0]
+            limiter.release()
+
+        # Then
+        assert limiter.admit('bot', 'normal') == (False, 1, 'rate_limited')
+        assert limiter.admit('user', 'high')[0]
+        clock.now = 0.5
+        assert limiter.admit('bot', 'normal')[0]
+        assert limiter.stats()['rate_limited'] == 1
+
+    def test_low_priority_costs_more(self):
+        """무거운 요청(수동 수집 등)은 버킷을 더 많이 쓰는지 테스트"""
+        limiter = RateLimiter(rate=1, burst=10, clock=FakeClock())
+
+        assert limiter.admit('bot', 'low')[0]
+        allowed, retry_after, _ = limiter.admit('bot', 'low')
+
+        assert not allowed and retry_after == 10
+
+    def test_overload_sheds_low_priority_first(self):
+        """처리 중 요청이 많으면 낮은 우선순위부터 차단하고, 차단은 버킷을 쓰지 않는지 테스트"""
+        limiter = RateLimiter(rate=1, burst=100, max_inflight=4, clock=FakeClock())
+
+        # Given: 처리 중 2개 (한도의 50%)
+        limiter.admit('a', 'normal')
+        limiter.admit('b', 'normal')
+
+        assert limiter.admit('bot', 'low') == (False, 1, 'shed')
+        assert limiter.admit('user', 'normal')[0]                 # 3/4
+        assert limiter.admit('user', 'normal')[2] == 'shed'      # 75% 도달
+        assert limiter.admit('user', 'high')[0]                   # 대시보드는 한도까지 허용
+        assert limiter.admit('user', 'high')[2] == 'shed'
+        assert limiter.admit('sse', 'stream')[0]                  # 스트림은 처리 중 수에 포함 안 됨
+        assert limiter.in_flight == 4
+
+        for _ in range(3):
+            limiter.release()
+        assert limiter.admit('bot', 'low')[0]
+        assert limiter.stats()['shed'] == 3
+
+    def test_client_table_is_bounded(self):
+        """보관하는 클라이언트 수가 제한되는지 테스트"""
+        limiter = RateLimiter(max_clients=2, clock=FakeClock())
+        for client in ('a', 'b', 'c'):
+            limiter.admit(client, 'high')
+
+        assert len(limiter) == 2
+
+    def test_request_priority(self):
+        """경로별 우선순위 분류 테스트"""
+        assert request_priority('GET', '/healthz', {}) is None
+        assert request_priority('GET', '/', {}) == 'high'
+        assert request_priority('GET', '/api/tokens', {'since': '3'}, lambda since: since == 3) == 'high'
+        assert request_priority('GET', '/api/tokens', {}) == 'low'
+        assert request_priority('POST', '/api/update', {}) == 'low'
+        assert request_priority('GET', '/api/search', {'q': 'pe'}) == 'normal'
+        assert request_priority('GET', '/api/subscriptions/1/stream', {}) == 'stream'
+        assert client_id('10.0.0.1', '1.2.3.4') == '10.0.0.1'
+
+    def test_stale_since_costs_a_full_snapshot(self):
+        """변경분 범위를 벗어난 since(전체 스냅샷 응답)는 since 없는 요청과 같은 우선순위인지 테스트"""
+        tracker = SnapshotTracker(epoch=100, history_size=2)
+        for i in range(4):
+            tracker.publish([{'symbol': 'AAA', 'price': 1.0 + i}])
+
+        def priority(since):
+            return request_priority('GET', '/api/tokens', {'since': since}, tracker.covers)
+
+        assert priority(str(tracker.version)) == 'high'
+        assert priority(str(tracker.version - 2)) == 'high'
+        assert priority('0') == 'low'
+        assert priority(str(tracker.version - 3)) == 'low'
+        assert priority(str(tracker.version + 1)) == 'low'
+        assert priority('abc') == 'low'
+
+
+class TestRateLimitedApp:
+    """웹 앱 429 응답/헬스체크 테스트"""
+
+    @pytest.fixture
+    def client(self):
+        app.config['TESTING'] = True
+        limiter = RateLimiter(rate=0.5, burst=2)
+        with patch.dict(app.config, {'RATE_LIMIT_ENABLED': True}), \
+                patch('web_app.rate_limiter', limiter), \
+                patch('web_app.load_latest_data', return_value=[]), app.test_client() as client:
+            yield client, limiter
+
+    def test_api_returns_429_with_retry_after(self, client):
+        """한도를 넘은 요청은 429 + Retry-After, 헬스체크는 제한하지 않는지 테스트"""
+        client, limiter = client
+        assert client.get('/api/leaderboard').status_code == 200
+        assert client.get('/api/leaderboard').status_code == 200
+
+        response = client.get('/api/leaderboard')
+
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+        assert response.get_json()['success'] is False
+        assert client.get('/healthz').status_code == 200
+        assert limiter.in_flight == 0
+
+    def test_healthz_reports_snapshot_age(self, client, tmp_path):
+        """헬스체크가 토큰을 읽지 않고 최신 스냅샷 나이를 알려 주는지 테스트"""
+        client, _ = client
+        db_path = str(tmp_path / 'gmgn.db')
+        with patch.object(storage, 'STORAGE_BACKEND', 'sqlite'), patch.object(storage, 'DB_PATH', db_path), \
+                patch('time.time', return_value=1000.0):
+            empty = client.get('/healthz').get_json()
+            storage.save_snapshot([{'symbol': 'AAA', 'price': 1.0}], db_path, ts=940.0)
+            with patch('web_app.load_latest_data') as load:
+                body = client.get('/healthz').get_json()
+        storage.close_connections()
+
+        assert empty['snapshot_age'] is None and empty['stale'] is True
+        assert body['status'] == 'ok'
+        assert body['snapshot_age'] == 60.0
+        assert body['stale'] is False
+        load.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+알림 규칙 백테스트 테스트 코드
+"""
+import json
+import os
+from datetime import datetime
+import numpy as np
+import pytest
+from unittest.mock import patch
+import replay
+import storage
+
+
+def write_archive(directory, snapshots):
+    """(ts, tokens) 목록을 gmgn_data_*.json 파일로 저장"""
+    for ts, tokens in snapshots:
+        stamp = datetime.fromtimestamp(ts).strftime('%Y%m%d_%H%M%S_%f')[:-3]
+        with open(os.path.join(directory, f"gmgn_data_{stamp}.json"), 'w', encoding='utf-8') as f:
+            json.dump(tokens, f)
+
+
+def make_snapshots():
+    """1분 간격 스냅샷 - UP은 급등 후 계속 상승, DOWN은 급등 후 하락"""
+    base = datetime(2024, 1, 1).timestamp()
+    snapshots = []
+    for minute in range(240):
+        up_change = 40.0 if minute >= 60 else 0.0
+        down_change = 40.0 if 60 <= minute < 120 else 0.0
+        snapshots.append((base + minute * 60, [
+            {'symbol': 'UP', 'price': 1.0 + minute * 0.01, 'change_24h': up_change},
+            {'symbol': 'DOWN', 'price': 2.0 - max(0, minute - 60) * 0.01, 'change_24h': down_change},
+        ]))
+    return snapshots
+
+
+class TestReplay:
+    """백테스트 테스트 클래스"""
+
+    def test_rule_precision_from_json_archive(self, tmp_path):
+        """JSON 아카이브에서 규칙별 정밀도 계산 테스트"""
+        write_archive(str(tmp_path), make_snapshots())
+        rules = {'change_24h>30': ('change_24h', 30.0)}
+
+        stats = replay.run_replay(horizon=1800, rules=rules, workers=1, chunks=5, directory=str(tmp_path))
+
+        # 두 토큰 모두 60분에 한 번씩 알림 (구간 분할과 무관하게 중복 없음)
+        counts = stats['change_24h>30']
+        assert counts['alerts'] == 2
+        assert counts['evaluated'] == 2
+        assert counts['precision'] == pytest.approx(0.5)
+
+    def test_parallel_matches_single_process(self, tmp_path):
+        """여러 프로세스로 나눠도 결과가 같은지 테스트"""
+        write_archive(str(tmp_path), make_snapshots())
+
+        single = replay.run_replay(horizon=1800, workers=1, chunks=1, directory=str(tmp_path))
+        parallel = replay.run_replay(horizon=1800, workers=2, chunks=7, directory=str(tmp_path))
+
+        assert parallel == single
+
+    def test_window_rule(self):
+        """구간 상승률 규칙 행렬 계산 테스트"""
+        import numpy as np
+        times = np.array([0.0, 600.0, 1200.0, 1800.0])
+        price = np.array([[1.0], [1.0], [1.1], [1.5]])
+
+        mask = replay.rule_mask(('window', 1800, 30.0), times, price, None)
+
+        assert mask[:, 0].tolist() == [False, False, False, True]
+
+    def test_sqlite_backend_matches_json(self, tmp_path):
+        """SQLite 저장소와 JSON 아카이브 결과가 같은지 테스트"""
+        snapshots = make_snapshots()
+        write_archive(str(tmp_path), snapshots)
+        db_path = str(tmp_path / 'gmgn.db')
+        for ts, tokens in snapshots:
+            storage.save_snapshot(tokens, db_path=db_path, ts=ts)
+
+        from_json = replay.run_replay(horizon=1800, workers=1, directory=str(tmp_path))
+        with patch.object(storage, 'STORAGE_BACKEND', 'sqlite'), patch.object(storage, 'DB_PATH', db_path):
+            from_db = replay.run_replay(horizon=1800, workers=1)
+        storage.close_connections()
+
+        assert from_db == from_json
+
+    def test_null_token_rows_are_skipped(self):
+        """token_id가 NULL인 행이 다른 토큰 열에 쓰이지 않는지 테스트"""
+        rows = [(100.0, 1, 1.0, 0.0), (100.0, 2, 5.0, 0.0), (160.0, None, 99.0, 50.0), (160.0, 2, 6.0, 1.0)]
+
+        with patch.object(storage, 'load_price_rows', return_value=rows):
+            times, keys, price, change = replay._load_matrix_db(None, None)
+
+        assert list(times) == [100.0, 160.0]
+        assert keys == [1, 2]
+        assert np.isnan(price[1, 0])
+        assert list(price[:, 1]) == [5.0, 6.0]
+        assert list(change[:, 1]) == [0.0, 1.0]
+
+    def test_parse_rule(self):
+        """규칙 문자열 파싱 테스트"""
+        assert replay.parse_rule('change_24h>25') == ('change_24h>25', ('change_24h', 25.0))
+        assert replay.parse_rule('window_15m>=40') == ('window_15m>=40', ('window', 900, 40.0))
+        with pytest.raises(ValueError):
+            replay.parse_rule('volume>1')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
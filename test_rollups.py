@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+다중 해상도 롤업 테스트 코드
+"""
+import pytest
+from unittest.mock import patch
+import storage
+from rollups import pick_resolution
+from snapshot_diff import token_key
+from web_app import app
+
+PEPE = token_key({'symbol': 'PEPE'})
+
+
+def token(price, symbol='PEPE', volume=100.0, market_cap=1000.0):
+    return {'symbol': symbol, 'name': symbol, 'price': price, 'change_24h': 0.0,
+            'market_cap': market_cap, 'volume_24h': volume}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'gmgn.db')
+    yield path
+    storage.close_connections()
+
+
+class TestRollups:
+    """롤업 테스트 클래스"""
+
+    def test_snapshots_update_ohlc_buckets(self, db_path):
+        """스냅샷 저장 시 구간 OHLC/거래량/시가총액/샘플 수 갱신 테스트"""
+        for ts, price in [(3600, 2.0), (3620, 5.0), (3640, 1.0), (3700, 3.0)]:
+            storage.save_snapshot([token(price, volume=price * 10, market_cap=price * 100)], db_path, ts=ts)
+
+        minutes = storage.load_rollup_history(PEPE, '1m', db_path=db_path)
+        hour = storage.load_rollup_history(PEPE, '1h', db_path=db_path)
+
+        assert [(r['ts'], r['open'], r['high'], r['low'], r['price'], r['samples']) for r in minutes] == [
+            (3600, 2.0, 5.0, 1.0, 1.0, 3), (3660, 3.0, 3.0, 3.0, 3.0, 1)]
+        assert hour == [{'ts': 3600, 'open': 2.0, 'high': 5.0, 'low': 1.0, 'price': 3.0,
+                         'volume_24h': 30.0, 'market_cap': 300.0, 'samples': 4}]
+
+    def test_out_of_order_snapshots(self, db_path):
+        """늦게 도착한 스냅샷은 open/close를 시각 기준으로 반영하는지 테스트"""
+        # Given: 7200~7300 구간의 마지막 스냅샷이 먼저 저장
+        storage.save_snapshot([token(4.0, volume=40.0)], db_path, ts=7300)
+        storage.save_snapshot([token(9.0, volume=90.0)], db_path, ts=7250)
+        storage.save_snapshot([token(1.0, volume=10.0)], db_path, ts=7210)
+
+        (bucket,) = storage.load_rollup_history(PEPE, '1h', db_path=db_path)
+
+        # Then: open은 가장 이른 샘플, close/거래량은 가장 늦은 샘플
+        assert (bucket['open'], bucket['high'], bucket['low'], bucket['price']) == (1.0, 9.0, 1.0, 4.0)
+        assert bucket['volume_24h'] == 40.0
+        assert bucket['samples'] == 3
+
+    def test_coarse_range_reads_few_rows(self, db_path):
+        """긴 기간은 원본 대신 적은 수의 구간 행을 읽는지 테스트"""
+        # Given: 2일 동안 3분 간격 스냅샷 960개
+        for n in range(960):
+            storage.save_snapshot([token(1.0 + n % 7)], db_path, ts=86400 + n * 180)
+
+        assert len(storage.load_history(PEPE, db_path=db_path)) == 960
+        hourly = storage.load_rollup_history(PEPE, '1h', start=86400, db_path=db_path)
+        assert len(hourly) == 48
+        assert sum(r['samples'] for r in hourly) == 960
+        assert len(storage.load_rollup_history(PEPE, '1d', db_path=db_path)) == 2
+
+        assert pick_resolution(3600) == '1m'
+        assert pick_resolution(86400) == '5m'
+        assert pick_resolution(7 * 86400) == '1h'
+        assert pick_resolution(3650 * 86400) == '1d'
+
+    def test_existing_snapshots_are_backfilled_once(self, db_path):
+        """롤업 도입 전 저장된 스냅샷이 한 번만 롤업으로 생성되는지 테스트"""
+        storage.save_snapshot([token(1.0)], db_path, ts=60)
+        storage.save_snapshot([token(2.0)], db_path, ts=90)
+        storage.get_connection(db_path).execute("DELETE FROM rollups").connection.commit()
+        storage.close_connections()
+
+        # When: 다시 연결 (두 번)
+        storage.get_connection(db_path)
+        storage.close_connections()
+        (bucket,) = storage.load_rollup_history(PEPE, '1m', db_path=db_path)
+
+        assert (bucket['open'], bucket['price'], bucket['samples']) == (1.0, 2.0, 2)
+
+    def test_rollups_api(self, db_path):
+        """롤업 API 및 차트의 롤업 사용 테스트"""
+        storage.save_snapshot([token(1.0), token(5.0, symbol='DOGE')], db_path, ts=3600)
+        storage.save_snapshot([token(2.0)], db_path, ts=3660)
+        app.config['TESTING'] = True
+
+        with patch.object(storage, 'STORAGE_BACKEND', 'sqlite'), patch.object(storage, 'DB_PATH', db_path), \
+                app.test_client() as client:
+            response = client.get('/api/rollups/PEPE?resolution=1h&start=0')
+            bad = client.get('/api/rollups/PEPE?resolution=2h')
+            chart = client.get('/api/chart/PEPE?range=7d').get_json()
+
+        body = response.get_json()
+        assert body['count'] == 1
+        assert (body['rows'][0]['open'], body['rows'][0]['price']) == (1.0, 2.0)
+        assert bad.status_code == 400
+        assert chart['resolution'] == '1h'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+토큰 검색 인덱스 테스트 코드
+"""
+import json
+import pytest
+from unittest.mock import patch
+from search import SearchIndex, edit_distance
+from web_app import app
+
+
+def make_index():
+    index = SearchIndex()
+    index.add([
+        {'symbol': 'PEPE', 'name': 'Pepe Token', 'address': 'PePeAddr111', 'market_cap': 5e6},
+        {'symbol': 'PEPE2', 'name': 'Pepe Two', 'market_cap': 1e6},
+        {'symbol': 'DOGE', 'name': 'Dogecoin Style', 'market_cap': 1e7},
+        {'symbol': 'MOON', 'name': 'Moon Token', 'address': 'MoonAddr999', 'market_cap': 2.5e7},
+    ])
+    return index
+
+
+class TestSearchIndex:
+    """검색 인덱스 테스트 클래스"""
+
+    def test_prefix_ranks_exact_symbol_first(self):
+        """정확히 일치하는 심볼이 먼저 나오는지 테스트"""
+        results = make_index().search('pepe')
+
+        assert [r['symbol'] for r in results] == ['PEPE', 'PEPE2']
+        assert results[0]['matched'] == 'symbol'
+        assert results[0]['score'] > results[1]['score']
+
+    def test_name_word_and_address_prefix(self):
+        """이름 단어와 컨트랙트 주소 접두사 검색 테스트"""
+        index = make_index()
+
+        # Then: 'token' 단어가 있는 토큰은 시가총액 순
+        assert [r['symbol'] for r in index.search('token')] == ['MOON', 'PEPE']
+        assert index.search('moonaddr')[0]['matched'] == 'address'
+
+    def test_fuzzy_match_tolerates_typos(self):
+        """오타 허용 검색 테스트"""
+        index = make_index()
+
+        assert index.search('dgoe')[0]['symbol'] == 'DOGE'
+        assert index.search('dogecion')[0]['symbol'] == 'DOGE'
+        assert index.search('xyzzy') == []
+
+    def test_incremental_update_replaces_old_terms(self):
+        """이름이 바뀐 토큰만 다시 인덱싱하는지 테스트"""
+        index = make_index()
+
+        # When: 같은 스냅샷 재반영 → 인덱싱 없음, 이름 변경 → 1개만 인덱싱
+        assert index.add([{'symbol': 'DOGE', 'name': 'Dogecoin Style', 'market_cap': 1e7}]) == 0
+        assert index.add([{'symbol': 'DOGE', 'name': 'Shiba Friend', 'market_cap': 1e7}]) == 1
+
+        # Then: 예전 이름으로는 찾을 수 없음
+        assert index.search('shiba')[0]['symbol'] == 'DOGE'
+        assert index.search('dogecoin') == []
+        assert len(index) == 4
+
+    def test_sync_removes_tokens_left_the_snapshot(self):
+        """스냅샷에서 사라진 토큰을 지우고, 지운 자리를 새 토큰이 재사용하는지 테스트"""
+        index = make_index()
+        terms = index.stats()['terms']
+
+        # When: MOON이 빠지고 SUN이 들어온 스냅샷
+        removed = index.sync([
+            {'symbol': 'PEPE', 'name': 'Pepe Token', 'address': 'PePeAddr111', 'market_cap': 5e6},
+            {'symbol': 'PEPE2', 'name': 'Pepe Two', 'market_cap': 1e6},
+            {'symbol': 'DOGE', 'name': 'Dogecoin Style', 'market_cap': 1e7},
+            {'symbol': 'SUN', 'name': 'Sun', 'market_cap': 3e7},
+        ])
+
+        # Then: MOON 검색어와 3-gram이 남지 않고 문서 수는 그대로
+        assert removed == 1
+        assert index.search('moon') == [] and index.search('moonaddr') == []
+        assert [r['symbol'] for r in index.search('token')] == ['PEPE']
+        assert index.search('sun')[0]['symbol'] == 'SUN'
+        assert len(index) == len(index.docs) == 4
+        assert index.stats()['terms'] < terms
+        assert all(terms for terms in index._grams.values())
+        assert not any(gram in index._grams for gram in ('^mo', 'oon'))
+
+    def test_edit_distance_limit(self):
+        """편집 거리 계산 테스트"""
+        assert edit_distance('pepe', 'pepe', 1) == 0
+        assert edit_distance('pepe', 'ppe', 1) == 1
+        assert edit_distance('kitten', 'sitting', 2) == 3  # limit 초과 → limit + 1
+
+    def test_search_api(self):
+        """검색 API 테스트"""
+        app.config['TESTING'] = True
+        tokens = [{'symbol': 'PEPE', 'name': 'Pepe', 'price': 1.0, 'change_24h': 0.0}]
+        with app.test_client() as client, patch('web_app.load_latest_data', return_value=tokens):
+            response = client.get('/api/search?q=pep')
+            empty = client.get('/api/search?q=')
+
+        data = response.get_json()
+        assert data['success'] is True
+        assert data['results'][0]['symbol'] == 'PEPE'
+        assert 'took_ms' in data
+        assert empty.get_json()['results'] == []
+
+    def test_search_does_not_reload_unchanged_snapshot(self):
+        """스냅샷이 그대로면 검색 요청이 latest.json을 다시 읽거나 정규화하지 않는지 테스트"""
+        tokens = [{'symbol': f'S{i}', 'name': f'Search {i}', 'price': 1.0, 'change_24h': 0.0,
+                   'address': f'Addr{i}'} for i in range(2000)]
+        with open('latest.json', 'w', encoding='utf-8') as f:
+            json.dump(tokens, f)
+        app.config['TESTING'] = True
+
+        with app.test_client() as client:
+            assert client.get('/api/search?q=S1999').get_json()['results'][0]['symbol'] == 'S1999'
+
+            # When: 같은 스냅샷에서 반복 검색
+            with patch('web_app.load_latest_data') as load, patch('web_app.normalize') as normalize, \
+                    patch('builtins.open', side_effect=AssertionError("latest.json을 다시 읽음")):
+                results = [client.get(f'/api/search?q=S{i}').get_json() for i in range(0, 2000, 20)]
+
+        # Then
+        load.assert_not_called()
+        normalize.assert_not_called()
+        assert all(r['results'][0]['symbol'] == f'S{i}' for r, i in zip(results, range(0, 2000, 20)))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+스냅샷 변경분 계산 테스트 코드
+"""
+import pytest
+from snapshot_diff import SnapshotTracker, compute_delta, token_key
+
+
+def key(symbol):
+    return token_key({'symbol': symbol})
+
+
+def make_token(symbol, price, change=0.0):
+    return {'symbol': symbol, 'name': symbol, 'price': price, 'change_24h': change,
+            'market_cap': 1000, 'volume_24h': 100}
+
+
+class TestComputeDelta:
+    """변경분 계산 테스트"""
+
+    def test_detects_added_removed_changed_and_moved(self):
+        """추가/삭제/필드 변경/순위 이동 감지 테스트"""
+        # Given: 이전 스냅샷 A, B, C
+        old = [make_token('A', 1.0), make_token('B', 2.0), make_token('C', 3.0)]
+        _, old_map, old_ranks = compute_delta({}, {}, old)
+
+        # When: B 가격 변경, C 삭제, D 추가, 순서 변경
+        new = [make_token('B', 2.5), make_token('A', 1.0), make_token('D', 4.0)]
+        delta, _, _ = compute_delta(old_map, old_ranks, new)
+
+        # Then: 변경분이 정확히 계산됨
+        assert [t['symbol'] for t in delta['added']] == ['D']
+        assert delta['removed'] == [key('C')]
+        assert delta['changed'] == [{'key': key('B'), 'fields': {'price': 2.5}}]
+        assert {m['key'] for m in delta['moved']} == {key('A'), key('B')}
+
+
+class TestSnapshotTracker:
+    """스냅샷 버전 관리 테스트"""
+
+    def test_version_increments_only_on_change(self):
+        """변경이 있을 때만 버전 증가 테스트"""
+        tracker = SnapshotTracker(epoch=0)
+        tokens = [make_token('A', 1.0)]
+
+        assert tracker.publish(tokens) == 1
+        assert tracker.publish([dict(t) for t in tokens]) == 1
+        assert tracker.publish([make_token('A', 1.1)]) == 2
+
+    def test_changes_since_returns_deltas(self):
+        """since 이후 변경분만 반환 테스트"""
+        tracker = SnapshotTracker(epoch=0)
+        tracker.publish([make_token('A', 1.0)])
+        tracker.publish([make_token('A', 1.1)])
+        tracker.publish([make_token('A', 1.2)])
+
+        deltas = tracker.changes_since(1)
+
+        assert [d['version'] for d in deltas] == [2, 3]
+        assert tracker.changes_since(3) == []
+
+    def test_too_old_version_requires_resync(self):
+        """보관 범위를 벗어난 버전은 전체 재동기화 테스트"""
+        tracker = SnapshotTracker(history_size=2, epoch=0)
+        for i in range(5):
+            tracker.publish([make_token('A', 1.0 + i)])
+
+        assert tracker.changes_since(1) is None
+        assert tracker.changes_since(99) is None
+        assert [d['version'] for d in tracker.changes_since(3)] == [4, 5]
+
+    def test_version_from_another_process_requires_resync(self):
+        """재시작 전 프로세스의 버전으로 요청하면 전체 재동기화 테스트"""
+        # Given: 이전 프로세스에서 버전 40까지 받은 클라이언트
+        old = SnapshotTracker(epoch=0)
+        for i in range(40):
+            old.publish([make_token('A', 1.0 + i)])
+
+        # When: 재시작한 프로세스에 같은 since로 요청
+        tracker = SnapshotTracker()
+        tracker.publish([make_token('A', 1.0)])
+
+        # Then: 새 버전은 이전 번호와 겹치지 않고, 이전 since는 변경분이 아닌 재동기화
+        assert tracker.epoch > old.version
+        assert tracker.changes_since(old.version) is None
+        assert tracker.changes_since(tracker.epoch) == tracker.changes_since(tracker.version - 1)
+        assert tracker.changes_since(tracker.version) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
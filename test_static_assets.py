@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+정적 파일 지문/사전 압축 테스트 코드
+"""
+import gzip
+import pytest
+import static_assets
+from static_assets import StaticAssets, IMMUTABLE_CACHE
+from web_app import app, assets
+
+SCRIPT = ("function refresh() { return fetch('/api/tokens'); }\n" * 40).encode()
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    (tmp_path / 'app.js').write_bytes(SCRIPT)
+    (tmp_path / 'tiny.css').write_bytes(b'a{}')
+    return StaticAssets(str(tmp_path))
+
+
+class TestStaticAssets:
+    """지문 이름/인코딩 선택 테스트 클래스"""
+
+    def test_fingerprint_follows_content(self, bundle, tmp_path):
+        """내용이 바뀔 때만 지문 이름이 바뀌는지 테스트"""
+        url = bundle.url('app.js')
+        assert url.startswith('/static/app.') and url.endswith('.js')
+        assert StaticAssets(str(tmp_path)).url('app.js') == url
+
+        (tmp_path / 'app.js').write_bytes(SCRIPT + b'// v2\n')
+        assert StaticAssets(str(tmp_path)).url('app.js') != url
+
+    def test_picks_smallest_accepted_encoding(self, bundle):
+        """클라이언트가 받는 압축본 중 가장 작은 것을 고르는지 테스트"""
+        name = bundle.url('app.js').rsplit('/', 1)[1]
+
+        body, encoding, entry = bundle.get(name, 'gzip, deflate, br')
+        assert encoding == ('br' if static_assets.brotli else 'gzip')
+        assert entry['content_type'].endswith('charset=utf-8')
+
+        assert bundle.get(name, 'gzip;q=0, deflate')[1] == 'identity'
+        assert bundle.get(name)[0] == SCRIPT
+        assert gzip.decompress(bundle.get(name, 'gzip')[0]) == SCRIPT
+        assert bundle.get('app.0000000000.js') is None
+
+    def test_tiny_files_are_not_compressed(self, bundle):
+        """압축 이득이 없는 작은 파일은 원본만 두는지 테스트"""
+        name = bundle.url('tiny.css').rsplit('/', 1)[1]
+        assert bundle.sizes()[name] == {'identity': 3}
+
+
+class TestStaticRoutes:
+    """대시보드/정적 파일 경로 테스트"""
+
+    @pytest.fixture
+    def client(self):
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+
+    def test_dashboard_references_fingerprinted_assets(self, client):
+        """HTML에는 지문 URL만 있고 CSS/JS 본문은 없는지 테스트"""
+        html = client.get('/').get_data(as_text=True)
+
+        assert assets.url('dashboard.css') in html
+        assert assets.url('dashboard.js') in html
+        assert 'ROW_HEIGHT' not in html and 'font-family' not in html
+
+    def test_asset_is_immutable_and_compressed(self, client):
+        """정적 파일 응답의 캐시/압축 헤더와 조건부 요청 테스트"""
+        url = assets.url('dashboard.js')
+
+        response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == IMMUTABLE_CACHE
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert b'ROW_HEIGHT' in gzip.decompress(response.data)
+
+        again = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+        assert again.status_code == 304
+        assert client.get('/static/dashboard.js').status_code == 404
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+SQLite 저장소 테스트 코드
+"""
+import json
+from datetime import datetime
+import pytest
+from unittest.mock import patch
+import storage
+import gmgn_scraper
+from snapshot_diff import token_key
+
+
+class TestStorage:
+    """SQLite 저장소 테스트 클래스"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """임시 DB 경로"""
+        path = str(tmp_path / 'gmgn.db')
+        yield path
+        storage.close_connections()
+
+    @pytest.fixture
+    def sample_data(self):
+        """테스트용 샘플 데이터"""
+        return [
+            {'symbol': 'AAA', 'name': 'A Token', 'price': 1.0, 'change_24h': 40.0,
+             'market_cap': 1000, 'volume_24h': 100, 'timestamp': '2024-01-01T12:00:00'},
+            {'symbol': 'BBB', 'name': 'B Token', 'price': 2.0, 'change_24h': -5.0,
+             'market_cap': 2000, 'volume_24h': 200, 'timestamp': '2024-01-01T12:00:00',
+             'chain': 'sol'},
+        ]
+
+    def test_connection_uses_wal_mode(self, db_path):
+        """WAL 모드 설정 테스트"""
+        conn = storage.get_connection(db_path)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == 'wal'
+
+    def test_indexes_exist(self, db_path):
+        """(symbol, ts), (ts) 인덱스 존재 테스트"""
+        conn = storage.get_connection(db_path)
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert 'idx_tokens_token_ts' in indexes
+        assert 'idx_tokens_ts' in indexes
+
+    def test_save_and_load_latest(self, db_path, sample_data):
+        """저장 후 최신 스냅샷 로드 테스트"""
+        # Given: 두 개의 스냅샷 저장
+        storage.save_snapshot([sample_data[0]], db_path=db_path, ts=100.0)
+        storage.save_snapshot(sample_data, db_path=db_path, ts=200.0)
+
+        # When: 최신 데이터 로드
+        latest = storage.load_latest(db_path=db_path)
+
+        # Then: 마지막 스냅샷이 순서대로 반환되고 추가 필드도 보존됨
+        assert [t['symbol'] for t in latest] == ['AAA', 'BBB']
+        assert latest[1]['chain'] == 'sol'
+        assert latest[1]['price'] == 2.0
+
+    def test_load_latest_empty_db(self, db_path):
+        """빈 DB에서 로드 테스트"""
+        assert storage.load_latest(db_path=db_path) == []
+
+    def test_load_history_range(self, db_path, sample_data):
+        """심볼 히스토리 범위 조회 테스트"""
+        for i, ts in enumerate([100.0, 200.0, 300.0]):
+            token = dict(sample_data[0], price=1.0 + i)
+            storage.save_snapshot([token], db_path=db_path, ts=ts)
+
+        history = storage.load_history(token_key(sample_data[0]), start=150.0, db_path=db_path)
+
+        assert [row['ts'] for row in history] == [200.0, 300.0]
+        assert [row['price'] for row in history] == [2.0, 3.0]
+
+    def test_iter_db_snapshots_in_time_order(self, db_path, sample_data):
+        """스냅샷을 시간 순서로 읽는지 테스트"""
+        storage.save_snapshot(sample_data, db_path=db_path, ts=300.0)
+        storage.save_snapshot([sample_data[0]], db_path=db_path, ts=100.0)
+
+        snapshots = list(storage.iter_db_snapshots(start=50.0, db_path=db_path))
+
+        assert [ts for ts, _ in snapshots] == [100.0, 300.0]
+        assert len(snapshots[1][1]) == 2
+
+    def test_save_data_with_sqlite_backend(self, db_path, sample_data):
+        """GMGN_STORAGE=sqlite 일 때 save_data가 DB에 저장하는지 테스트"""
+        with patch.object(storage, 'STORAGE_BACKEND', 'sqlite'), \
+                patch.object(storage, 'DB_PATH', db_path), \
+                patch('builtins.open') as mock_file:
+            gmgn_scraper.save_data(sample_data)
+
+            # JSON 파일은 쓰지 않음
+            assert not mock_file.called
+
+        assert len(storage.load_latest(db_path=db_path)) == 2
+
+
+    def test_json_history_reads_only_files_in_range(self, tmp_path, sample_data):
+        """JSON 백엔드 히스토리가 파일명 시각으로 구간 밖 파일을 건너뛰는지 테스트"""
+        base = datetime(2024, 1, 1).timestamp()
+        for minute in range(10):
+            stamp = datetime.fromtimestamp(base + minute * 60).strftime('%Y%m%d_%H%M%S_%f')[:-3]
+            with open(tmp_path / f"gmgn_data_{stamp}.json", 'w', encoding='utf-8') as f:
+                json.dump([{**sample_data[0], 'price': float(minute)}], f)
+
+        with patch.object(storage, 'STORAGE_BACKEND', 'json'), \
+                patch('storage.snapshot_file_time', wraps=storage.snapshot_file_time) as parse_time:
+            history = storage.load_token_history(token_key(sample_data[0]),
+                                                 start=base + 3 * 60, end=base + 5 * 60)
+
+        assert [row['price'] for row in history] == [3.0, 4.0, 5.0]
+        assert parse_time.call_count == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
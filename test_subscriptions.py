@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+관심 목록/필터 구독 테스트 코드
+"""
+import pytest
+from unittest.mock import patch
+from snapshot_diff import token_key
+from subscriptions import SubscriptionLimit, SubscriptionRouter, parse_filter
+import web_app
+from web_app import app
+
+
+def key(symbol):
+    return token_key({'symbol': symbol})
+
+
+def token(symbol, chain='sol', price=1.0, change=0.0, mcap=1e6, volume=1000.0):
+    return {'symbol': symbol, 'chain': chain, 'price': price, 'change_24h': change,
+            'market_cap': mcap, 'volume_24h': volume}
+
+
+class TestSubscriptions:
+    """구독 라우팅 테스트 클래스"""
+
+    def test_parse_filter(self):
+        """필터 문자열 파싱 테스트"""
+        spec = parse_filter("sol, mcap < 5M, volume spike, change>=30")
+
+        assert spec['chains'] == {'sol'}
+        assert spec['flags'] == {'volume_spike'}
+        assert spec['ranges'] == [('market_cap', '<', 5e6), ('change_24h', '>=', 30.0)]
+        with pytest.raises(ValueError):
+            parse_filter("mcap < lots")
+        with pytest.raises(ValueError):
+            parse_filter("holders>10")
+
+    def test_watchlist_receives_only_its_tokens(self):
+        """관심 목록 구독은 해당 토큰 이벤트만 받는지 테스트"""
+        router = SubscriptionRouter()
+        sub = router.subscribe([key('PEPE')])
+        other = router.subscribe(['DOGE'])
+
+        router.route(added=[token('PEPE'), token('MOON')], changed=[], version=1)
+
+        assert [e['token']['symbol'] for e in router.events(sub.id)] == ['PEPE']
+        assert router.events(other.id) == []
+
+    def test_filter_requires_all_conditions(self):
+        """체인 + 시가총액 범위 + 거래량 급증 조건을 모두 만족할 때만 전달 테스트"""
+        router = SubscriptionRouter()
+        sub = router.subscribe(filter_text="sol, mcap<5M, volume_spike")
+
+        # Given: 처음 본 토큰 (거래량 기준 없음)
+        router.route(added=[token('A'), token('B', chain='eth'), token('C', mcap=9e6)], changed=[])
+        assert router.events(sub.id) == []
+
+        # When: 거래량이 3배가 된 변경
+        router.route(added=[], changed=[token('A', volume=3000.0), token('B', chain='eth', volume=3000.0),
+                                        token('C', mcap=9e6, volume=3000.0)], version=2)
+
+        # Then: sol + 5M 미만인 A만 전달
+        events = router.events(sub.id)
+        assert [e['token']['symbol'] for e in events] == ['A']
+        assert 'volume_spike' in events[0]['flags']
+
+    def test_range_bounds_are_strict_or_inclusive(self):
+        """미만/이하 경계 테스트"""
+        router = SubscriptionRouter()
+        below = router.subscribe(filter_text="mcap<5M")
+        at_most = router.subscribe(filter_text="mcap<=5M")
+        between = router.subscribe(filter_text="mcap>1M, mcap<=5M")
+
+        router.route(added=[token('EDGE', mcap=5e6), token('LOW', mcap=5e5)], changed=[])
+
+        assert [e['token']['symbol'] for e in router.events(below.id)] == ['LOW']
+        assert [e['token']['symbol'] for e in router.events(at_most.id)] == ['EDGE', 'LOW']
+        assert [e['token']['symbol'] for e in router.events(between.id)] == ['EDGE']
+
+    def test_unsubscribe_removes_from_index(self):
+        """구독 해지 후 전달되지 않는지 테스트"""
+        router = SubscriptionRouter()
+        sub = router.subscribe([key('PEPE')], "mcap<5M")
+
+        assert router.unsubscribe(sub.id) is True
+        assert router.route(added=[token('PEPE')], changed=[]) == 0
+        assert router.events(sub.id) is None
+        with pytest.raises(ValueError):
+            router.subscribe()
+
+    def test_events_since_and_wait(self):
+        """since 이후 이벤트만 반환, 대기 시간 초과 시 빈 목록 테스트"""
+        router = SubscriptionRouter()
+        sub = router.subscribe([key('PEPE')])
+        router.route(added=[token('PEPE')], changed=[])
+        router.route(added=[], changed=[token('PEPE', price=2.0)])
+
+        assert [e['seq'] for e in router.events(sub.id, since=1)] == [2]
+        assert router.wait(sub.id, since=2, timeout=0.01) == []
+
+    def test_volume_baselines_are_pruned(self):
+        """사라진 토큰과 구독이 모두 해지된 뒤의 거래량 기준값을 지우는지 테스트"""
+        router = SubscriptionRouter()
+        sub = router.subscribe(None, "volume_spike")
+        router.route(added=[token('PEPE'), token('DOGE')], changed=[])
+
+        router.route(added=[], changed=[], removed=[key('DOGE')])
+        assert set(router._volumes) == {key('PEPE')}
+
+        router.unsubscribe(sub.id)
+        assert router._volumes == {}
+
+    def test_broad_conditions_do_not_widen_candidates(self):
+        """넓은 조건(체인, 시가총액 상한)을 가진 구독은 좁은 조건이 맞을 때만 후보가 되는지 테스트"""
+        router = SubscriptionRouter()
+        watched = [router.subscribe([key(f'W{i}')], "sol, mcap<5M") for i in range(50)]
+        spikes = [router.subscribe(None, "sol, volume_spike") for _ in range(50)]
+        broad = router.subscribe(None, "sol")
+
+        # When: 관심 목록에 없고 거래량 급증도 아닌 sol 토큰 변경
+        with patch('subscriptions.Subscription.matches', autospec=True,
+                   side_effect=lambda sub, *args: True) as matches:
+            router.route(added=[token('PLAIN')], changed=[])
+
+        # Then: 체인만 보는 구독 하나만 확인
+        assert [call.args[0].id for call in matches.call_args_list] == [broad.id]
+        assert router.events(watched[0].id) == [] and router.events(spikes[0].id) == []
+
+    def test_idle_subscriptions_expire(self):
+        """조회하지 않은 구독은 ttl 후 해지되고, 조회한 구독은 유지되는지 테스트"""
+        router = SubscriptionRouter(ttl=60)
+        idle = router.subscribe([key('PEPE')])
+        active = router.subscribe([key('PEPE')])
+        idle.touched_at -= 120
+        active.touched_at -= 120
+        router.events(active.id)
+
+        router.route(added=[token('PEPE')], changed=[])
+
+        assert router.events(idle.id) is None
+        assert len(router.events(active.id)) == 1
+        assert router._by_token[key('PEPE')] == {active.id}
+        assert router.stats()['expired'] == 1
+
+    def test_subscription_cap(self):
+        """구독 수 상한 - 초과하면 거절, API는 503 테스트"""
+        router = SubscriptionRouter(max_subscriptions=2)
+        router.subscribe([key('A')])
+        router.subscribe([key('B')])
+        with pytest.raises(SubscriptionLimit):
+            router.subscribe([key('C')])
+
+        app.config['TESTING'] = True
+        with app.test_client() as client, patch.object(web_app, 'subscription_router', router):
+            response = client.post('/api/subscriptions', json={'filter': 'sol'})
+        assert response.status_code == 503
+
+    def test_watcher_pushes_without_requests(self):
+        """요청이 없어도 감시 스레드가 새 스냅샷 변경분을 구독에 전달하는지 테스트"""
+        first = [token('WATCH', price=1.0)]
+        second = [token('WATCH', price=2.0)]
+        web_app.publish_snapshot(first)
+        sub = web_app.subscription_router.subscribe([key('WATCH')])
+
+        # When: 새 스냅샷 저장 (웹 요청 없음)
+        web_app.invalidate_snapshot()
+        with patch.object(web_app, 'load_latest_data', return_value=second):
+            stop = web_app.watch_snapshots(interval=0.01)
+            try:
+                events = web_app.subscription_router.wait(sub.id, since=0, timeout=5.0)
+            finally:
+                stop.set()
+                web_app.subscription_router.unsubscribe(sub.id)
+
+        assert [(e['reason'], e['token']['price']) for e in events] == [('changed', 2.0)]
+
+    def test_subscription_api_receives_changes(self):
+        """구독 API - 스냅샷 변경분이 구독에 전달되는지 테스트"""
+        app.config['TESTING'] = True
+        first = [token('PEPE'), token('DOGE')]
+        second = [token('PEPE', price=2.0), token('DOGE', price=3.0)]
+
+        with app.test_client() as client, patch.object(web_app, 'load_latest_data', return_value=second):
+            web_app.publish_snapshot(first)
+            created = client.post('/api/subscriptions', json={'watchlist': ['PEPE']})
+            sub_id = created.get_json()['subscription']['id']
+
+            web_app.publish_snapshot(second)
+            response = client.get(f'/api/subscriptions/{sub_id}/events?since=0')
+            bad = client.post('/api/subscriptions', json={'filter': 'mcap<<1'})
+            deleted = client.delete(f'/api/subscriptions/{sub_id}')
+
+        assert created.status_code == 201
+        events = response.get_json()['events']
+        assert [(e['token']['symbol'], e['reason'], e['token']['price']) for e in events] == [('PEPE', 'changed', 2.0)]
+        assert bad.status_code == 400
+        assert deleted.status_code == 200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+토큰 id 등록부 테스트 코드
+"""
+import json
+import sqlite3
+import pytest
+import storage
+from snapshot_diff import token_key
+from token_registry import TokenRegistry, identity
+
+PEPE_SOL = {'symbol': 'PEPE', 'chain': 'sol', 'address': 'So1Pepe'}
+PEPE_BSC = {'symbol': 'PEPE', 'chain': 'bsc', 'address': '0xpepe'}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'tokens.db')
+
+
+class TestTokenRegistry:
+    """(체인, 주소) → id 등록부 테스트 클래스"""
+
+    def test_same_symbol_on_different_chains_gets_different_ids(self, path):
+        """같은 심볼이라도 체인/주소가 다르면 다른 id인지 테스트"""
+        registry = TokenRegistry(path)
+
+        sol, bsc = registry.key(PEPE_SOL), registry.key(PEPE_BSC)
+
+        assert sol != bsc
+        assert registry.key(dict(PEPE_SOL, price=2.0)) == sol
+        assert registry.identity_of(bsc) == ('bsc', '0xpepe')
+        assert registry.label(bsc) == 'PEPE'
+        # 주소가 없으면 심볼, 체인이 없으면 기본 체인
+        assert identity({'symbol': 'MOCK'}) == ('sol', 'MOCK')
+        assert identity({'name': '이름만'}) is None
+
+    def test_ids_survive_reload_and_are_shared(self, path):
+        """다시 열어도 같은 id이고, 다른 프로세스(인스턴스)가 등록한 id를 그대로 받는지 테스트"""
+        first = TokenRegistry(path)
+        second = TokenRegistry(path)
+
+        # Given: 두 인스턴스가 서로 다른 순서로 등록
+        tokens = first.assign([dict(PEPE_SOL), dict(PEPE_BSC)])
+        assert second.key(PEPE_BSC) == tokens[1]['id']
+        first.close()
+
+        # When: 다시 열기
+        reopened = TokenRegistry(path)
+
+        # Then
+        assert len(reopened) == 2
+        assert reopened.key(PEPE_SOL) == tokens[0]['id']
+        assert second.label(tokens[0]['id']) == 'PEPE'   # 다른 인스턴스가 등록한 id도 조회
+
+    def test_resolve_forms(self, path):
+        """id/숫자 문자열/"체인:주소"/심볼 식별자 해석 테스트"""
+        registry = TokenRegistry(path)
+        sol, bsc = registry.key(PEPE_SOL), registry.key(PEPE_BSC)
+
+        assert registry.resolve(sol) == [sol]
+        assert registry.resolve(str(bsc)) == [bsc]
+        assert registry.resolve('bsc:0xpepe') == [bsc]
+        assert registry.resolve('PEPE') == [sol, bsc]
+        assert registry.resolve('eth:0xnew') == []
+        assert registry.resolve(True) == registry.resolve(9999) == []
+
+        # 미리 구독할 때는 아직 수집되지 않은 주소도 등록
+        (new,) = registry.resolve('eth:0xnew', register=True)
+        assert registry.identity_of(new) == ('eth', '0xnew')
+
+
+class TestStorageMigration:
+    """token_id 도입 전 SQLite DB 변환 테스트"""
+
+    def test_symbol_keyed_database_is_migrated(self, tmp_path):
+        """심볼 키 DB를 열면 토큰 id가 채워지고 롤업이 id 기준으로 다시 만들어지는지 테스트"""
+        db_path = str(tmp_path / 'old.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE snapshots (id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL,
+                                    token_count INTEGER NOT NULL);
+            CREATE TABLE tokens (snapshot_id INTEGER NOT NULL, ts REAL NOT NULL, rank INTEGER NOT NULL,
+                                 symbol TEXT NOT NULL, name TEXT, price REAL, change_24h REAL,
+                                 market_cap REAL, volume_24h REAL, timestamp TEXT, extra TEXT);
+            CREATE INDEX idx_tokens_symbol_ts ON tokens(symbol, ts);
+            CREATE TABLE rollups (resolution INTEGER NOT NULL, symbol TEXT NOT NULL, bucket REAL NOT NULL,
+                                  open REAL NOT NULL, high REAL NOT NULL, low REAL NOT NULL, close REAL NOT NULL,
+                                  first_ts REAL NOT NULL, last_ts REAL NOT NULL, volume_24h REAL,
+                                  market_cap REAL, samples INTEGER NOT NULL,
+                                  PRIMARY KEY (resolution, symbol, bucket)) WITHOUT ROWID;
+            INSERT INTO snapshots VALUES (1, 60.0, 2);
+        """)
+        for rank, (token, price) in enumerate(((PEPE_SOL, 1.0), (PEPE_BSC, 5.0)), start=1):
+            extra = json.dumps({'chain': token['chain'], 'address': token['address']})
+            conn.execute("INSERT INTO tokens VALUES (1, 60.0, ?, 'PEPE', 'Pepe', ?, 0, 0, 0, NULL, ?)",
+                         (rank, price, extra))
+        conn.commit()
+        conn.close()
+
+        try:
+            # When: 현재 버전으로 열기
+            history = storage.load_history(token_key(PEPE_BSC), db_path=db_path)
+            (bucket,) = storage.load_rollup_history(token_key(PEPE_SOL), '1m', db_path=db_path)
+        finally:
+            storage.close_connections()
+
+        # Then: 같은 심볼이어도 토큰별로 분리
+        assert [row['price'] for row in history] == [5.0]
+        assert bucket['price'] == 1.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
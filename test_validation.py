@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+수집 데이터 검증 및 정규화 테스트 코드
+"""
+import json
+import math
+import pytest
+import gmgn_scraper
+from validation import Validator, coerce_numeric, normalize
+
+
+class TestValidation:
+    """검증 단계 테스트 클래스"""
+
+    def test_coerce_numeric_parses_scraped_text(self):
+        """화면 문자열의 숫자 변환 테스트"""
+        values, coerced = coerce_numeric(['1.2M', '$5,000', '45.2%', ' 7k ', '-12.5', 3, 2.5])
+
+        assert values.tolist() == pytest.approx([1.2e6, 5000.0, 45.2, 7000.0, -12.5, 3.0, 2.5])
+        assert coerced == 5
+
+    def test_coerce_numeric_invalid_values_become_nan(self):
+        """변환할 수 없는 값은 NaN 테스트"""
+        values, coerced = coerce_numeric(['abc', None, float('nan'), float('inf'), True, '1.2X'])
+
+        assert all(math.isnan(v) for v in values)
+        assert coerced == 0
+
+    def test_normalize_fills_optional_fields(self):
+        """선택 필드는 0으로, 이름은 심볼로 채우는지 테스트"""
+        tokens, rejected, _ = normalize([{'symbol': ' PEPE ', 'price': '0.000012', 'change_24h': '45.2%'}])
+
+        assert rejected == []
+        assert tokens == [{'symbol': 'PEPE', 'name': 'PEPE', 'price': 0.000012, 'change_24h': 45.2,
+                           'market_cap': 0.0, 'volume_24h': 0.0}]
+
+    def test_normalize_rejects_bad_rows_with_reason(self):
+        """잘못된 행 사유별 거부 테스트"""
+        records = [
+            {'symbol': 'OK', 'price': 1.0, 'change_24h': 5.0, 'chain': 'sol'},
+            {'symbol': '', 'price': 1.0, 'change_24h': 5.0},
+            {'symbol': 'ZERO', 'price': 0, 'change_24h': 5.0},
+            {'symbol': 'NOCHG', 'price': 1.0},
+            {'symbol': 'BADVOL', 'price': 1.0, 'change_24h': 5.0, 'volume_24h': 'n/a'},
+            {'symbol': 'OK', 'price': 2.0, 'change_24h': 1.0},
+            'garbage',
+        ]
+
+        tokens, rejected, _ = normalize(records)
+
+        # Then: 정상 행은 추가 필드를 유지
+        assert [t['symbol'] for t in tokens] == ['OK']
+        assert tokens[0]['chain'] == 'sol'
+        assert sorted(reason for _, reason in rejected) == [
+            'duplicate_token', 'invalid_change_24h', 'invalid_price', 'invalid_volume_24h',
+            'missing_symbol', 'not_a_record']
+
+    def test_validator_counts_and_quarantines(self, tmp_path):
+        """검증기 집계 및 격리 파일 기록 테스트"""
+        path = tmp_path / 'quarantine.jsonl'
+        validator = Validator(str(path))
+
+        tokens = validator.validate([
+            {'symbol': 'A', 'price': '1.5K', 'change_24h': 10},
+            {'symbol': 'B', 'price': None, 'change_24h': 10},
+        ])
+
+        assert [t['price'] for t in tokens] == [1500.0]
+        stats = validator.stats()
+        assert stats == {'accepted': 1, 'rejected': 1, 'coerced': 1, 'reasons': {'invalid_price': 1}}
+
+        lines = path.read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])['record']['symbol'] == 'B'
+
+    def test_check_alerts_normalizes_unvalidated_batch(self):
+        """검증되지 않은 배치도 한 번 정규화 후 알림 확인 테스트"""
+        data = [{'invalid': 'data'}, {'symbol': 'UP', 'price': '0.1', 'change_24h': '55%'}]
+
+        alerts = gmgn_scraper.check_alerts(data)
+
+        assert len(alerts) == 1
+        assert 'UP' in alerts[0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
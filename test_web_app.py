@@ -6,6 +6,8 @@ import pytest
 import json
 import os
 from unittest.mock import patch, mock_open
+from snapshot_diff import token_key
+import web_app
 from web_app import app
 
 
@@ -72,6 +74,49 @@ class TestWebApp:
             assert 'data' in data
             assert len(data['data']) == 2
 
+    def test_api_tokens_since_returns_deltas(self, client, sample_data):
+        """?since=<version> 요청 시 변경분만 반환하는지 테스트"""
+        # Given: 최초 스냅샷 버전 확인
+        with patch('web_app.load_latest_data', return_value=sample_data):
+            version = client.get('/api/tokens').get_json()['version']
+
+        # When: 가격 하나만 바뀐 새 스냅샷이 저장된 뒤 since 요청
+        updated = [dict(sample_data[0], price=0.005), sample_data[1]]
+        web_app.invalidate_snapshot()
+        with patch('web_app.load_latest_data', return_value=updated):
+            data = client.get(f'/api/tokens?since={version}').get_json()
+
+        # Then: 변경분만 반환
+        assert data['full'] is False
+        assert data['version'] == version + 1
+        assert data['deltas'][0]['changed'] == [{'key': token_key(sample_data[0]), 'fields': {'price': 0.005}}]
+
+    def test_snapshot_is_read_once_per_change(self, client, sample_data):
+        """latest.json이 바뀌지 않으면 요청마다 다시 읽고 정규화하지 않는지 테스트"""
+        with open('latest.json', 'w', encoding='utf-8') as f:
+            json.dump(sample_data, f)
+
+        with patch('web_app.normalize', wraps=web_app.normalize) as normalize:
+            for path in ('/api/tokens', '/api/leaderboard', '/api/search?q=TEST', '/api/tokens?since=0'):
+                assert client.get(path).status_code == 200
+            assert normalize.call_count == 1
+
+            # When: 새 스냅샷 저장
+            with open('latest.json', 'w', encoding='utf-8') as f:
+                json.dump(sample_data[:1], f)
+            data = client.get('/api/tokens').get_json()
+
+        assert normalize.call_count == 2
+        assert len(data['data']) == 1
+
+    def test_api_tokens_since_too_old_returns_full(self, client, sample_data):
+        """알 수 없는 버전이면 전체 데이터 반환 테스트"""
+        with patch('web_app.load_latest_data', return_value=sample_data):
+            data = client.get('/api/tokens?since=999999').get_json()
+
+        assert data['full'] is True
+        assert len(data['data']) == 2
+
     def test_api_update_endpoint(self, client):
         """수동 업데이트 API 테스트"""
         # Given: 업데이트 엔드포인트
@@ -149,6 +194,26 @@ class TestWebApp:
             # Then: 오류 없이 표시
             assert response.status_code == 200
 
+    def test_dashboard_embeds_snapshot_instead_of_rows(self, client):
+        """대시보드가 토큰 행 대신 첫 스냅샷 JSON을 포함하는지 테스트 (가상 스크롤)"""
+        # Given: 토큰 2000개
+        tokens = [{'symbol': f'T{i}', 'name': f'<b>{i}</b>', 'price': 1.0, 'change_24h': 0.0,
+                   'market_cap': 1.0, 'volume_24h': 1.0} for i in range(2000)]
+
+        with patch('web_app.load_latest_data', return_value=tokens):
+            response = client.get('/')
+
+        # Then: 행은 클라이언트가 보이는 구간만 그리므로 HTML 크기와 무관
+        html_text = response.data.decode('utf-8')
+        assert html_text.count('<tr') < 10
+        assert '<b>' not in html_text
+
+        payload = html_text.split('id="initial-data">')[1].split('</script>')[0]
+        initial = json.loads(payload)
+        assert len(initial['data']) == 2000
+        assert initial['data'][5]['name'] == '<b>5</b>'
+        assert isinstance(initial['version'], int)
+
     def test_api_tokens_handles_empty_data(self, client):
         """빈 데이터에 대한 API 처리 테스트"""
         # Given: 빈 데이터
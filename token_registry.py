@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+토큰 식별자 등록부 - (체인, 컨트랙트 주소)마다 작은 정수 id 부여
+
+밈코인 체인에는 같은 심볼(PEPE 등)의 서로 다른 토큰이 많으므로, 히스토리/알림 상태/
+변경분/인덱스/캐시는 심볼 대신 이 id를 키로 사용합니다. 주소가 없는 토큰(Mock 데이터,
+예전 아카이브)은 심볼을 주소 자리에 사용합니다.
+
+id는 공유 볼륨의 SQLite 파일에 기록되어 스크래퍼/모니터/웹 앱 프로세스가 같은 값을 씁니다.
+시작 시 전체 표를 한 번에 읽고, 이후 조회는 메모리 dict에서 O(1)로 처리합니다.
+처음 보는 토큰만 파일에 추가하며, 다른 프로세스가 먼저 추가한 토큰은 그 id를 그대로 받습니다.
+
+설정: GMGN_REGISTRY_PATH=data/tokens.db
+"""
+import os
+import sqlite3
+import threading
+
+REGISTRY_PATH = os.environ.get('GMGN_REGISTRY_PATH', os.path.join('data', 'tokens.db'))
+
+# 체인 정보가 없는 토큰의 체인 (기존 수집 대상이 sol)
+DEFAULT_CHAIN = 'sol'
+
+REGISTRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_ids (
+    id INTEGER PRIMARY KEY,
+    chain TEXT NOT NULL,
+    address TEXT NOT NULL,
+    symbol TEXT,
+    UNIQUE (chain, address)
+);
+"""
+
+SQL_ALL = "SELECT id, chain, address, symbol FROM token_ids"
+SQL_INSERT = "INSERT OR IGNORE INTO token_ids (chain, address, symbol) VALUES (?, ?, ?)"
+SQL_FIND = "SELECT id, symbol FROM token_ids WHERE chain = ? AND address = ?"
+SQL_BY_ID = "SELECT chain, address, symbol FROM token_ids WHERE id = ?"
+SQL_BY_SYMBOL = "SELECT id, chain, address, symbol FROM token_ids WHERE symbol = ? ORDER BY id"
+
+
+def identity(token):
+    """토큰의 (체인, 주소) - 주소가 없으면 심볼, 둘 다 없으면 None"""
+    address = token.get('address') or token.get('symbol')
+    if not address:
+        return None
+    return token.get('chain') or DEFAULT_CHAIN, address
+
+
+class TokenRegistry:
+    """(체인, 주소) ↔ 정수 id 등록부"""
+
+    def __init__(self, path=None):
+        self.path = path or REGISTRY_PATH
+        self._ids = {}          # (체인, 주소) → id
+        self._identities = {}   # id → (체인, 주소)
+        self._symbols = {}      # id → 심볼 (표시용)
+        self._by_symbol = {}    # 심볼 → [id]
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.executescript(REGISTRY_SCHEMA)
+        for row in self._conn.execute(SQL_ALL):
+            self._remember(*row)
+
+    def _remember(self, token_id, chain, address, symbol):
+        key = (chain, address)
+        if key in self._ids:
+            return
+        self._ids[key] = token_id
+        self._identities[token_id] = key
+        self._symbols[token_id] = symbol
+        if symbol:
+            self._by_symbol.setdefault(symbol, []).append(token_id)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def key(self, token):
+        """토큰의 id (처음 보는 토큰이면 등록), 식별 정보가 없으면 None"""
+        ident = identity(token)
+        if ident is None:
+            return None
+        token_id = self._ids.get(ident)
+        if token_id is None:
+            token_id = self._register([(ident, token.get('symbol'))])[ident]
+        return token_id
+
+    def assign(self, tokens):
+        """토큰 목록에 'id' 필드 기록 (새 토큰은 한 트랜잭션으로 등록), 토큰 목록 반환"""
+        pending = {}
+        for token in tokens:
+            ident = identity(token)
+            if ident is not None and ident not in self._ids:
+                pending.setdefault(ident, token.get('symbol'))
+        if pending:
+            self._register(list(pending.items()))
+
+        for token in tokens:
+            ident = identity(token)
+            if ident is not None:
+                token['id'] = self._ids[ident]
+        return tokens
+
+    def _register(self, entries):
+        """[(identity, symbol)] 등록 후 {identity: id} - 다른 프로세스가 먼저 등록했으면 그 id 사용"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for (chain, address), symbol in entries:
+                    if (chain, address) in self._ids:
+                        continue
+                    self._conn.execute(SQL_INSERT, (chain, address, symbol))
+                    token_id, stored_symbol = self._conn.execute(SQL_FIND, (chain, address)).fetchone()
+                    self._remember(token_id, chain, address, stored_symbol)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return {ident: self._ids[ident] for ident, _ in entries}
+
+    def _load_id(self, token_id):
+        """다른 프로세스가 등록한 id 정보 읽기"""
+        with self._lock:
+            row = self._conn.execute(SQL_BY_ID, (token_id,)).fetchone()
+            if row is not None:
+                self._remember(token_id, *row)
+        return row is not None
+
+    def identity_of(self, token_id):
+        """id의 (체인, 주소), 없으면 None"""
+        if token_id not in self._identities and not self._load_id(token_id):
+            return None
+        return self._identities[token_id]
+
+    def label(self, token_id):
+        """알림/화면 표시용 이름 (심볼, 없으면 주소)"""
+        if token_id not in self._identities and not self._load_id(token_id):
+            return str(token_id)
+        return self._symbols[token_id] or self._identities[token_id][1]
+
+    def resolve(self, ref, register=False):
+        """외부 식별자 → id 목록
+
+        정수(또는 숫자 문자열)는 id, "체인:주소"는 해당 토큰, 그 밖의 문자열은 같은 심볼의 모든 토큰.
+        register=True이면 아직 수집되지 않은 "체인:주소"도 등록해 id를 부여합니다 (미리 구독할 때).
+        """
+        if isinstance(ref, bool):
+            return []
+        if isinstance(ref, int) or (isinstance(ref, str) and ref.isdigit()):
+            token_id = int(ref)
+            return [token_id] if self.identity_of(token_id) is not None else []
+        if not isinstance(ref, str) or not ref:
+            return []
+        chain, sep, address = ref.partition(':')
+        if sep:
+            token_id = self._ids.get((chain, address))
+            if token_id is None:
+                with self._lock:
+                    row = self._conn.execute(SQL_FIND, (chain, address)).fetchone()
+                    if row is not None:
+                        self._remember(row[0], chain, address, row[1])
+                if row is None:
+                    if not (register and address):
+                        return []
+                    return [self.key({'chain': chain, 'address': address})]
+                token_id = row[0]
+            return [token_id]
+        if ref not in self._by_symbol:
+            with self._lock:
+                for row in self._conn.execute(SQL_BY_SYMBOL, (ref,)).fetchall():
+                    self._remember(*row)
+        return list(self._by_symbol.get(ref, ()))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default = {'registry': None}
+_default_lock = threading.Lock()
+
+
+def default_registry():
+    """프로세스 공용 등록부 (처음 사용할 때 REGISTRY_PATH에서 읽음)"""
+    registry = _default['registry']
+    if registry is None:
+        with _default_lock:
+            registry = _default['registry']
+            if registry is None:
+                registry = _default['registry'] = TokenRegistry(REGISTRY_PATH)
+    return registry
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+수집 데이터 검증 및 정규화 - 수집 직후 배치 전체를 한 번에 검사
+
+숫자 필드는 "1.2M", "$5,000", "45.2%" 같은 문자열도 숫자로 변환하고,
+필수 값이 없거나 잘못된 행은 사유별로 집계한 뒤 격리(quarantine) 파일에 남깁니다.
+검증을 통과한 토큰은 모든 필드가 채워져 있으므로 이후 단계에서 행 단위 검사가 필요 없습니다.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+import numpy as np
+import pandas as pd
+from token_registry import identity
+
+QUARANTINE_PATH = os.environ.get('GMGN_QUARANTINE_PATH', os.path.join('data', 'quarantine.jsonl'))
+
+# 알림/지표 계산에 반드시 필요한 숫자 필드와, 없으면 0으로 채우는 필드
+REQUIRED_NUMERIC = ('price', 'change_24h')
+OPTIONAL_NUMERIC = ('market_cap', 'volume_24h')
+NUMERIC_FIELDS = REQUIRED_NUMERIC + OPTIONAL_NUMERIC
+
+SUFFIXES = {'': 1.0, 'K': 1e3, 'M': 1e6, 'B': 1e9, 'T': 1e12}
+NUMBER_PATTERN = r'^([+-]?(?:\d+\.?\d*|\.\d+)(?:E[+-]?\d+)?)([KMBT]?)$'
+
+
+def _strings(series):
+    """문자열 값만 남긴 Series (다른 타입은 NaN) - .str 연산은 문자열 dtype에서만 동작"""
+    return series.where(series.map(type).eq(str)).astype('string')
+
+
+def coerce_numeric(values):
+    """값 목록을 float 배열로 변환 (변환 불가/None/NaN은 NaN), (배열, 문자열에서 변환된 개수) 반환"""
+    series = pd.Series(values, dtype=object)
+
+    # 문자열: 통화 기호, 쉼표, %, 공백 제거 후 K/M/B/T 접미사 처리
+    text = _strings(series).str.replace(r'[$,%\s]', '', regex=True).str.upper()
+    parts = text.str.extract(NUMBER_PATTERN)
+    from_text = pd.to_numeric(parts[0], errors='coerce') * parts[1].map(SUFFIXES)
+
+    is_text = text.notna().to_numpy()
+    is_bool = series.map(type).eq(bool).to_numpy()
+    numbers = pd.to_numeric(series.where(~is_text & ~is_bool), errors='coerce')
+    result = np.where(is_text, from_text.to_numpy(dtype=float, na_value=np.nan),
+                      numbers.to_numpy(dtype=float, na_value=np.nan))
+    result[~np.isfinite(result)] = np.nan
+    return result, int((is_text & ~np.isnan(result)).sum())
+
+
+def normalize(records):
+    """배치 검증 및 정규화 - (정상 토큰 목록, [(원본, 사유)] 목록, 문자열 변환 개수) 반환"""
+    rows = [r for r in records if isinstance(r, dict)]
+    rejected = [(r, 'not_a_record') for r in records if not isinstance(r, dict)]
+    if not rows:
+        return [], rejected, 0
+
+    symbol = _strings(pd.Series([r.get('symbol') for r in rows], dtype=object)).str.strip()
+    name = _strings(pd.Series([r.get('name') for r in rows], dtype=object)).str.strip()
+    columns = {}
+    coerced = 0
+    for field in NUMERIC_FIELDS:
+        raw = [r.get(field) for r in rows]
+        columns[field], count = coerce_numeric(raw)
+        coerced += count
+        if field in OPTIONAL_NUMERIC:
+            # 값이 없으면 0, 있는데 변환할 수 없으면 잘못된 행
+            columns[field][pd.isna(pd.Series(raw, dtype=object)).to_numpy()] = 0.0
+
+    # 같은 토큰(체인, 주소 - 없으면 심볼)이 다시 나오면 중복 (같은 심볼의 다른 토큰은 허용)
+    identities = pd.Series([identity({'chain': r.get('chain'), 'address': r.get('address'),
+                                      'symbol': s if isinstance(s, str) else None})
+                            for r, s in zip(rows, symbol.astype(object).tolist())], dtype=object)
+
+    # 먼저 걸리는 사유 하나만 기록
+    checks = [
+        ('missing_symbol', ~symbol.str.len().gt(0).fillna(False).to_numpy(dtype=bool)),
+        ('invalid_price', ~(columns['price'] > 0)),
+        ('invalid_change_24h', np.isnan(columns['change_24h'])),
+        ('invalid_market_cap', ~(columns['market_cap'] >= 0)),
+        ('invalid_volume_24h', ~(columns['volume_24h'] >= 0)),
+        ('duplicate_token', identities.duplicated().to_numpy() & identities.notna().to_numpy(dtype=bool)),
+    ]
+    reason = np.full(len(rows), None, dtype=object)
+    for label, failed in checks:
+        reason[pd.isna(reason) & failed] = label
+
+    name = name.where(name.str.len().gt(0).fillna(False), symbol)
+    values = {field: column.tolist() for field, column in columns.items()}
+    symbols, names = symbol.astype(object).tolist(), name.astype(object).tolist()
+
+    tokens = []
+    for i, row in enumerate(rows):
+        if reason[i] is not None:
+            rejected.append((row, reason[i]))
+            continue
+        token = dict(row, symbol=symbols[i], name=names[i])
+        for field in NUMERIC_FIELDS:
+            token[field] = values[field][i]
+        tokens.append(token)
+    return tokens, rejected, coerced
+
+
+class Validator:
+    """수집 배치 검증기 - 사유별 거부 건수 집계 및 격리 파일 기록"""
+
+    def __init__(self, quarantine_path=None, keep=100):
+        self.quarantine_path = quarantine_path
+        self.recent = deque(maxlen=keep)
+        self.reasons = Counter()
+        self.accepted = 0
+        self.rejected = 0
+        self.coerced = 0
+        self._lock = threading.Lock()
+
+    def validate(self, records):
+        """정상 토큰 목록 반환 (잘못된 행은 격리)"""
+        tokens, rejected, coerced = normalize(records)
+
+        with self._lock:
+            self.accepted += len(tokens)
+            self.rejected += len(rejected)
+            self.coerced += coerced
+            self.reasons.update(reason for _, reason in rejected)
+            if rejected:
+                self._quarantine(rejected)
+        return tokens
+
+    def _quarantine(self, rejected):
+        now = time.time()
+        entries = [{'ts': now, 'reason': reason, 'record': record} for record, reason in rejected]
+        self.recent.extend(entries)
+        if not self.quarantine_path:
+            return
+
+        directory = os.path.dirname(self.quarantine_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.quarantine_path, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+        except OSError as e:
+            print(f"⚠️ 격리 파일 기록 실패: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {'accepted': self.accepted, 'rejected': self.rejected,
+                    'coerced': self.coerced, 'reasons': dict(self.reasons)}
@@ -5,12 +5,78 @@
 import json
 import os
 import socket
+import threading
+import time
 import subprocess
 import signal
 from datetime import datetime
-from flask import Flask, render_template_string, jsonify
+from flask import Flask, Response, g, render_template_string, jsonify, request, stream_with_context
+import storage
+from snapshot_diff import SnapshotTracker, token_key, token_label
+from indicators import load_indicator_values
+from enrichment import TTLCache
+from charts import RANGES, MIN_WIDTH, MAX_WIDTH, build_series
+from rollups import RESOLUTIONS, pick_resolution
+from leaderboard import Leaderboard, WINDOWS
+from search import SearchIndex
+from subscriptions import SubscriptionLimit, SubscriptionRouter
+from batch_lookup import SnapshotIndex, encode_batch, encode_json, parse_batch_request
+from memory_budget import MemoryBudget, SpillFile, SPILL_DIR
+from validation import normalize
+import export
+from replay import parse_time
+from token_registry import default_registry
+from static_assets import StaticAssets, IMMUTABLE_CACHE
+from rate_limit import RateLimiter, SHED_AT, client_id, request_priority
 
-app = Flask(__name__)
+# 이 시간(초)보다 오래된 스냅샷이면 /healthz가 stale로 표시
+HEALTH_MAX_AGE = float(os.environ.get('GMGN_HEALTH_MAX_AGE', '900'))
+STARTED_AT = time.time()
+
+# 새 스냅샷 확인 주기 (초)
+WATCH_INTERVAL = float(os.environ.get('GMGN_WATCH_INTERVAL', '2'))
+
+# static/ 파일은 Flask 기본 경로 대신 지문 이름 경로(/static/<이름>.<해시>.<확장자>)로 제공
+app = Flask(__name__, static_folder=None)
+
+# 대시보드 CSS/JS - 시작 시 한 번 해시 및 사전 압축
+assets = StaticAssets()
+
+# 클라이언트별 속도 제한 + 과부하 시 낮은 우선순위 요청 차단
+rate_limiter = RateLimiter()
+
+# 스냅샷 버전 및 변경분 기록
+snapshot_tracker = SnapshotTracker()
+
+# 차트 시리즈 캐시 - (토큰, 기간, 너비, 스냅샷 버전) 단위
+chart_cache = TTLCache(ttl=3600, max_size=1000)
+
+# 메모리 예산 초과 시 비활성 토큰을 옮겨 둘 파일 (처음 필요할 때 생성)
+memory_spill = SpillFile(os.path.join(SPILL_DIR, 'spill_web.db'))
+
+# 구간별 상승/하락/거래량 급증 리더보드
+leaderboard = Leaderboard(spill=memory_spill)
+_publish_lock = threading.Lock()
+
+# 최신 스냅샷 캐시 - 저장소의 스냅샷이 바뀔 때만 다시 읽고 게시 (marker: snapshot_marker() 값)
+_snapshot = {'marker': object(), 'current': ([], 0)}
+_snapshot_lock = threading.Lock()
+
+# 심볼/이름/주소 검색 인덱스 (새 토큰이 보일 때마다 증분 갱신)
+search_index = SearchIndex()
+
+# 관심 목록/필터 구독 - 스냅샷 변경분을 조건이 맞는 구독에만 전달
+subscription_router = SubscriptionRouter()
+
+# 일괄 조회용 토큰 해시 인덱스 (스냅샷 버전마다 재생성) 및 구간 히스토리 조각 캐시
+token_index = SnapshotIndex()
+history_cache = TTLCache(ttl=3600, max_size=5000)
+
+# 토큰 수에 비례해 커지는 구조의 메모리 예산
+memory_budget = MemoryBudget()
+memory_budget.register('leaderboard', leaderboard)
+memory_budget.register('chart_cache', chart_cache)
+memory_budget.register('history_cache', history_cache)
 
 def cleanup_old_processes():
     """기존 웹앱 프로세스 정리"""
@@ -51,91 +117,7 @@ DASHBOARD_TEMPLATE = """
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>GMGN 트래커 - 간단 버전</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        .header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-            text-align: center;
-        }
-        .stats {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        .stat-card {
-            background: white;
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            text-align: center;
-        }
-        .stat-value {
-            font-size: 2em;
-            font-weight: bold;
-            color: #667eea;
-        }
-        .tokens-table {
-            background: white;
-            border-radius: 10px;
-            overflow: hidden;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-        th {
-            background: #667eea;
-            color: white;
-            padding: 15px;
-            text-align: left;
-        }
-        td {
-            padding: 15px;
-            border-bottom: 1px solid #eee;
-        }
-        .positive {
-            color: #28a745;
-            font-weight: bold;
-        }
-        .negative {
-            color: #dc3545;
-            font-weight: bold;
-        }
-        .refresh-btn {
-            background: #28a745;
-            color: white;
-            padding: 10px 20px;
-            border: none;
-            border-radius: 5px;
-            cursor: pointer;
-            margin: 10px 0;
-        }
-        .refresh-btn:hover {
-            background: #218838;
-        }
-        .alert-section {
-            background: #fff3cd;
-            border: 1px solid #ffeaa7;
-            border-radius: 10px;
-            padding: 20px;
-            margin-bottom: 20px;
-        }
-    </style>
+    <link rel="stylesheet" href="{{ assets.url('dashboard.css') }}">
 </head>
 <body>
     <div class="container">
@@ -146,15 +128,15 @@ DASHBOARD_TEMPLATE = """
 
         <div class="stats">
             <div class="stat-card">
-                <div class="stat-value">{{ total_tokens }}</div>
+                <div class="stat-value" id="total-tokens">{{ total_tokens }}</div>
                 <div>총 토큰 수</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value">{{ pumping_count }}</div>
+                <div class="stat-value" id="pumping-count">{{ pumping_count }}</div>
                 <div>급등 토큰</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value">{{ last_update }}</div>
+                <div class="stat-value" id="last-update">{{ last_update }}</div>
                 <div>마지막 업데이트</div>
             </div>
         </div>
@@ -168,62 +150,40 @@ DASHBOARD_TEMPLATE = """
         </div>
         {% endif %}
 
-        <button class="refresh-btn" onclick="location.reload()">🔄 새로고침</button>
+        <button class="refresh-btn" onclick="refresh()">🔄 새로고침</button>
         <button class="refresh-btn" onclick="manualUpdate()" style="background: #007bff;">📥 수동 수집</button>
 
+        <div class="table-controls">
+            <input type="search" id="token-filter" placeholder="심볼/이름 필터">
+            <label><input type="checkbox" id="pumping-only"> 급등 토큰만</label>
+            <span id="visible-count"></span>
+        </div>
+
         <div class="tokens-table">
-            <table>
-                <thead>
-                    <tr>
-                        <th>토큰</th>
-                        <th>가격 (USD)</th>
-                        <th>24시간 변동</th>
-                        <th>시가총액</th>
-                        <th>거래량</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {% for token in tokens %}
-                    <tr>
-                        <td>
-                            <strong>{{ token['symbol'] }}</strong><br>
-                            <small style="color: #666;">{{ token['name'] }}</small>
-                        </td>
-                        <td>${{ "%.6f"|format(token['price'] or 0) }}</td>
-                        <td class="{% if token['change_24h'] > 0 %}positive{% else %}negative{% endif %}">
-                            {{ "{:+.1f}".format(token['change_24h'] or 0) }}%
-                        </td>
-                        <td>${{ "{:,.0f}".format(token['market_cap'] or 0) }}</td>
-                        <td>${{ "{:,.0f}".format(token['volume_24h'] or 0) }}</td>
-                    </tr>
-                    {% endfor %}
-                </tbody>
-            </table>
+            <div class="table-viewport" id="table-viewport">
+                <table>
+                    <thead>
+                        <tr>
+                            <th data-sort="symbol">토큰</th>
+                            <th data-sort="price">가격 (USD)</th>
+                            <th data-sort="change">24시간 변동</th>
+                            <th data-sort="mcap">시가총액</th>
+                            <th data-sort="volume">거래량</th>
+                        </tr>
+                    </thead>
+                    <tbody id="token-rows">
+                        <tr class="spacer"><td colspan="5" id="spacer-top"></td></tr>
+                        <tr class="spacer"><td colspan="5" id="spacer-bottom"></td></tr>
+                    </tbody>
+                </table>
+            </div>
         </div>
     </div>
 
-    <script>
-        async function manualUpdate() {
-            try {
-                const response = await fetch('/api/update', { method: 'POST' });
-                const result = await response.json();
-                
-                if (result.success) {
-                    alert('데이터 업데이트 완료!');
-                    location.reload();
-                } else {
-                    alert('업데이트 실패: ' + result.error);
-                }
-            } catch (error) {
-                alert('업데이트 실패: ' + error.message);
-            }
-        }
-        
-        // 30초마다 자동 새로고침
-        setInterval(() => {
-            location.reload();
-        }, 30000);
-    </script>
+    <!-- 첫 화면용 스냅샷 (이후에는 /api/tokens?since=<version> 변경분만 받음) -->
+    <script type="application/json" id="initial-data">{{ initial|tojson }}</script>
+
+    <script src="{{ assets.url('dashboard.js') }}"></script>
 </body>
 </html>
 """
@@ -231,14 +191,106 @@ DASHBOARD_TEMPLATE = """
 def load_latest_data():
     """최신 데이터 로드"""
     try:
+        if storage.STORAGE_BACKEND == 'sqlite':
+            return storage.load_latest()
         if os.path.exists('latest.json'):
             with open('latest.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
+                # 이전 버전이 저장한 파일일 수 있으므로 한 번 정규화
+                tokens, _, _ = normalize(json.load(f))
+                return tokens
     except Exception as e:
         print(f"데이터 로드 실패: {e}")
     
     return []
 
+def snapshot_marker():
+    """최신 스냅샷 식별 값 (SQLite: 스냅샷 id, JSON: latest.json 수정 시각/크기), 없으면 None"""
+    if storage.STORAGE_BACKEND == 'sqlite':
+        return storage.latest_snapshot_id()
+    try:
+        stat = os.stat('latest.json')
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def current_snapshot():
+    """(최신 토큰 목록, 버전) - 저장소의 스냅샷이 바뀌었을 때만 다시 읽어 정규화/게시
+
+    요청마다 하는 일은 snapshot_marker() 확인 한 번(파일 stat 또는 인덱스 조회)뿐입니다.
+    """
+    marker = snapshot_marker()
+    if marker != _snapshot['marker']:
+        with _snapshot_lock:
+            if marker != _snapshot['marker']:
+                tokens = load_latest_data()
+                _snapshot['current'] = (tokens, publish_snapshot(tokens, storage.latest_snapshot_time()))
+                _snapshot['marker'] = marker
+    return _snapshot['current']
+
+def invalidate_snapshot():
+    """다음 요청에서 최신 스냅샷을 다시 읽도록 표시 (수동 수집 직후 등)"""
+    _snapshot['marker'] = object()
+
+def publish_snapshot(tokens, ts=None):
+    """스냅샷 등록 - 새 버전이면 리더보드 등 증분 구조 갱신, 현재 버전 반환
+
+    ts: 스냅샷 수집 시각 (warm_leaderboard와 같은 기준이어야 같은 스냅샷을 두 번 반영하지 않음)
+    """
+    with _publish_lock:
+        previous = snapshot_tracker.version
+        default_registry().assign(tokens)
+        version = snapshot_tracker.publish(tokens)
+        if version != previous:
+            token_index.rebuild(version, tokens)
+            leaderboard.ingest(tokens, ts=ts)
+            search_index.sync(tokens)
+            route_changes(previous, version, tokens)
+            memory_budget.enforce()
+    return version
+
+def route_changes(previous, version, tokens):
+    """새 버전의 변경분(추가/변경 토큰)을 구독에 전달"""
+    if not subscription_router.subscriptions:
+        return 0
+    deltas = snapshot_tracker.changes_since(previous) or []
+    changed_keys = {change['key'] for delta in deltas for change in delta['changed']}
+    added = [token for delta in deltas for token in delta['added']]
+    changed = [token for token in tokens if token_key(token) in changed_keys]
+    removed = [key for delta in deltas for key in delta['removed']]
+    return subscription_router.route(added, changed, version, removed)
+
+def watch_snapshots(interval=None, stop=None):
+    """새 스냅샷 감시 스레드 시작 - 요청이 없어도 새 스냅샷을 게시해 구독(SSE/롱폴)에 변경분 전달
+
+    게시는 current_snapshot()을 거치므로 감시 스레드와 요청 중 먼저 알아챈 쪽이 스냅샷마다 한 번만 합니다.
+    반환한 Event를 set()하면 종료합니다.
+    """
+    interval = WATCH_INTERVAL if interval is None else interval
+    stop = stop or threading.Event()
+
+    def run():
+        while True:
+            try:
+                current_snapshot()
+            except Exception as e:
+                print(f"⚠️ 스냅샷 확인 실패: {e}")
+            if stop.wait(interval):
+                return
+
+    threading.Thread(target=run, name='snapshot-watcher', daemon=True).start()
+    return stop
+
+def warm_leaderboard():
+    """저장소의 최근 24시간 스냅샷으로 리더보드와 검색 인덱스 초기화"""
+    start = time.time() - max(WINDOWS.values())
+    count = 0
+    for ts, tokens in storage.iter_snapshots(start=start):
+        leaderboard.ingest(tokens, ts=ts)
+        search_index.add(tokens)
+        memory_budget.enforce()
+        count += 1
+    return count
+
 def get_alerts(tokens):
     """급등 알림 생성"""
     alerts = []
@@ -247,10 +299,46 @@ def get_alerts(tokens):
             alerts.append(f"🚀 {token['symbol']}: +{token['change_24h']:.1f}%")
     return alerts
 
+@app.before_request
+def limit_request():
+    """클라이언트별 속도 제한/과부하 차단 - 거절하면 429 + Retry-After (테스트 모드에서는 RATE_LIMIT_ENABLED일 때만)"""
+    priority = request_priority(request.method, request.path, request.args, snapshot_tracker.covers)
+    if priority is None or not app.config.get('RATE_LIMIT_ENABLED', not app.testing):
+        return None
+    client = client_id(request.remote_addr, request.headers.get('X-Forwarded-For'))
+    allowed, retry_after, reason = rate_limiter.admit(client, priority)
+    if not allowed:
+        error = "요청이 너무 많습니다" if reason == 'rate_limited' else "서버가 혼잡합니다"
+        response = jsonify({'success': False, 'error': f"{error}. {retry_after}초 후 다시 시도하세요"})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+    g.in_flight = priority in SHED_AT
+    return None
+
+@app.teardown_request
+def release_request(exc):
+    if g.pop('in_flight', False):
+        rate_limiter.release()
+
+@app.route('/healthz')
+def healthz():
+    """헬스체크 - 렌더링/토큰 로드 없이 프로세스 상태와 최신 스냅샷 나이만 반환"""
+    ts = storage.latest_snapshot_time()
+    age = None if ts is None else round(max(0.0, time.time() - ts), 1)
+    return jsonify({
+        'status': 'ok',
+        'snapshot_age': age,
+        'stale': age is None or age > HEALTH_MAX_AGE,
+        'version': snapshot_tracker.version,
+        'uptime': round(time.time() - STARTED_AT, 1),
+        'rate_limit': rate_limiter.stats()
+    })
+
 @app.route('/')
 def dashboard():
     """메인 대시보드"""
-    tokens = load_latest_data()
+    tokens, version = current_snapshot()
     alerts = get_alerts(tokens)
     pumping_count = len([t for t in tokens if t['change_24h'] > 20])
     
@@ -263,22 +351,273 @@ def dashboard():
             pass
     
     return render_template_string(DASHBOARD_TEMPLATE, 
-                                  tokens=tokens,
+                                  assets=assets,
+                                  initial={'version': version, 'data': tokens},
                                   alerts=alerts,
                                   total_tokens=len(tokens),
                                   pumping_count=pumping_count,
                                   last_update=last_update)
 
+@app.route('/static/<filename>')
+def static_file(filename):
+    """지문 이름 정적 파일 - 클라이언트가 받는 가장 작은 사전 압축본, 1년 immutable 캐시"""
+    found = assets.get(filename, request.headers.get('Accept-Encoding'))
+    if found is None:
+        return jsonify({'success': False, 'error': "파일을 찾을 수 없습니다"}), 404
+
+    body, encoding, entry = found
+    response = Response(body, content_type=entry['content_type'])
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(f"{entry['etag']}-{encoding}")
+    return response.make_conditional(request)
+
 @app.route('/api/tokens')
 def api_tokens():
-    """토큰 데이터 API"""
-    tokens = load_latest_data()
+    """토큰 데이터 API (?since=<version> 이면 변경분만 반환)"""
+    tokens, version = current_snapshot()
+
+    since = request.args.get('since', type=int)
+    if since is not None:
+        deltas = snapshot_tracker.changes_since(since)
+        if deltas is not None:
+            return jsonify({
+                'success': True,
+                'version': deltas[-1]['version'] if deltas else version,
+                'full': False,
+                'deltas': deltas
+            })
+
+    indicator_values = load_indicator_values()
     return jsonify({
         'success': True,
+        'version': version,
+        'full': True,
         'data': tokens,
-        'count': len(tokens)
+        'count': len(tokens),
+        'indicators': {token_key(t): indicator_values[token_key(t)]
+                       for t in tokens if token_key(t) in indicator_values}
+    })
+
+@app.route('/api/tokens/batch', methods=['POST'])
+def api_tokens_batch():
+    """여러 토큰 일괄 조회 API - {"tokens": ["PEPE", "sol:<주소>", 12], "fields": ["price"], "windows": ["1h"]}"""
+    try:
+        refs, fields, windows = parse_batch_request(request.get_json(silent=True), list(WINDOWS))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    current_snapshot()
+    version = token_index.version or 0
+    found, missing = token_index.lookup(refs, fields)
+
+    history = None
+    if windows:
+        now = time.time()
+        history = {ref: {window: window_history(key, window, version, now) for window in windows}
+                   for ref, key, _ in found}
+
+    return Response(encode_batch(version, found, missing, history), mimetype='application/json')
+
+def window_history(key, window, version, now):
+    """토큰의 최근 구간 [[ts, price], ...] JSON 조각 (스냅샷 버전 단위로 캐시)"""
+    cache_key = (key, window, version)
+    encoded = history_cache.get(cache_key)
+    if encoded is None:
+        span = WINDOWS[window]
+        rows = storage.load_token_history(key, start=now - span, resolution=pick_resolution(span))
+        encoded = encode_json([[row['ts'], row['price']] for row in rows])
+        history_cache.set(cache_key, encoded)
+    return encoded
+
+@app.route('/api/chart/<ref>')
+def api_chart(ref):
+    """차트용 가격 시리즈 API (?range=1h|24h|7d&width=<픽셀>) - ref는 토큰 id, "체인:주소" 또는 심볼"""
+    range_name = request.args.get('range', '24h')
+    if range_name not in RANGES:
+        return jsonify({'success': False, 'error': f"지원하지 않는 기간: {range_name}"}), 400
+
+    width = min(max(request.args.get('width', 800, type=int), MIN_WIDTH), MAX_WIDTH)
+    _, version = current_snapshot()
+    key = token_index.resolve(ref)
+    if key is None:
+        return jsonify({'success': False, 'error': f"알 수 없는 토큰: {ref}"}), 404
+
+    cache_key = (key, range_name, width, version)
+    result = chart_cache.get(cache_key)
+    if result is None:
+        # 기간에 맞는 해상도의 롤업을 읽음 (JSON 백엔드는 원본)
+        resolution = pick_resolution(RANGES[range_name])
+        history = storage.load_token_history(key, start=time.time() - RANGES[range_name],
+                                             resolution=resolution)
+        result = {
+            'success': True,
+            'id': key,
+            'symbol': token_label(key),
+            'range': range_name,
+            'width': width,
+            'resolution': resolution if storage.STORAGE_BACKEND == 'sqlite' else None,
+            'version': version,
+            'raw_count': len(history),
+            'points': build_series(history, width)
+        }
+        chart_cache.set(cache_key, result)
+
+    return jsonify(result)
+
+@app.route('/api/rollups/<ref>')
+def api_rollups(ref):
+    """해상도별 OHLC 롤업 API (?resolution=1m|5m|1h|1d&start=&end=, SQLite 저장소 전용) - ref는 토큰 id, "체인:주소" 또는 심볼"""
+    resolution = request.args.get('resolution', '1h')
+    if resolution not in RESOLUTIONS:
+        return jsonify({'success': False, 'error': f"지원하지 않는 해상도: {resolution}"}), 400
+    if storage.STORAGE_BACKEND != 'sqlite':
+        return jsonify({'success': False, 'error': "롤업은 SQLite 저장소(GMGN_STORAGE=sqlite)에서만 지원합니다"}), 400
+    try:
+        start = parse_time(request.args.get('start'))
+        end = parse_time(request.args.get('end'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    key = token_index.resolve(ref)
+    if key is None:
+        return jsonify({'success': False, 'error': f"알 수 없는 토큰: {ref}"}), 404
+
+    rows = storage.load_rollup_history(key, resolution, start, end)
+    return jsonify({'success': True, 'id': key, 'symbol': token_label(key), 'resolution': resolution,
+                    'count': len(rows), 'rows': rows})
+
+@app.route('/api/leaderboard')
+def api_leaderboard():
+    """구간별 상승/하락/거래량 급증 순위 API (?window=5m|1h|24h&k=10)"""
+    current_snapshot()
+    k = request.args.get('k', 10, type=int)
+    if k < 0:
+        return jsonify({'success': False, 'error': "k는 0 이상이어야 합니다"}), 400
+
+    window = request.args.get('window')
+    if window is not None and window not in WINDOWS:
+        return jsonify({'success': False, 'error': f"지원하지 않는 구간: {window}"}), 400
+
+    windows = [window] if window else list(WINDOWS)
+    return jsonify({
+        'success': True,
+        'updated_at': leaderboard.updated_at,
+        'windows': {name: leaderboard.top(name, k) for name in windows}
+    })
+
+@app.route('/api/search')
+def api_search():
+    """토큰 검색 API - 심볼/이름/주소 접두사 및 오타 허용 일치 (?q=pep&limit=10)"""
+    current_snapshot()
+    query = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+
+    started = time.perf_counter()
+    results = search_index.search(query, limit)
+    return jsonify({
+        'success': True,
+        'query': query,
+        'count': len(results),
+        'results': results,
+        'took_ms': round((time.perf_counter() - started) * 1000, 3)
     })
 
+@app.route('/api/subscriptions', methods=['POST'])
+def api_subscribe():
+    """구독 생성 API - {"watchlist": ["PEPE", "sol:<주소>"], "filter": "sol, mcap<5M, volume_spike"}
+
+    심볼은 현재 등록된 같은 심볼의 모든 토큰으로 펼치고, "체인:주소"는 아직 수집 전이어도 등록합니다.
+    """
+    body = request.get_json(silent=True) or {}
+    watchlist = body.get('watchlist') or []
+    if not isinstance(watchlist, list) or \
+            not all(isinstance(k, (str, int)) and not isinstance(k, bool) for k in watchlist):
+        return jsonify({'success': False, 'error': "watchlist는 토큰 식별자(id, \"체인:주소\", 심볼) 목록이어야 합니다"}), 400
+    keys = []
+    for ref in watchlist:
+        ids = default_registry().resolve(ref, register=True)
+        if not ids:
+            return jsonify({'success': False, 'error': f"알 수 없는 토큰: {ref}"}), 400
+        keys.extend(ids)
+    try:
+        subscription = subscription_router.subscribe(keys, body.get('filter'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except SubscriptionLimit as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    return jsonify({'success': True, 'subscription': subscription.describe()}), 201
+
+@app.route('/api/subscriptions/<sub_id>', methods=['DELETE'])
+def api_unsubscribe(sub_id):
+    """구독 해지 API"""
+    if not subscription_router.unsubscribe(sub_id):
+        return jsonify({'success': False, 'error': "구독을 찾을 수 없습니다"}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/subscriptions/<sub_id>/events')
+def api_subscription_events(sub_id):
+    """구독 이벤트 조회 API (?since=마지막 seq&wait=최대 대기 초)"""
+    current_snapshot()
+    since = request.args.get('since', 0, type=int)
+    wait = max(0.0, min(request.args.get('wait', 0, type=float), 30.0))
+
+    events = subscription_router.wait(sub_id, since, wait) if wait else subscription_router.events(sub_id, since)
+    if events is None:
+        return jsonify({'success': False, 'error': "구독을 찾을 수 없습니다"}), 404
+    return jsonify({'success': True, 'events': events,
+                    'seq': events[-1]['seq'] if events else since})
+
+@app.route('/api/subscriptions/<sub_id>/stream')
+def api_subscription_stream(sub_id):
+    """구독 이벤트 푸시 (Server-Sent Events)"""
+    if subscription_router.events(sub_id) is None:
+        return jsonify({'success': False, 'error': "구독을 찾을 수 없습니다"}), 404
+
+    def stream(since):
+        while True:
+            events = subscription_router.wait(sub_id, since, timeout=15.0)
+            if events is None:
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                yield f"id: {event['seq']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            since = events[-1]['seq']
+
+    since = request.headers.get('Last-Event-ID', 0, type=int)
+    return Response(stream_with_context(stream(since)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/export')
+def api_export():
+    """히스토리 내보내기 API - 조각 단위 스트리밍
+    (?format=csv|ndjson|parquet&start=&end=&chain=sol,eth&symbol=PEPE&columns=ts,symbol,price)"""
+    fmt = request.args.get('format', 'csv')
+    try:
+        chunks = export.export(
+            fmt,
+            start=parse_time(request.args.get('start')),
+            end=parse_time(request.args.get('end')),
+            chains=export.parse_list(request.args.get('chain')),
+            symbols=export.parse_list(request.args.get('symbol')),
+            columns=export.parse_columns(request.args.get('columns')),
+        )
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    filename = f"gmgn_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return Response(stream_with_context(chunks), mimetype=export.CONTENT_TYPES[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@app.route('/api/memory')
+def api_memory():
+    """구조별 메모리 사용량 API"""
+    return jsonify({'success': True, **memory_budget.report()})
+
 @app.route('/api/update', methods=['POST'])
 def api_update():
     """수동 업데이트 API"""
@@ -288,6 +627,7 @@ def api_update():
                               capture_output=True, text=True)
         
         if result.returncode == 0:
+            invalidate_snapshot()
             return jsonify({'success': True, 'message': '업데이트 완료'})
         else:
             return jsonify({'success': False, 'error': result.stderr})
@@ -295,21 +635,28 @@ def api_update():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-if __name__ == '__main__':
+def run_server(host='0.0.0.0', port=None, debug=True):
+    """웹 서버 실행 (port가 없으면 빈 포트 자동 선택)"""
     try:
         print("🌐 웹 서버 시작...")
         
         # 기존 프로세스 정리
         cleanup_old_processes()
         
+        # 최근 스냅샷으로 리더보드 초기화
+        print(f"📈 리더보드 초기화: 스냅샷 {warm_leaderboard()}개")
+
+        # 새 스냅샷 감시 (구독 푸시는 요청 유무와 관계없이 이 스레드가 전달)
+        watch_snapshots()
+        
         # 사용 가능한 포트 찾기
-        port = find_free_port()
+        port = port or find_free_port()
         print(f"📍 주소: http://localhost:{port}")
         print(f"✅ 포트 {port}에서 서버가 시작됩니다.")
         print("🔄 브라우저가 자동으로 열리지 않으면 위 주소를 복사해서 접속하세요.")
         
         # Flask 서버 시작
-        app.run(debug=True, host='0.0.0.0', port=port)
+        app.run(debug=debug, host=host, port=port)
         
     except RuntimeError as e:
         print(f"❌ 오류: {e}")
@@ -317,4 +664,7 @@ if __name__ == '__main__':
     except KeyboardInterrupt:
         print("\n👋 웹 서버가 종료되었습니다.")
     except Exception as e:
-        print(f"❌ 예상치 못한 오류: {e}")
\ No newline at end of file
+        print(f"❌ 예상치 못한 오류: {e}")
+
+if __name__ == '__main__':
+    run_server()